@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the PDF to Markdown converter
+Measures converter stages locally without spending API credits
+
+  python3 benchmark.py extract --pages 600
+  python3 benchmark.py convert --chunk-size 10 25 --workers 2 4 6 --max-rps 8
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import fitz  # PyMuPDF
+from pathlib import Path
+from typing import Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from rich.console import Console
+from rich.table import Table
+
+from mistral_ocr_converter import PDFToMarkdownConverter, estimate_tokens, iter_page_texts
+
+
+def make_synthetic_pdf(path: Path, num_pages: int) -> None:
+    """Write a text-heavy PDF resembling a reference manual."""
+    doc = fitz.open()
+    for page_num in range(num_pages):
+        page = doc.new_page()
+        lines = [f"OPActivity Object - Page {page_num + 1}", ""]
+        for row in range(45):
+            lines.append(
+                f"Property{row:02d}    Read/Write    String    "
+                f"Returns or sets the value of field {row} for the activity."
+            )
+        page.insert_text((36, 36), "\n".join(lines), fontsize=7)
+    doc.save(path)
+    doc.close()
+
+
+def benchmark_extraction(console: Console, pdf_path: Path, workers_list: list,
+                         repeat: int, max_pages: Optional[int] = None) -> None:
+    """Compare pages/sec of serial and multi-process text extraction."""
+    doc = fitz.open(pdf_path)
+    total_pages = len(doc) if max_pages is None else min(max_pages, len(doc))
+    doc.close()
+
+    console.print(f"[bold yellow]📄 Extraction benchmark:[/bold yellow] {pdf_path} ({total_pages} pages, "
+                  f"best of {repeat})\n")
+
+    results = Table(box=None, padding=(0, 2))
+    results.add_column("Workers", justify="right", style="cyan")
+    results.add_column("Seconds", justify="right")
+    results.add_column("Pages/sec", justify="right")
+    results.add_column("Speedup", justify="right")
+
+    baseline = None
+    for workers in workers_list:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _page in iter_page_texts(pdf_path, total_pages, workers):
+                pass
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        if baseline is None:
+            baseline = best
+        results.add_row(
+            str(workers),
+            f"{best:.2f}",
+            f"{total_pages / best:,.0f}",
+            f"{baseline / best:.2f}x"
+        )
+
+    console.print(results)
+    console.print()
+
+
+class MockOpenRouterServer:
+    """
+    Local stand-in for the OpenRouter chat completions endpoint.
+
+    Responses echo the prompt's page text back as markdown after a simulated
+    latency (a fixed base plus time proportional to the output tokens), as a
+    single JSON body or as an SSE stream when the request asks for one. It can
+    also inject the failures the converter has to cope with: 429s when a
+    request-rate ceiling is exceeded or at random, requests that hang past
+    the client's timeout (streams stall half-way through), and context-length
+    errors for oversized prompts. Responses longer than the request's
+    max_tokens are cut off with finish_reason "length". Models listed in
+    fast_models answer fast_speedup times faster, and drop the last page of
+    the chunk for a sloppy_rate fraction of requests.
+    """
+
+    def __init__(self, latency: float = 1.0, tokens_per_second: float = 2000.0,
+                 max_rps: Optional[float] = None, error_rate: float = 0.0,
+                 timeout_rate: float = 0.0, hang_seconds: float = 10.0,
+                 max_prompt_tokens: Optional[int] = None, fast_models: tuple = (),
+                 fast_speedup: float = 3.0, sloppy_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.max_rps = max_rps
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.max_prompt_tokens = max_prompt_tokens
+        self.fast_models = set(fast_models)
+        self.fast_speedup = fast_speedup
+        self.sloppy_rate = sloppy_rate
+
+        self.stats = {'requests': 0, 'rate_limited': 0, 'hung': 0, 'too_large': 0, 'sloppy': 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._request_times: list = []
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/api/v1/chat/completions"
+
+    def start(self) -> "MockOpenRouterServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _decide(self, prompt: str) -> str:
+        """Pick the outcome for a request: ok, rate_limited, hung or too_large."""
+        with self._lock:
+            self.stats['requests'] += 1
+            now = time.monotonic()
+            self._request_times = [t for t in self._request_times if now - t < 1.0]
+
+            if self.max_rps is not None and len(self._request_times) >= self.max_rps:
+                outcome = 'rate_limited'
+            elif self._random.random() < self.error_rate:
+                outcome = 'rate_limited'
+            elif self.max_prompt_tokens and estimate_tokens(prompt) > self.max_prompt_tokens:
+                outcome = 'too_large'
+            elif self._random.random() < self.timeout_rate:
+                outcome = 'hung'
+            else:
+                outcome = 'ok'
+
+            if outcome != 'rate_limited':
+                self._request_times.append(now)
+            if outcome != 'ok':
+                self.stats[outcome] += 1
+            return outcome
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def handle(self):
+                # Clients that time out drop the connection mid-response
+                try:
+                    super().handle()
+                except ConnectionError:
+                    pass
+
+            def _send_json(self, status: int, body: dict, headers: Optional[dict] = None) -> None:
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_event(self, event: str) -> None:
+                data = event.encode('utf-8')
+                self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length))
+                prompt = payload['messages'][0]['content']
+                if isinstance(prompt, list):
+                    prompt = " ".join(part.get('text', '') for part in prompt)
+
+                outcome = server._decide(prompt)
+                if outcome == 'rate_limited':
+                    self._send_json(429, {'error': {'code': 429, 'message': 'Rate limit exceeded'}},
+                                    {'Retry-After': '1'})
+                    return
+                if outcome == 'too_large':
+                    message = (f"This endpoint's maximum context length is {server.max_prompt_tokens} "
+                               f"tokens. However, you requested about {estimate_tokens(prompt)} tokens.")
+                    self._send_json(400, {'error': {'code': 400, 'message': message}})
+                    return
+
+                pages = re.findall(r"PAGE (\d+):\n(.*?)(?=\n\n---PAGE BREAK---|\n\nPlease convert)",
+                                   prompt, re.S)
+                fast = payload.get('model') in server.fast_models
+                with server._lock:
+                    sloppy = fast and len(pages) > 1 and server._random.random() < server.sloppy_rate
+                    if sloppy:
+                        server.stats['sloppy'] += 1
+                if sloppy:
+                    pages = pages[:-1]
+                content = "\n\n".join(f"<!-- page {num} -->\n## Page {num}\n\n{text.strip()}"
+                                       for num, text in pages)
+                finish_reason = 'stop'
+                max_tokens = payload.get('max_tokens')
+                if max_tokens and estimate_tokens(content) > max_tokens:
+                    content = content[:max_tokens * 4]
+                    finish_reason = 'length'
+
+                if outcome == 'hung' and not payload.get('stream'):
+                    time.sleep(server.hang_seconds)
+                    self.close_connection = True
+                    return
+                usage = {
+                    'prompt_tokens': estimate_tokens(prompt),
+                    'completion_tokens': estimate_tokens(content),
+                    'cost': 0.0
+                }
+                duration = server.latency + usage['completion_tokens'] / server.tokens_per_second
+                if fast:
+                    duration /= server.fast_speedup
+
+                if not payload.get('stream'):
+                    time.sleep(duration)
+                    self._send_json(200, {
+                        'choices': [{'message': {'role': 'assistant', 'content': content},
+                                     'finish_reason': finish_reason}],
+                        'usage': usage
+                    })
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                self._send_event(": OPENROUTER PROCESSING\n\n")
+                time.sleep(server.latency)
+
+                pieces = max(1, min(20, len(content) // 200))
+                step = -(-len(content) // pieces) if content else 1
+                for start in range(0, len(content), step):
+                    # Hung streams stall part-way through the response
+                    if outcome == 'hung' and start >= len(content) // 2:
+                        time.sleep(server.hang_seconds)
+                        self.close_connection = True
+                        return
+                    time.sleep((duration - server.latency) / pieces)
+                    delta = {'choices': [{'delta': {'content': content[start:start + step]}}]}
+                    self._send_event(f"data: {json.dumps(delta)}\n\n")
+                final = {'choices': [{'delta': {}, 'finish_reason': finish_reason}], 'usage': usage}
+                self._send_event(f"data: {json.dumps(final)}\n\n")
+                self._send_event("data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def benchmark_conversion(console: Console, pdf_path: Path, args) -> None:
+    """Run the converter end-to-end against the mock server for each setting."""
+    total_pages = len(fitz.open(pdf_path))
+    console.print(f"[bold yellow]🚀 Conversion benchmark:[/bold yellow] {pdf_path} ({total_pages} pages)\n")
+
+    # The converter only checks that a key is present; the mock server ignores it
+    os.environ.setdefault("OPENROUTER_API_KEY", "benchmark")
+
+    results = Table(box=None, padding=(0, 2))
+    for column in ("Engine", "Chunk size", "Workers", "Seconds", "Pages/min", "Requests",
+                   "429s", "Subdivisions", "Escalations", "Reused pages", "Failed pages"):
+        results.add_column(column, justify="left" if column == "Engine" else "right",
+                           style="cyan" if column == "Engine" else None)
+
+    for engine in args.engine:
+        for chunk_size in args.chunk_size:
+            for workers in args.workers:
+                server = MockOpenRouterServer(
+                    latency=args.latency,
+                    tokens_per_second=args.tokens_per_second,
+                    max_rps=args.max_rps,
+                    error_rate=args.error_rate,
+                    timeout_rate=args.timeout_rate,
+                    hang_seconds=args.request_timeout * 2,
+                    max_prompt_tokens=args.max_prompt_tokens,
+                    fast_models=(args.fast_model,) if args.fast_model else (),
+                    sloppy_rate=args.sloppy_rate,
+                    seed=args.seed
+                ).start()
+
+                with tempfile.TemporaryDirectory() as out_dir:
+                    converter = PDFToMarkdownConverter(
+                        output_dir=out_dir,
+                        cache_dir=None,
+                        requests_per_second=args.rate_limit,
+                        stream=args.stream,
+                        stream_idle_timeout=args.request_timeout,
+                        api_url=server.url,
+                        request_timeout=args.request_timeout,
+                        retry_delay=0.5,
+                        fast_model=args.fast_model
+                    )
+                    converter.console = Console(quiet=True)
+
+                    start = time.perf_counter()
+                    error = None
+                    try:
+                        converter.convert(
+                            pdf_url=str(pdf_path),
+                            output_filename="benchmark.md",
+                            chunk_size=chunk_size,
+                            chunk_tokens=args.chunk_tokens,
+                            max_workers=workers,
+                            engine=engine,
+                            concurrency=workers,
+                            extract_workers=1
+                        )
+                    except Exception as e:
+                        error = e
+                    elapsed = time.perf_counter() - start
+                    summary = converter.metrics.summary()
+
+                server.stop()
+
+                results.add_row(
+                    engine,
+                    str(chunk_size),
+                    str(workers),
+                    f"{elapsed:.1f}" + (" ✗" if error else ""),
+                    f"{total_pages / elapsed * 60:,.0f}" if not error else "-",
+                    str(server.stats['requests']),
+                    str(server.stats['rate_limited']),
+                    str(summary['subdivisions']),
+                    str(summary['escalations']),
+                    str(summary['reused_pages']),
+                    str(summary['failed_pages'])
+                )
+                if error:
+                    console.print(f"[red]✗ {engine}, chunk size {chunk_size}, {workers} workers: {error}[/red]")
+
+    console.print(results)
+    console.print()
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Benchmark stages of the PDF to Markdown converter',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    extract_parser = subparsers.add_parser('extract', help='Benchmark PDF text extraction')
+    extract_parser.add_argument(
+        '--pdf',
+        type=str,
+        help='PDF to extract (default: a generated synthetic document)'
+    )
+    extract_parser.add_argument(
+        '--pages',
+        type=int,
+        default=600,
+        help='Pages in the synthetic document, or maximum pages of --pdf (default: 600)'
+    )
+    extract_parser.add_argument(
+        '--workers',
+        type=int,
+        nargs='+',
+        default=[1, 2, 4, min(8, os.cpu_count() or 1)],
+        help='Worker counts to compare; the first is the baseline (default: 1 2 4 CPU count)'
+    )
+    extract_parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='Runs per worker count; the fastest is reported (default: 3)'
+    )
+
+    convert_parser = subparsers.add_parser(
+        'convert',
+        help='Benchmark end-to-end conversion against a local mock OpenRouter server'
+    )
+    convert_parser.add_argument('--pdf', type=str, help='PDF to convert (default: a generated synthetic document)')
+    convert_parser.add_argument('--pages', type=int, default=100,
+                                help='Pages in the synthetic document (default: 100)')
+    convert_parser.add_argument('--engine', choices=['threads', 'async'], nargs='+', default=['threads'],
+                                help='Engines to compare (default: threads)')
+    convert_parser.add_argument('--chunk-size', type=int, nargs='+', default=[10, 25],
+                                help='Maximum pages per chunk settings to compare (default: 10 25)')
+    convert_parser.add_argument('--chunk-tokens', type=int, default=16000,
+                                help='Target estimated input tokens per chunk (default: 16000)')
+    convert_parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, 6],
+                                help='Worker counts (or async concurrency) to compare (default: 2 4 6)')
+    convert_parser.add_argument('--stream', action='store_true', help='Use streamed (SSE) responses')
+    convert_parser.add_argument('--rate-limit', type=float, default=10.0,
+                                help="Converter's client-side request rate limit (default: 10)")
+    convert_parser.add_argument('--latency', type=float, default=1.0,
+                                help='Simulated seconds before the first token (default: 1.0)')
+    convert_parser.add_argument('--tokens-per-second', type=float, default=2000.0,
+                                help='Simulated output tokens per second (default: 2000)')
+    convert_parser.add_argument('--max-rps', type=float,
+                                help='Server-side requests/sec ceiling; excess requests get 429s')
+    convert_parser.add_argument('--error-rate', type=float, default=0.0,
+                                help='Fraction of requests answered with a random 429 (default: 0)')
+    convert_parser.add_argument('--timeout-rate', type=float, default=0.0,
+                                help='Fraction of requests that hang past the client timeout (default: 0)')
+    convert_parser.add_argument('--request-timeout', type=float, default=5.0,
+                                help="Converter's request timeout during the benchmark (default: 5)")
+    convert_parser.add_argument('--max-prompt-tokens', type=int,
+                                help='Reject prompts above this estimated size as context-length errors')
+    convert_parser.add_argument('--fast-model', type=str,
+                                help='Route low-complexity chunks to this model, which the mock answers faster')
+    convert_parser.add_argument('--sloppy-rate', type=float, default=0.0,
+                                help='Fraction of fast-model responses that drop a page (default: 0)')
+    convert_parser.add_argument('--seed', type=int, default=0, help='Random seed for injected failures')
+
+    args = parser.parse_args()
+    console = Console()
+
+    try:
+        if args.command == 'extract':
+            if args.pdf:
+                benchmark_extraction(console, Path(args.pdf), args.workers, args.repeat, args.pages)
+            else:
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    pdf_path = Path(tmp_dir) / "synthetic.pdf"
+                    make_synthetic_pdf(pdf_path, args.pages)
+                    benchmark_extraction(console, pdf_path, args.workers, args.repeat)
+        elif args.command == 'convert':
+            if args.pdf:
+                benchmark_conversion(console, Path(args.pdf), args)
+            else:
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    pdf_path = Path(tmp_dir) / "synthetic.pdf"
+                    make_synthetic_pdf(pdf_path, args.pages)
+                    benchmark_conversion(console, pdf_path, args)
+        return 0
+
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Benchmark cancelled[/yellow]")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Assemble focused LLM context from the docs under a token budget
+Picks the best-matching sections from the guide and knowledge base via docs_index
+
+  python3 context_retrieval.py "How do I set a calculated field on activities?"
+  python3 context_retrieval.py "Transfer.dat resource import" --budget 4000 --stats
+"""
+
+import re
+import sys
+import argparse
+from functools import lru_cache
+from typing import Iterable, Optional
+from rich.console import Console
+
+from docs_index import DEFAULT_DB, DocsIndex, build_match, read_section
+from converter_utils import CHARS_PER_TOKEN, estimate_tokens
+
+
+# Sources searched by default: the converted guide and the knowledge base
+DEFAULT_SOURCES = ("docs/DeltekOpenPlanDeveloperGuide.md", "docs/llm-knowledge-base")
+
+# Default context budget in tokens
+DEFAULT_BUDGET = 8000
+
+# Candidate sections fetched from the index before packing
+CANDIDATES = 60
+
+# A section is dropped as a duplicate if this fraction of its shingles is already selected
+DUPLICATE_OVERLAP = 0.6
+
+# Words per shingle for overlap detection
+SHINGLE_WORDS = 5
+
+# Retrieved contexts kept in memory
+CACHE_SIZE = 128
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _shingles(text: str) -> set:
+    """Hashes of overlapping word n-grams, ignoring case and markdown punctuation."""
+    words = WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        return {hash(" ".join(words))} if words else set()
+    return {hash(" ".join(words[i:i + SHINGLE_WORDS])) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def _fit(text: str, tokens: int) -> str:
+    """Cut text to roughly tokens, at a line boundary where possible."""
+    cut = text[:tokens * CHARS_PER_TOKEN]
+    if "\n" in cut:
+        cut = cut[:cut.rindex("\n")]
+    return cut.rstrip() + "\n…"
+
+
+def format_section(result: dict, text: str) -> str:
+    """A section with a source line, as it appears in the packed context."""
+    source = f"{result['path']} ({result['heading_path'] or 'preamble'})"
+    return f"<!-- source: {source} -->\n{text.strip()}"
+
+
+class ContextRetriever:
+    """Selects and packs doc sections for a query, with an LRU cache of results."""
+
+    def __init__(self, db_path: str = DEFAULT_DB, sources: Iterable[str] = DEFAULT_SOURCES,
+                 cache_size: int = CACHE_SIZE):
+        """
+        Args:
+            db_path: docs_index database, kept up to date for sources
+            sources: Files and directories to draw sections from
+            cache_size: Number of (query, budget) results to memoize
+        """
+        self.sources = tuple(sources)
+        self.index = DocsIndex(db_path)
+        self.last_stats: dict = {}
+        self._packed = lru_cache(maxsize=cache_size)(self._pack)
+        self.refresh()
+
+    def refresh(self) -> dict:
+        """
+        Update the index for the sources, clearing cached results if anything changed.
+
+        Unchanged files cost one stat each, so this runs before every retrieval.
+        """
+        stats = self.index.update(self.sources)
+        if stats['indexed'] or stats['removed']:
+            self._packed.cache_clear()
+        return stats
+
+    def cache_info(self):
+        return self._packed.cache_info()
+
+    def close(self) -> None:
+        self.index.close()
+
+    def candidates(self, query: str, limit: int = CANDIDATES) -> list:
+        """
+        Ranked sections for query: those matching every word first, then
+        those matching any word, so a narrow query can still fill the budget.
+        """
+        results = self.index.search(query, limit=limit, within=self.sources)
+        if len(results) < limit:
+            seen = {(result['path'], result['start']) for result in results}
+            for result in self.index.search(build_match(query, any_term=True), limit=limit,
+                                            raw=True, within=self.sources):
+                if (result['path'], result['start']) not in seen:
+                    results.append(result)
+        return results[:limit]
+
+    def select(self, query: str, budget: int, candidates: int = CANDIDATES) -> list:
+        """
+        Highest-scoring sections that fit in budget tokens, without duplicates.
+
+        Candidates are taken in rank order. A section is skipped if most of
+        its text is already covered by selected sections (the knowledge base
+        repeats much of the guide) or if it does not fit in what is left of
+        the budget; smaller sections further down can still fill the gap. If
+        even the best section is larger than the budget, it is cut to fit.
+
+        Returns:
+            tuple: (selected, stats) where selected holds (result, text, tokens) in rank order
+        """
+        selected = []
+        seen = set()
+        used = 0
+        skipped = {'duplicate': 0, 'too_large': 0}
+
+        for result in self.candidates(query, candidates):
+            text = read_section(result)
+            shingles = _shingles(text)
+            if not shingles:
+                continue
+            if len(shingles & seen) >= DUPLICATE_OVERLAP * len(shingles):
+                skipped['duplicate'] += 1
+                continue
+
+            tokens = estimate_tokens(format_section(result, text)) + 1
+            if used + tokens > budget:
+                if selected:
+                    skipped['too_large'] += 1
+                    continue
+                room = budget - estimate_tokens(format_section(result, "")) - 2
+                text = _fit(text, room) if room > 0 else ""
+                tokens = estimate_tokens(format_section(result, text)) + 1
+                if not text or tokens > budget:
+                    skipped['too_large'] += 1
+                    continue
+
+            selected.append((result, text, tokens))
+            seen |= shingles
+            used += tokens
+            if budget - used < 50:
+                break
+
+        return selected, {'sections': len(selected), 'tokens': used, **skipped}
+
+    def _pack(self, query: str, budget: int) -> tuple:
+        selected, stats = self.select(query, budget)
+        selected.sort(key=lambda item: (item[0]['path'], item[0]['start']))
+        return "\n\n".join(format_section(result, text) for result, text, _ in selected), stats
+
+    def retrieve(self, query: str, budget: int = DEFAULT_BUDGET) -> str:
+        """
+        Packed context for query within budget tokens.
+
+        Sections are ordered by source file and position so related
+        sections read in document order. Results are memoized; the index is
+        refreshed first, so edited sources invalidate the cache instead of
+        being read at stale offsets. last_stats describes the returned
+        context, whether or not it came from the cache.
+        """
+        self.refresh()
+        context, stats = self._packed(query, budget)
+        self.last_stats = dict(stats)
+        return context
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Print the best-matching documentation sections for a query within a token budget',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('query', type=str, help='Question or keywords')
+    parser.add_argument(
+        '--budget',
+        type=int,
+        default=DEFAULT_BUDGET,
+        help=f'Token budget for the context (default: {DEFAULT_BUDGET})'
+    )
+    parser.add_argument(
+        '--sources',
+        nargs='+',
+        default=list(DEFAULT_SOURCES),
+        help='Files and directories to draw from (default: the guide and docs/llm-knowledge-base)'
+    )
+    parser.add_argument(
+        '--db',
+        type=str,
+        default=DEFAULT_DB,
+        help=f'Index database (default: {DEFAULT_DB})'
+    )
+    parser.add_argument(
+        '--stats',
+        action='store_true',
+        help='Print selection statistics to stderr'
+    )
+
+    args = parser.parse_args()
+    retriever: Optional[ContextRetriever] = None
+
+    try:
+        retriever = ContextRetriever(args.db, args.sources)
+        context = retriever.retrieve(args.query, args.budget)
+        if not context:
+            Console(stderr=True).print(f"[yellow]No matching sections for {args.query!r}[/yellow]")
+            return 1
+        print(context)
+        if args.stats:
+            stats = retriever.last_stats
+            Console(stderr=True).print(
+                f"[cyan]{stats['sections']} sections, ~{stats['tokens']} of {args.budget} tokens, "
+                f"{stats['duplicate']} duplicates and {stats['too_large']} oversized skipped[/cyan]"
+            )
+        return 0
+
+    except Exception as e:
+        Console(stderr=True).print(f"\n[bold red]✗ Error: {str(e)}[/bold red]")
+        return 1
+    finally:
+        if retriever:
+            retriever.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""
+Helpers shared by the converter and the docs tools
+Kept free of the PDF and HTTP stack so the docs tools import quickly without it
+"""
+
+import os
+from pathlib import Path
+
+
+# Rough characters-per-token ratio used to estimate prompt sizes locally
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheaply estimate the token count of text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def write_file_durably(path: Path, content: str) -> None:
+    """Write text to path atomically and fsync it before returning."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    # Persist the rename itself (not supported on every platform)
+    try:
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+"""
+Typed loader for docs/CSPR_OPP_DataDictionary.csv
+Parses the spreadsheet export once, caches it in SQLite and regenerates the code fields reference
+
+  python3 data_dictionary.py show C4
+  python3 data_dictionary.py show C80 --level project
+  python3 data_dictionary.py find "Control Account"
+  python3 data_dictionary.py generate --output docs/llm-knowledge-base/Enterprise-Code-Fields-Reference.md
+"""
+
+import re
+import csv
+import sys
+import hashlib
+import sqlite3
+import argparse
+from io import StringIO
+from pathlib import Path
+from typing import Optional
+from rich.console import Console
+from rich.table import Table
+
+from converter_utils import write_file_durably
+
+
+# Source spreadsheet export
+DEFAULT_CSV = "docs/CSPR_OPP_DataDictionary.csv"
+
+# Parsed form of the CSV, rebuilt when the CSV changes
+DEFAULT_CACHE = ".converter_cache/data_dictionary.db"
+
+# Knowledge base page regenerated from the dictionary
+DEFAULT_REFERENCE = "docs/llm-knowledge-base/Enterprise-Code-Fields-Reference.md"
+
+# Schema version; a mismatch rebuilds the cache
+SCHEMA_VERSION = 2
+
+# Requirement levels as spelled in the reference; the sheet varies in case and spacing
+REQUIREMENT_LEVELS = (
+    "Mandatory",
+    "Recommended (Mandatory by Process)",
+    "Mandatory by Process",
+    "Optional"
+)
+
+# Activity code positions listed first in the reference as the core integration fields
+CRITICAL_POSITIONS = range(1, 12)
+
+# Sections of the reference generated from the dictionary; all other sections are kept as written
+GENERATED_SECTIONS = (
+    "Activity-Level Code Fields",
+    "Project-Level Code Fields",
+    "Quick Reference - Mandatory Fields"
+)
+
+# Spreadsheet columns, matched against the header row by prefix
+COLUMNS = {
+    'position': "act code position",
+    'level': "code level",
+    'name': "code field name",
+    'requirement': "cspr 3 system code position",
+    'values': "cspr 3 system code values",
+    'maintained_by': "code file maintained by",
+    'examples': "example",
+    'baselined': "baselined",
+    'description': "description",
+    'unrotated': "unrotated"
+}
+
+POSITION_RE = re.compile(r"^\s*(\d+)\s*(?:-\s*(\d+))?\s*$")
+CODE_RE = re.compile(r"^[Cc]?(\d+)$")
+ENTRY_HEADING_RE = re.compile(r"^#{3,}\s+(C\d+(?:-C\d+)?)\b")
+EMPTY_VALUES = {"", "-", "n/a"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS fields (
+    level TEXT, first INTEGER, last INTEGER, name TEXT, requirement TEXT,
+    values_requirement TEXT, maintained_by TEXT, examples TEXT,
+    baselined INTEGER, description TEXT, unrotated INTEGER
+);
+"""
+
+
+def _clean(text: str) -> str:
+    """Collapse the padding and line breaks the spreadsheet leaves inside single-value cells."""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _clean_paragraphs(text: str) -> str:
+    """Collapse padding within lines of a notes cell, keeping its paragraph breaks."""
+    paragraphs = [_clean(p) for p in re.split(r"\n\s*\n", text.replace("\r", ""))]
+    return "\n\n".join(p for p in paragraphs if p)
+
+
+def _flag(text: str) -> Optional[bool]:
+    value = _clean(text).lower()
+    return True if value.startswith("y") else False if value.startswith("n") else None
+
+
+def name_key(name: str) -> str:
+    """Lookup key for a field name: case, punctuation and spacing ignored."""
+    return re.sub(r"[^a-z0-9]+", " ", name.lower()).strip()
+
+
+class CodeField:
+    """One row of the data dictionary: a code position (or range) and its standard."""
+
+    __slots__ = ('level', 'first', 'last', 'name', 'requirement', 'values_requirement',
+                 'maintained_by', 'examples', 'baselined', 'description', 'unrotated')
+
+    def __init__(self, level: str, first: int, last: int, name: str, requirement: str,
+                 values_requirement: str, maintained_by: str, examples: tuple,
+                 baselined: Optional[bool], description: str, unrotated: Optional[bool]):
+        self.level = level
+        self.first = first
+        self.last = last
+        self.name = name
+        self.requirement = requirement
+        self.values_requirement = values_requirement
+        self.maintained_by = maintained_by
+        self.examples = examples
+        self.baselined = baselined
+        self.description = description
+        self.unrotated = unrotated
+
+    @property
+    def code(self) -> str:
+        """Code field label, e.g. "C4" or "C49-C50"."""
+        return f"C{self.first}" if self.first == self.last else f"C{self.first}-C{self.last}"
+
+    @property
+    def short_name(self) -> str:
+        """Name without the trailing notes some rows carry in parentheses."""
+        return re.sub(r"\s*\((?:BDS|unrotated|rotated)[^)]*\)$", "", self.name, flags=re.IGNORECASE)
+
+    @property
+    def predetermined(self) -> bool:
+        return self.values_requirement.lower() == "predetermined"
+
+    def as_row(self) -> tuple:
+        return (self.level, self.first, self.last, self.name, self.requirement,
+                self.values_requirement, self.maintained_by, "\n".join(self.examples),
+                None if self.baselined is None else int(self.baselined), self.description,
+                None if self.unrotated is None else int(self.unrotated))
+
+    @classmethod
+    def from_row(cls, row: tuple) -> 'CodeField':
+        (level, first, last, name, requirement, values_requirement, maintained_by,
+         examples, baselined, description, unrotated) = row
+        return cls(level, first, last, name, requirement, values_requirement, maintained_by,
+                   tuple(examples.split("\n")) if examples else (),
+                   None if baselined is None else bool(baselined), description,
+                   None if unrotated is None else bool(unrotated))
+
+    def __repr__(self) -> str:
+        return f"CodeField({self.level} {self.code} {self.short_name!r}, {self.requirement or 'no requirement'})"
+
+
+def _split_examples(text: str) -> tuple:
+    """Example values: one per line if the cell has several lines, otherwise comma separated."""
+    text = text.replace("\r", "").strip()
+    if _clean(text).lower() in EMPTY_VALUES:
+        return ()
+    if "\n" in text:
+        items = [_clean(line) for line in text.split("\n")]
+    elif "," in text and "(" not in text:
+        items = [_clean(item) for item in text.split(",")]
+    else:
+        items = [_clean(text)]
+    return tuple(item for item in items if item)
+
+
+def _requirement(text: str) -> str:
+    value = _clean(text)
+    for level in REQUIREMENT_LEVELS:
+        if value.lower() == level.lower():
+            return level
+    return "" if value.lower() in EMPTY_VALUES else value
+
+
+def parse_csv(text: str) -> list:
+    """
+    Parse the data dictionary export into CodeField records.
+
+    The sheet has a title row and a leading empty column, and cells with
+    quoted line breaks and padding. Columns are located from the header
+    row, so the title rows and empty columns are skipped wherever they are.
+
+    Returns:
+        list: CodeField records in sheet order
+    """
+    rows = list(csv.reader(StringIO(text)))
+    header_index = next(
+        (i for i, row in enumerate(rows) if any(_clean(c).lower().startswith(COLUMNS['position']) for c in row)),
+        None
+    )
+    if header_index is None:
+        raise ValueError("Data dictionary header row not found (expected an 'Act Code position' column)")
+
+    header = [_clean(cell).lower() for cell in rows[header_index]]
+    columns = {}
+    for key, prefix in COLUMNS.items():
+        for i, cell in enumerate(header):
+            if cell.startswith(prefix):
+                columns[key] = i
+                break
+        else:
+            raise ValueError(f"Data dictionary column not found: {prefix!r}")
+
+    fields = []
+    for row in rows[header_index + 1:]:
+        cell = {key: row[i] if i < len(row) else "" for key, i in columns.items()}
+        position = POSITION_RE.match(cell['position'])
+        if not position:
+            continue
+        first = int(position.group(1))
+        last = int(position.group(2) or first)
+        fields.append(CodeField(
+            level=_clean(cell['level']).lower().replace(" level", "") or "activity",
+            first=first,
+            last=last,
+            name=_clean(cell['name']),
+            requirement=_requirement(cell['requirement']),
+            values_requirement=_clean(cell['values']) if _clean(cell['values']) not in EMPTY_VALUES else "",
+            maintained_by=_clean(cell['maintained_by']) if _clean(cell['maintained_by']).lower() != "n/a" else "",
+            examples=_split_examples(cell['examples']),
+            baselined=_flag(cell['baselined']),
+            description=_clean_paragraphs(cell['description']),
+            unrotated=_flag(cell['unrotated'])
+        ))
+    return fields
+
+
+def read_csv_text(path: Path) -> str:
+    """CSV contents; the export is Windows-1252 unless it has been re-saved as UTF-8."""
+    data = path.read_bytes()
+    try:
+        return data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return data.decode('cp1252')
+
+
+class DataDictionary:
+    """Code field records with constant-time lookup by code position and by name."""
+
+    def __init__(self, fields: list):
+        self.fields = fields
+        self._by_position = {}
+        self._by_name = {}
+        for field in fields:
+            for position in range(field.first, field.last + 1):
+                self._by_position.setdefault((field.level, position), field)
+            for key in {name_key(field.name), name_key(field.short_name)}:
+                self._by_name.setdefault(key, []).append(field)
+
+    @classmethod
+    def load(cls, csv_path: str = DEFAULT_CSV, cache_path: Optional[str] = DEFAULT_CACHE) -> 'DataDictionary':
+        """
+        Load the dictionary, parsing the CSV only when it has changed.
+
+        The cache records the CSV's size, mtime and SHA-256. If size and
+        mtime match, records are read straight from the cache; otherwise the
+        CSV is hashed, and only re-parsed if its content actually changed.
+        Pass cache_path=None to always parse the CSV.
+        """
+        csv_file = Path(csv_path)
+        if cache_path is None:
+            return cls(parse_csv(read_csv_text(csv_file)))
+
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(cache_path)
+        try:
+            conn.executescript(SCHEMA)
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+            stat = csv_file.stat()
+            signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+            current = meta.get('schema') == str(SCHEMA_VERSION) and meta.get('source') == str(csv_file)
+
+            if not (current and meta.get('signature') == signature):
+                data = csv_file.read_bytes()
+                digest = hashlib.sha256(data).hexdigest()
+                with conn:
+                    if not (current and meta.get('sha256') == digest):
+                        fields = parse_csv(read_csv_text(csv_file))
+                        conn.execute("DELETE FROM fields")
+                        conn.executemany(
+                            "INSERT INTO fields VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            [field.as_row() for field in fields]
+                        )
+                    conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+                        ('schema', str(SCHEMA_VERSION)), ('source', str(csv_file)),
+                        ('signature', signature), ('sha256', digest)
+                    ])
+
+            return cls([CodeField.from_row(row) for row in conn.execute("SELECT * FROM fields ORDER BY rowid")])
+        finally:
+            conn.close()
+
+    def field(self, code, level: str = "activity") -> Optional[CodeField]:
+        """
+        Field at a code position, e.g. field(4), field("C4") or field("c80", "project").
+
+        Positions inside a range (such as C56-C99) return the range's record.
+        """
+        match = CODE_RE.match(str(code).strip())
+        if not match:
+            raise ValueError(f"Invalid code position: {code!r}")
+        return self._by_position.get((level.lower().replace(" level", ""), int(match.group(1))))
+
+    def find(self, name: str) -> list:
+        """Fields with this name (ignoring case and punctuation); some names appear at several positions."""
+        return list(self._by_name.get(name_key(name), []))
+
+    def by_level(self, level: str) -> list:
+        return sorted((f for f in self.fields if f.level == level), key=lambda f: f.first)
+
+
+def _field_markdown(field: CodeField, heading: str = "###", baselined_line: Optional[str] = None) -> list:
+    """
+    Reference entry for one code field.
+
+    Most rows leave Baselined blank; for those the entry keeps baselined_line
+    (the field's line in the existing page), or has no Baselined line.
+    """
+    title = f"{heading} {field.code} - {field.short_name}"
+    if field.requirement == "Mandatory":
+        title += " ⚠️ MANDATORY"
+    lines = [title, ""]
+    if field.requirement:
+        lines += [f"**CSPR Requirement:** {field.requirement}", ""]
+    if field.maintained_by:
+        source = f" ({field.values_requirement})" if field.values_requirement and len(field.values_requirement) < 40 else ""
+        lines += [f"**Maintained By:** {field.maintained_by}{source}", ""]
+    if field.level == "activity" and field.baselined is not None:
+        lines += [f"**Baselined:** {'Yes' if field.baselined else 'No'}", ""]
+    elif field.level == "activity" and baselined_line:
+        lines += [baselined_line, ""]
+    if field.description:
+        lines += [f"**Description:** {field.description}", ""]
+    if field.values_requirement and not field.predetermined and len(field.values_requirement) >= 40:
+        lines += [f"**Values:** {field.values_requirement}", ""]
+    if field.examples:
+        label = "Predetermined Values" if field.predetermined else "Examples"
+        if len(field.examples) > 3 or any(len(example) > 30 for example in field.examples):
+            lines += [f"**{label}:**"] + [f"- `{example}`" for example in field.examples] + [""]
+        else:
+            lines += [f"**{label}:** " + ", ".join(f"`{example}`" for example in field.examples), ""]
+    return lines
+
+
+def existing_baselined(existing: str) -> dict:
+    """The "**Baselined:**" line of each field entry in an existing page, keyed by level and code."""
+    lines = {}
+    level = code = None
+    for line in existing.splitlines():
+        if line.startswith("## "):
+            level = "project" if line[3:].strip().startswith("Project") else "activity"
+        entry = ENTRY_HEADING_RE.match(line)
+        if entry:
+            code = entry.group(1)
+        elif line.startswith("#"):
+            code = None
+        elif code and line.startswith("**Baselined:**"):
+            lines[(level, code)] = line.rstrip()
+    return lines
+
+
+def render_sections(dictionary: DataDictionary, baselined: Optional[dict] = None) -> dict:
+    """
+    Generated reference sections, keyed by their "##" title.
+
+    baselined holds existing Baselined lines (see existing_baselined) for
+    fields the sheet leaves blank.
+    """
+    baselined = baselined or {}
+    activity = dictionary.by_level("activity")
+    critical = [f for f in activity if f.first in CRITICAL_POSITIONS]
+    standard = [f for f in activity if f.first not in CRITICAL_POSITIONS]
+
+    def entries(fields: list) -> list:
+        lines = []
+        for field in fields:
+            lines += _field_markdown(field, baselined_line=baselined.get((field.level, field.code)))
+            lines += ["---", ""]
+        return lines
+
+    mandatory = ["| Code | Field Name | Level | Maintained By |", "|------|-----------|-------|---------------|"]
+    for field in dictionary.fields:
+        if field.requirement == "Mandatory":
+            mandatory.append(f"| **{field.code}** | {field.short_name} | {field.level.title()} | {field.maintained_by} |")
+
+    return {
+        "Activity-Level Code Fields (Critical Fields)": entries(critical),
+        "Activity-Level Code Fields (Standard Fields)": entries(standard),
+        "Project-Level Code Fields": entries(dictionary.by_level("project")),
+        "Quick Reference - Mandatory Fields": mandatory + ["", "---", ""]
+    }
+
+
+def render_reference(dictionary: DataDictionary, existing: str = "") -> str:
+    """
+    Enterprise-Code-Fields-Reference.md regenerated from the dictionary.
+
+    The per-field sections and the mandatory fields table are generated;
+    every other section of the existing page (overview, best practices,
+    common issues) is kept as written, in place, as is the Baselined line
+    of any field whose Baselined cell is blank. Generated sections the
+    page lacks are added after the last generated section it has, or at
+    the end.
+    """
+    generated = render_sections(dictionary, existing_baselined(existing))
+    if not existing.strip():
+        existing = (
+            "# Enterprise Code Fields Reference for Deltek Open Plan®\n\n"
+            "**Source:** CSPR_OPP_DataDictionary.csv\n\n---\n\n"
+        )
+
+    # Split the page into its "##" sections, ignoring "#" lines inside code blocks
+    sections = []
+    current = []
+    in_fence = False
+    for line in existing.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        if not in_fence and line.startswith("## "):
+            sections.append(current)
+            current = []
+        current.append(line)
+    sections.append(current)
+
+    output = []
+    insert_at = None
+    for section in sections:
+        title = section[0][3:].strip() if section[0].startswith("## ") else None
+        if title in generated:
+            output += [f"## {title}", ""] + generated.pop(title)
+            insert_at = len(output)
+        elif not (title and title.startswith(GENERATED_SECTIONS)):
+            output += section
+
+    # Generated sections the page did not have yet go after the last one it had
+    missing = []
+    for title, lines in generated.items():
+        missing += [f"## {title}", ""] + lines
+    insert_at = len(output) if insert_at is None else insert_at
+    output[insert_at:insert_at] = missing
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(output)).strip() + "\n"
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Look up code fields in the CSPR/OPP data dictionary and regenerate its reference page',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--csv', type=str, default=DEFAULT_CSV, help=f'Data dictionary CSV (default: {DEFAULT_CSV})')
+    parser.add_argument('--cache', type=str, default=DEFAULT_CACHE, help=f'Parsed cache (default: {DEFAULT_CACHE})')
+    parser.add_argument('--no-cache', action='store_true', help='Parse the CSV without reading or writing the cache')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    show_parser = subparsers.add_parser('show', help='Show the field at a code position')
+    show_parser.add_argument('code', type=str, help='Code position, e.g. C4 or 4')
+    show_parser.add_argument('--level', choices=['activity', 'project'], default='activity')
+
+    find_parser = subparsers.add_parser('find', help='Find fields by name')
+    find_parser.add_argument('name', type=str, help='Field name, e.g. "Control Account"')
+
+    generate_parser = subparsers.add_parser('generate', help='Regenerate the code fields reference page')
+    generate_parser.add_argument(
+        '--output',
+        type=str,
+        default=DEFAULT_REFERENCE,
+        help=f'Reference page to update (default: {DEFAULT_REFERENCE})'
+    )
+
+    args = parser.parse_args()
+    console = Console()
+
+    try:
+        dictionary = DataDictionary.load(args.csv, None if args.no_cache else args.cache)
+
+        if args.command == 'generate':
+            output = Path(args.output)
+            existing = output.read_text(encoding='utf-8') if output.exists() else ""
+            content = render_reference(dictionary, existing)
+            if content == existing:
+                console.print(f"[green]✓ {output} is up to date[/green]")
+            else:
+                output.parent.mkdir(parents=True, exist_ok=True)
+                write_file_durably(output, content)
+                console.print(f"[bold green]✓ Regenerated {output}[/bold green] from {len(dictionary.fields)} fields")
+            return 0
+
+        fields = [dictionary.field(args.code, args.level)] if args.command == 'show' else dictionary.find(args.name)
+        fields = [field for field in fields if field]
+        if not fields:
+            console.print("[yellow]No matching code field[/yellow]")
+            return 1
+
+        for field in fields:
+            table = Table(title=f"{field.level.title()} {field.code} - {field.short_name}", show_header=False)
+            table.add_column(style="cyan")
+            table.add_column(style="white")
+            table.add_row("Name", field.name)
+            table.add_row("Requirement", field.requirement or "-")
+            table.add_row("Values", field.values_requirement or "-")
+            table.add_row("Maintained by", field.maintained_by or "-")
+            table.add_row("Examples", ", ".join(field.examples) or "-")
+            if field.baselined is not None:
+                table.add_row("Baselined", "Yes" if field.baselined else "No")
+            if field.unrotated is not None:
+                table.add_row("Unrotated", "Yes" if field.unrotated else "No")
+            table.add_row("Description", field.description or "-")
+            console.print(table)
+        return 0
+
+    except (OSError, ValueError) as e:
+        console.print(f"\n[bold red]✗ Error: {str(e)}[/bold red]")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Full-text search over the converted documentation
+Indexes every markdown section (heading path and byte range) in SQLite FTS5
+
+  python3 docs_index.py build
+  python3 docs_index.py search "EarlyStartStdDev"
+  python3 docs_index.py search "transfer.dat resource" --limit 5 --show
+"""
+
+import re
+import sys
+import time
+import hashlib
+import sqlite3
+import argparse
+from pathlib import Path
+from typing import Iterable, Optional
+from rich.console import Console
+from rich.table import Table
+from rich.markup import escape
+
+
+# Default location of the index database (alongside the converter's cache)
+DEFAULT_DB = ".converter_cache/docs_index.db"
+
+# Directories indexed when none are given
+DEFAULT_ROOTS = ("docs", "docs_mistral")
+
+# Schema version; a mismatch rebuilds the index from scratch
+SCHEMA_VERSION = 1
+
+# BM25 weights for the heading path and body columns: heading matches rank higher
+BM25_WEIGHTS = (5.0, 1.0)
+
+HEADING_RE = re.compile(rb"^(#{1,6})[ \t]+(.*?)[ \t]*#*[ \t]*$")
+FENCE_RE = re.compile(rb"^[ \t]*(```|~~~)")
+QUERY_TERM_RE = re.compile(r"\w+")
+
+# Question words dropped from free-text queries so they do not dominate ranking
+QUERY_STOPWORDS = {
+    "a", "an", "and", "are", "can", "do", "does", "for", "from", "how", "i", "in", "is", "it",
+    "my", "of", "on", "or", "the", "to", "what", "when", "where", "which", "why", "with"
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    size INTEGER,
+    sha256 TEXT
+);
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    heading TEXT,
+    heading_path TEXT,
+    level INTEGER,
+    start INTEGER,
+    end INTEGER
+);
+CREATE INDEX IF NOT EXISTS sections_path ON sections(path);
+CREATE VIRTUAL TABLE IF NOT EXISTS sections_fts USING fts5(
+    heading_path, body, tokenize='porter unicode61'
+);
+"""
+
+
+def split_sections(data: bytes) -> list:
+    """
+    Split a markdown file into sections at its headings, in one pass.
+
+    Headings inside code blocks are ignored. Text before the first heading
+    becomes a section with an empty heading.
+
+    Returns:
+        list: (heading, heading_path, level, start, end) with byte offsets into data
+    """
+    sections = []
+    stack = []
+    current = ("", "", 0, 0)
+    in_fence = False
+    offset = 0
+
+    for line in data.splitlines(keepends=True):
+        stripped = line.rstrip(b"\r\n")
+        if FENCE_RE.match(stripped):
+            in_fence = not in_fence
+        heading = None if in_fence else HEADING_RE.match(stripped)
+        if heading:
+            if offset > current[3]:
+                sections.append(current + (offset,))
+            level = len(heading.group(1))
+            title = heading.group(2).decode('utf-8', errors='replace')
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, title))
+            current = (title, " > ".join(t for _, t in stack), level, offset)
+        offset += len(line)
+
+    if offset > current[3]:
+        sections.append(current + (offset,))
+    return sections
+
+
+def build_match(query: str, any_term: bool = False) -> str:
+    """Turn free text into an FTS5 query: every word quoted, all required unless any_term."""
+    words = QUERY_TERM_RE.findall(query)
+    terms = [f'"{word}"' for word in words if word.lower() not in QUERY_STOPWORDS] or [f'"{word}"' for word in words]
+    return (" OR " if any_term else " ").join(terms)
+
+
+class DocsIndex:
+    """Persistent section index over markdown files, updated incrementally."""
+
+    def __init__(self, db_path: str = DEFAULT_DB):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        self._ensure_schema()
+
+    def _ensure_schema(self) -> None:
+        self.conn.executescript(SCHEMA)
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        if row and int(row['value']) == SCHEMA_VERSION:
+            return
+        with self.conn:
+            for table in ("files", "sections", "sections_fts"):
+                self.conn.execute(f"DELETE FROM {table}")
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema', ?)", (str(SCHEMA_VERSION),))
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def update(self, roots: Iterable[str] = DEFAULT_ROOTS) -> dict:
+        """
+        Bring the index up to date with the markdown files under roots.
+
+        A file is re-read only if its size or mtime changed, and re-indexed
+        only if its content hash changed. Files that no longer exist under
+        the given roots are dropped.
+
+        Returns:
+            dict: Counts of files scanned, indexed, unchanged and removed
+        """
+        stats = {'scanned': 0, 'indexed': 0, 'unchanged': 0, 'removed': 0, 'sections': 0}
+        known = {row['path']: row for row in self.conn.execute("SELECT * FROM files")}
+        root_paths = [Path(root) for root in roots]
+        seen = set()
+
+        with self.conn:
+            for root in root_paths:
+                files = [root] if root.is_file() else sorted(root.rglob("*.md"))
+                for file_path in files:
+                    path = file_path.as_posix()
+                    seen.add(path)
+                    stats['scanned'] += 1
+                    stat = file_path.stat()
+                    row = known.get(path)
+                    if row and row['mtime_ns'] == stat.st_mtime_ns and row['size'] == stat.st_size:
+                        stats['unchanged'] += 1
+                        continue
+
+                    data = file_path.read_bytes()
+                    digest = hashlib.sha256(data).hexdigest()
+                    if row and row['sha256'] == digest:
+                        stats['unchanged'] += 1
+                    else:
+                        stats['indexed'] += 1
+                        stats['sections'] += self._index_file(path, data)
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                        (path, stat.st_mtime_ns, stat.st_size, digest)
+                    )
+
+            for path in known:
+                in_roots = any(Path(path) == root or root in Path(path).parents for root in root_paths)
+                if in_roots and path not in seen:
+                    self._remove_file(path)
+                    stats['removed'] += 1
+
+        return stats
+
+    def _remove_file(self, path: str) -> None:
+        self.conn.execute(
+            "DELETE FROM sections_fts WHERE rowid IN (SELECT id FROM sections WHERE path = ?)", (path,)
+        )
+        self.conn.execute("DELETE FROM sections WHERE path = ?", (path,))
+        self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def _index_file(self, path: str, data: bytes) -> int:
+        self._remove_file(path)
+        sections = split_sections(data)
+        for heading, heading_path, level, start, end in sections:
+            cursor = self.conn.execute(
+                "INSERT INTO sections (path, heading, heading_path, level, start, end) VALUES (?, ?, ?, ?, ?, ?)",
+                (path, heading, heading_path, level, start, end)
+            )
+            body = data[start:end].decode('utf-8', errors='replace')
+            self.conn.execute(
+                "INSERT INTO sections_fts (rowid, heading_path, body) VALUES (?, ?, ?)",
+                (cursor.lastrowid, heading_path, body)
+            )
+        return len(sections)
+
+    def search(self, query: str, limit: int = 10, raw: bool = False,
+               within: Optional[Iterable[str]] = None) -> list:
+        """
+        Ranked sections matching query (BM25, heading matches weighted higher).
+
+        Free-text queries require every word; if nothing matches, any word
+        is accepted. With raw, query is passed to FTS5 unchanged. within
+        limits results to the given files and directories.
+
+        Returns:
+            list: dicts with path, heading, heading_path, level, start, end, score, snippet
+        """
+        attempts = [query] if raw else [build_match(query), build_match(query, any_term=True)]
+        scope, scope_params = "", []
+        if within is not None:
+            roots = [Path(root).as_posix() for root in within]
+            scope = " AND (" + " OR ".join("s.path = ? OR s.path LIKE ?" for _ in roots) + ")"
+            for root in roots:
+                scope_params += [root, root.rstrip("/") + "/%"]
+        for match in attempts:
+            if not match:
+                continue
+            rows = self.conn.execute(
+                f"""
+                SELECT s.path, s.heading, s.heading_path, s.level, s.start, s.end,
+                       bm25(sections_fts, {BM25_WEIGHTS[0]}, {BM25_WEIGHTS[1]}) AS score,
+                       snippet(sections_fts, 1, '«', '»', ' … ', 12) AS snippet
+                FROM sections_fts JOIN sections s ON s.id = sections_fts.rowid
+                WHERE sections_fts MATCH ?{scope}
+                ORDER BY score LIMIT ?
+                """,
+                (match, *scope_params, limit)
+            ).fetchall()
+            if rows:
+                return [dict(row) for row in rows]
+        return []
+
+    def sections(self, paths: Optional[Iterable[str]] = None) -> list:
+        """All indexed sections (optionally only for paths), in file order."""
+        if paths is None:
+            rows = self.conn.execute("SELECT * FROM sections ORDER BY path, start")
+        else:
+            paths = list(paths)
+            rows = self.conn.execute(
+                f"SELECT * FROM sections WHERE path IN ({','.join('?' * len(paths))}) ORDER BY path, start",
+                paths
+            )
+        return [dict(row) for row in rows]
+
+
+def read_section(result: dict) -> str:
+    """Text of an indexed section, read from its file by byte range."""
+    with open(result['path'], 'rb') as f:
+        f.seek(result['start'])
+        return f.read(result['end'] - result['start']).decode('utf-8', errors='replace')
+
+
+def update_index(db_path: str, roots: Iterable[str]) -> dict:
+    """Open the index at db_path, update it for roots and close it."""
+    index = DocsIndex(db_path)
+    try:
+        return index.update(roots)
+    finally:
+        index.close()
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Build and query a full-text index over the converted documentation',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        '--db',
+        type=str,
+        default=DEFAULT_DB,
+        help=f'Index database (default: {DEFAULT_DB})'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Index new and changed markdown files')
+    build_parser.add_argument(
+        'roots',
+        nargs='*',
+        default=[root for root in DEFAULT_ROOTS if Path(root).exists()],
+        help='Directories or files to index (default: docs docs_mistral)'
+    )
+
+    search_parser = subparsers.add_parser('search', help='Search the index')
+    search_parser.add_argument('query', type=str, help='Words to search for')
+    search_parser.add_argument('--limit', type=int, default=10, help='Maximum results (default: 10)')
+    search_parser.add_argument('--raw', action='store_true', help='Pass the query to FTS5 unchanged')
+    search_parser.add_argument('--show', action='store_true', help='Print the text of each matching section')
+
+    args = parser.parse_args()
+    console = Console()
+    index = DocsIndex(args.db)
+
+    try:
+        started = time.perf_counter()
+        if args.command == 'build':
+            stats = index.update(args.roots)
+            elapsed = time.perf_counter() - started
+            console.print(
+                f"[bold green]✓ Index updated in {elapsed:.2f}s:[/bold green] "
+                f"{stats['scanned']} files, {stats['indexed']} indexed ({stats['sections']} sections), "
+                f"{stats['unchanged']} unchanged, {stats['removed']} removed"
+            )
+            return 0
+
+        results = index.search(args.query, limit=args.limit, raw=args.raw)
+        elapsed = time.perf_counter() - started
+        if not results:
+            console.print(f"[yellow]No matches for {args.query!r}[/yellow]")
+            return 1
+
+        table = Table(title=f"{len(results)} results in {elapsed * 1000:.1f} ms")
+        table.add_column("Score", justify="right", style="cyan")
+        table.add_column("Section", style="white")
+        table.add_column("Location", style="dim")
+        for result in results:
+            table.add_row(
+                f"{-result['score']:.1f}",
+                f"[bold]{escape(result['heading_path'] or '(preamble)')}[/bold]\n{escape(result['snippet'])}",
+                f"{escape(result['path'])}\n{result['start']}-{result['end']}"
+            )
+        console.print(table)
+
+        if args.show:
+            for result in results:
+                console.rule(result['heading_path'] or result['path'])
+                console.print(read_section(result), markup=False, highlight=False)
+        return 0
+
+    except sqlite3.OperationalError as e:
+        console.print(f"\n[bold red]✗ Error: {str(e)}[/bold red]")
+        return 1
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
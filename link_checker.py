@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Check relative links across the markdown docs
+Builds a graph of files, heading anchors and links, reports dangling links and orphan pages
+
+  python3 link_checker.py
+  python3 link_checker.py docs/developer-guide --orphans
+  python3 link_checker.py docs --full
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Iterable
+from urllib.parse import unquote
+from rich.console import Console
+from rich.table import Table
+from rich.markup import escape
+
+from converter_utils import write_file_durably
+
+
+# Cached per-file link graph, reused for files that have not changed
+DEFAULT_GRAPH = ".converter_cache/link_graph.json"
+
+# Directories checked when none are given
+DEFAULT_ROOTS = ("docs",)
+
+# Bumped when the cached graph format or parsing changes
+GRAPH_VERSION = 1
+
+# Pages that are entry points to their directory and are not expected to have inbound links
+ENTRY_PAGES = {"index.md", "readme.md"}
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+FENCE_RE = re.compile(r"^\s*(```|~~~)")
+INLINE_CODE_RE = re.compile(r"`[^`]*`")
+LINK_RE = re.compile(r"!?\[(?:[^\[\]]|\[[^\]]*\])*\]\(\s*<?([^)>]*?)>?(?:\s+\"[^\"]*\")?\s*\)")
+REFERENCE_DEF_RE = re.compile(r"^\s{0,3}\[[^\]]+\]:\s*<?(\S+?)>?(?:\s+.*)?$")
+HTML_ANCHOR_RE = re.compile(r"<a\s+(?:name|id)=[\"']([^\"']+)[\"']", re.IGNORECASE)
+EXTERNAL_RE = re.compile(r"^[a-z][a-z0-9+.-]*:", re.IGNORECASE)
+
+
+def heading_anchor(title: str) -> str:
+    """GitHub's anchor for a heading: link markup and punctuation dropped, spaces to hyphens."""
+    text = re.sub(r"!?\[([^\]]*)\]\([^)]*\)", r"\1", title)
+    text = re.sub(r"<[^>]+>", "", text)
+    return re.sub(r"[^\w\- ]", "", text.strip().lower()).replace(" ", "-")
+
+
+def parse_markdown(text: str) -> tuple:
+    """
+    Anchors and outgoing links of one markdown file, in one pass.
+
+    Links inside code blocks and inline code are ignored. Repeated headings
+    get GitHub's -1, -2 suffixes.
+
+    Returns:
+        tuple: (anchors, links) where links are (line number, target) pairs
+    """
+    anchors = []
+    counts = {}
+    links = []
+    in_fence = False
+
+    for number, line in enumerate(text.splitlines(), 1):
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+
+        heading = HEADING_RE.match(line)
+        if heading:
+            anchor = heading_anchor(heading.group(2))
+            suffix = counts.get(anchor, 0)
+            counts[anchor] = suffix + 1
+            anchors.append(anchor if suffix == 0 else f"{anchor}-{suffix}")
+        anchors.extend(HTML_ANCHOR_RE.findall(line))
+
+        line = INLINE_CODE_RE.sub("", line)
+        definition = REFERENCE_DEF_RE.match(line)
+        if definition:
+            links.append((number, definition.group(1)))
+            continue
+        for match in LINK_RE.finditer(line):
+            links.append((number, match.group(1)))
+
+    return anchors, links
+
+
+class LinkGraph:
+    """Files, anchors and links under a set of roots, re-parsing only changed files."""
+
+    def __init__(self, graph_path: str = DEFAULT_GRAPH):
+        self.graph_path = Path(graph_path) if graph_path else None
+        self.files: dict = {}
+        if self.graph_path and self.graph_path.exists():
+            try:
+                with open(self.graph_path, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+                if cached.get('version') == GRAPH_VERSION:
+                    self.files = cached['files']
+            except (OSError, ValueError):
+                self.files = {}
+
+    def update(self, roots: Iterable[str]) -> dict:
+        """
+        Refresh the graph for the markdown files under roots.
+
+        Files whose size and mtime match the cached entry keep their parsed
+        anchors and links; only new or changed files are read. Files no
+        longer present are dropped.
+
+        Returns:
+            dict: Counts of files scanned, parsed and removed
+        """
+        stats = {'scanned': 0, 'parsed': 0, 'removed': 0}
+        root_paths = [Path(root) for root in roots]
+        seen = set()
+
+        for root in root_paths:
+            for file_path in ([root] if root.is_file() else sorted(root.rglob("*.md"))):
+                path = file_path.as_posix()
+                seen.add(path)
+                stats['scanned'] += 1
+                stat = file_path.stat()
+                entry = self.files.get(path)
+                if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                    continue
+                anchors, links = parse_markdown(file_path.read_text(encoding='utf-8', errors='replace'))
+                self.files[path] = {
+                    'mtime_ns': stat.st_mtime_ns,
+                    'size': stat.st_size,
+                    'anchors': anchors,
+                    'links': links
+                }
+                stats['parsed'] += 1
+
+        for path in list(self.files):
+            in_roots = any(Path(path) == root or root in Path(path).parents for root in root_paths)
+            if in_roots and path not in seen:
+                del self.files[path]
+                stats['removed'] += 1
+        return stats
+
+    def save(self) -> None:
+        if not self.graph_path:
+            return
+        self.graph_path.parent.mkdir(parents=True, exist_ok=True)
+        write_file_durably(self.graph_path, json.dumps({'version': GRAPH_VERSION, 'files': self.files}))
+
+    def check(self, roots: Iterable[str]) -> tuple:
+        """
+        Resolve every link from files under roots.
+
+        Links to markdown files are resolved against the graph (including
+        the heading anchor, if any); links to other files are checked on
+        disk. External URLs are not checked.
+
+        Returns:
+            tuple: (dangling, orphans, link count) where dangling holds
+            (source, line, target, problem) and orphans lists pages under
+            roots that no other page links to
+        """
+        root_paths = [Path(root) for root in roots]
+        in_roots = [path for path in self.files
+                    if any(Path(path) == root or root in Path(path).parents for root in root_paths)]
+        anchor_sets = {}
+        inbound = set()
+        dangling = []
+        count = 0
+
+        for source in in_roots:
+            source_dir = os.path.dirname(source)
+            for line, target in self.files[source]['links']:
+                if EXTERNAL_RE.match(target):
+                    continue
+                count += 1
+                path_part, _, anchor = target.partition("#")
+                path_part = unquote(path_part)
+                resolved = source if not path_part else os.path.normpath(os.path.join(source_dir, path_part))
+                resolved = Path(resolved).as_posix()
+
+                if resolved in self.files:
+                    if resolved != source:
+                        inbound.add(resolved)
+                    if anchor:
+                        anchors = anchor_sets.get(resolved)
+                        if anchors is None:
+                            anchors = anchor_sets[resolved] = set(self.files[resolved]['anchors'])
+                        if unquote(anchor).lower() not in anchors:
+                            dangling.append((source, line, target, "missing anchor"))
+                elif not os.path.exists(resolved):
+                    dangling.append((source, line, target, "missing file"))
+
+        orphans = sorted(
+            path for path in in_roots
+            if path not in inbound and os.path.basename(path).lower() not in ENTRY_PAGES
+        )
+        return dangling, orphans, count
+
+
+def check_links(roots: Iterable[str], graph_path: str = DEFAULT_GRAPH) -> dict:
+    """Update the cached graph for roots and check it. Returns stats, dangling links and orphans."""
+    roots = list(roots)
+    graph = LinkGraph(graph_path)
+    stats = graph.update(roots)
+    dangling, orphans, count = graph.check(roots)
+    graph.save()
+    return {**stats, 'links': count, 'dangling': dangling, 'orphans': orphans}
+
+
+def print_report(console: Console, result: dict, show_orphans: bool, limit: int) -> None:
+    if result['dangling']:
+        table = Table(title=f"Dangling links ({len(result['dangling'])})")
+        table.add_column("Source", style="white")
+        table.add_column("Link", style="cyan")
+        table.add_column("Problem", style="red")
+        for source, line, target, problem in result['dangling'][:limit]:
+            table.add_row(escape(f"{source}:{line}"), escape(target), problem)
+        console.print(table)
+        if len(result['dangling']) > limit:
+            console.print(f"[dim]... {len(result['dangling']) - limit} more[/dim]")
+
+    if show_orphans and result['orphans']:
+        console.print(f"\n[bold yellow]Orphan pages ({len(result['orphans'])}):[/bold yellow]")
+        for path in result['orphans'][:limit]:
+            console.print(f"  {escape(path)}")
+        if len(result['orphans']) > limit:
+            console.print(f"[dim]  ... {len(result['orphans']) - limit} more[/dim]")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Report dangling relative links and orphan pages in the markdown docs',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        'roots',
+        nargs='*',
+        default=list(DEFAULT_ROOTS),
+        help='Directories or files to check (default: docs)'
+    )
+    parser.add_argument(
+        '--graph',
+        type=str,
+        default=DEFAULT_GRAPH,
+        help=f'Cached link graph (default: {DEFAULT_GRAPH})'
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Ignore the cached graph and re-parse every file'
+    )
+    parser.add_argument(
+        '--orphans',
+        action='store_true',
+        help='List pages no other page links to'
+    )
+    parser.add_argument(
+        '--limit',
+        type=int,
+        default=50,
+        help='Maximum dangling links and orphans to list (default: 50)'
+    )
+
+    args = parser.parse_args()
+    console = Console()
+
+    try:
+        if args.full and Path(args.graph).exists():
+            Path(args.graph).unlink()
+        started = time.perf_counter()
+        result = check_links(args.roots, args.graph)
+        elapsed = time.perf_counter() - started
+
+        print_report(console, result, args.orphans, args.limit)
+        status = "[bold green]✓" if not result['dangling'] else "[bold red]✗"
+        console.print(
+            f"\n{status} {result['links']} links in {result['scanned']} files checked in {elapsed * 1000:.0f} ms"
+            f"[/] ({result['parsed']} parsed, {result['scanned'] - result['parsed']} from cache): "
+            f"{len(result['dangling'])} dangling, {len(result['orphans'])} orphan pages"
+        )
+        return 1 if result['dangling'] else 0
+
+    except OSError as e:
+        console.print(f"\n[bold red]✗ Error: {str(e)}[/bold red]")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,13 +7,32 @@ Downloads PDF, extracts text with PyMuPDF, then formats with Claude
 import os
 import sys
 import json
+import math
+import re
+import hashlib
+import queue
+import random
+import threading
+import asyncio
 import requests
+import aiohttp
 import argparse
 import fitz  # PyMuPDF
 from pathlib import Path
-from typing import Optional, Dict
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+from collections import Counter, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional, Dict, Iterable, Iterator
 from dotenv import load_dotenv
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait
+)
 import time
 from rich.console import Console
 from rich.progress import (
@@ -27,12 +46,2087 @@ from rich.progress import (
     TransferSpeedColumn
 )
 from rich.panel import Panel
+from rich.markup import escape
 from rich.table import Table
 
+from converter_utils import CHARS_PER_TOKEN, estimate_tokens, write_file_durably
+
+
+PROMPT_TEMPLATE = """Convert this PDF text extract to clean, well-formatted GitHub Flavored Markdown.
+
+The text is from pages {first_page} to {last_page} of a technical document.
+
+Requirements:
+- Remove headers, footers, and page numbers
+- Preserve all headings using proper markdown levels (# ## ### etc.)
+- Maintain code examples in proper code blocks with language identifiers
+- Convert tables to markdown table format
+- Preserve the document structure
+- Keep all technical content
+- Use proper markdown formatting for lists, emphasis, and links
+- Remove artifacts like repeated headers or footers
+- Start the output for each page with a marker line `<!-- page N -->`, where N is the page's PAGE number
+
+Here is the extracted text:
+
+{chunk_text}
+
+Please convert this to clean markdown format."""
+
+
+# Page marker lines the prompt asks for, so a response cut off part-way can
+# still be credited to the pages it completed
+PAGE_MARKER_RE = re.compile(r"^[ \t]*<!--\s*page\s+(\d+)\s*-->[ \t]*\n?", re.IGNORECASE | re.MULTILINE)
+
+
+# Maximum pooled keep-alive connections per host for the thread engine
+HTTP_POOL_SIZE = 32
+
+# Streaming buffer size for source downloads
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+
+# File types the converter can read
+SOURCE_SUFFIXES = ('.pdf', '.pptx')
+
+
+class ResponseCache:
+    """
+    Persistent on-disk cache of chunk responses.
+
+    Entries are content-addressed by a hash of the model, prompt template and
+    chunk text, so unchanged chunks are served locally on re-runs. The total
+    size of the cache is bounded; when it is exceeded, the least recently used
+    entries (by file modification time, refreshed on every hit) are evicted.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes = sum(p.stat().st_size for p in self.cache_dir.glob("*.json"))
+
+    @staticmethod
+    def make_key(model: str, prompt_template: str, chunk_text: str) -> str:
+        """Build the content address for a chunk request."""
+        digest = hashlib.sha256()
+        for part in (model, prompt_template, chunk_text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached markdown for key, or None on a miss."""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = json.load(f)['content']
+            os.utime(path)  # Mark as recently used
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return content
+
+    def put(self, key: str, content: str) -> None:
+        """Store markdown for key, evicting old entries if over the size limit."""
+        path = self._entry_path(key)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'content': content}, f)
+        size = tmp_path.stat().st_size
+
+        with self._lock:
+            if path.exists():
+                self._total_bytes -= path.stat().st_size
+            os.replace(tmp_path, path)
+            self._total_bytes += size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until under the size limit."""
+        entries = []
+        for entry in self.cache_dir.glob("*.json"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+
+        entries.sort(key=lambda e: e[0])
+        self._total_bytes = sum(size for _, size, _ in entries)
+
+        for _, size, entry in entries:
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                entry.unlink()
+                self._total_bytes -= size
+            except OSError:
+                continue
+
+
+class CheckpointJournal:
+    """
+    Append-only journal of converted page ranges, used to resume interrupted runs.
+
+    Each line records one completed range as JSON: first/last page number, a
+    hash of the pages' text and the markdown produced. Model output is split
+    at its page markers (see split_page_output), so most records cover a
+    single page; a page the model gave no marker stays with the page before
+    it. Lines are fsynced as they are written, so a crash can at worst leave
+    a torn final line, which is ignored on load. Because records are keyed by
+    page range and content rather than chunk index, a resumed run can reuse
+    them after the chunk plan changed, as long as each planned chunk is tiled
+    by recorded ranges whose text is unchanged.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._by_first_page: Dict[int, list] = {}
+        self._lock = threading.Lock()
+        self._file = None
+
+    @staticmethod
+    def pages_hash(pages: list) -> str:
+        """Hash the page numbers and text of a page range."""
+        digest = hashlib.sha256()
+        for page in pages:
+            digest.update(f"{page['page_num']}\0{page['text']}\0".encode("utf-8"))
+        return digest.hexdigest()
+
+    def load(self) -> int:
+        """Read existing records; returns the number loaded."""
+        count = 0
+        if not self.path.exists():
+            return count
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    first_page = record['first_page']
+                    record['last_page'], record['hash'], record['content']
+                except (ValueError, KeyError, TypeError):
+                    continue  # Torn or foreign line
+                self._by_first_page.setdefault(first_page, []).append(record)
+                count += 1
+        return count
+
+    def lookup(self, chunk_pages: list) -> Optional[str]:
+        """Return markdown for the pages if recorded ranges tile them exactly, else None."""
+        parts = []
+        pos = 0
+        while pos < len(chunk_pages):
+            candidates = self._by_first_page.get(chunk_pages[pos]['page_num'], [])
+            for record in sorted(candidates, key=lambda r: r['last_page'], reverse=True):
+                end = pos
+                while end < len(chunk_pages) and chunk_pages[end]['page_num'] <= record['last_page']:
+                    end += 1
+                sub_pages = chunk_pages[pos:end]
+                if sub_pages[-1]['page_num'] == record['last_page'] and \
+                        self.pages_hash(sub_pages) == record['hash']:
+                    parts.append(record['content'])
+                    pos = end
+                    break
+            else:
+                return None
+        return "\n\n".join(parts)
+
+    def append(self, chunk_pages: list, content: str) -> None:
+        """Durably record the markdown for a page range, split per page where its markers allow."""
+        self.append_pieces(split_page_output(content, chunk_pages))
+
+    def append_pieces(self, pieces: list) -> None:
+        """Durably record (pages, markdown) pieces in one write."""
+        records = [{
+            'first_page': pages[0]['page_num'],
+            'last_page': pages[-1]['page_num'],
+            'hash': self.pages_hash(pages),
+            'content': markdown
+        } for pages, markdown in pieces]
+        lines = "".join(json.dumps(record) + "\n" for record in records)
+
+        with self._lock:
+            if self._file is None:
+                # Start on a fresh line if the previous run left a torn record
+                torn = False
+                if self.path.exists() and self.path.stat().st_size > 0:
+                    with open(self.path, 'rb') as f:
+                        f.seek(-1, os.SEEK_END)
+                        torn = f.read(1) != b"\n"
+                self._file = open(self.path, 'a', encoding='utf-8')
+                if torn:
+                    self._file.write("\n")
+            self._file.write(lines)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            for record in records:
+                self._by_first_page.setdefault(record['first_page'], []).append(record)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def remove(self) -> None:
+        """Delete the journal once its contents are safely in the final output."""
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
+
+
+# Pages handed to each extraction worker process per task
+EXTRACT_BATCH_PAGES = 16
+
+# Extraction batches per worker kept outstanding, including the one being consumed
+EXTRACT_BATCHES_AHEAD = 2
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> list:
+    """Extract the text of pages [start, end) in a worker process."""
+    doc = fitz.open(pdf_path)
+    try:
+        return [doc[page_num].get_text() for page_num in range(start, end)]
+    finally:
+        doc.close()
+
+
+def iter_page_texts(pdf_path: Path, total_pages: int, workers: int = 1) -> Iterator[tuple]:
+    """
+    Yield (page_num, text) for the first total_pages pages, in page order.
+
+    With more than one worker, page ranges are extracted in parallel by a
+    process pool, each worker opening its own copy of the document, and
+    results are streamed back in order as soon as each range is ready.
+    """
+    if workers <= 1 or total_pages <= EXTRACT_BATCH_PAGES:
+        doc = fitz.open(pdf_path)
+        try:
+            for page_num in range(total_pages):
+                yield page_num + 1, doc[page_num].get_text()
+        finally:
+            doc.close()
+        return
+
+    yield from _iter_ranges_in_pool(_extract_page_range, pdf_path, total_pages, workers)
+
+
+def _iter_ranges_in_pool(extract_range, path: Path, total_pages: int, workers: int,
+                         *args) -> Iterator[tuple]:
+    """
+    Run extract_range(path, start, end, *args) over batches of pages on a process pool, in order.
+
+    At most EXTRACT_BATCHES_AHEAD batches per worker are outstanding; the next
+    batch is submitted as each one is consumed, so a slow consumer (such as a
+    throttled conversion) holds back extraction instead of buffering the
+    whole document.
+    """
+    starts = iter(range(0, total_pages, EXTRACT_BATCH_PAGES))
+    pending: deque = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            for start in starts:
+                end = min(start + EXTRACT_BATCH_PAGES, total_pages)
+                pending.append((start, executor.submit(extract_range, str(path), start, end, *args)))
+                if len(pending) >= EXTRACT_BATCHES_AHEAD * workers:
+                    break
+            if not pending:
+                return
+            start, future = pending.popleft()
+            for offset, text in enumerate(future.result()):
+                yield start + offset + 1, text
+
+
+def _open_presentation(pptx_path: str):
+    """Open a .pptx file with python-pptx, which is only needed for slide decks."""
+    try:
+        from pptx import Presentation
+    except ImportError:
+        raise Exception("python-pptx is required for .pptx sources (pip install python-pptx)")
+    return Presentation(pptx_path)
+
+
+def _shape_text(shape, image_dir: Optional[str], image_name: str,
+                link_base: Optional[str] = None) -> Optional[str]:
+    """Return the text of one slide shape, or None if it has none worth keeping."""
+    from pptx.enum.shapes import MSO_SHAPE_TYPE, PP_PLACEHOLDER
+
+    # Slide numbers, footers and dates repeat on every slide
+    if shape.is_placeholder and shape.placeholder_format.type in (
+            PP_PLACEHOLDER.SLIDE_NUMBER, PP_PLACEHOLDER.FOOTER, PP_PLACEHOLDER.DATE):
+        return None
+
+    if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+        parts = [
+            _shape_text(child, image_dir, f"{image_name}_{i + 1}", link_base)
+            for i, child in enumerate(_reading_order(shape.shapes))
+        ]
+        return "\n".join(part for part in parts if part) or None
+
+    if shape.has_table:
+        rows = []
+        for row in shape.table.rows:
+            cells = [cell.text.replace("\n", " ").strip() for cell in row.cells]
+            if any(cells):
+                rows.append("| " + " | ".join(cells) + " |")
+        return "\n".join(rows) or None
+
+    if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
+        if image_dir is None:
+            return None
+        image = shape.image
+        image_path = Path(image_dir) / f"{image_name}.{image.ext}"
+        image_path.write_bytes(image.blob)
+        alt_text = "".join(shape.element.xpath("./p:nvPicPr/p:cNvPr/@descr")) or shape.name
+        link = Path(os.path.relpath(image_path, link_base)) if link_base else image_path
+        return f"![{alt_text}]({link.as_posix()})"
+
+    if shape.has_text_frame:
+        lines = []
+        for paragraph in shape.text_frame.paragraphs:
+            text = "".join(run.text for run in paragraph.runs).strip()
+            if text:
+                lines.append("  " * paragraph.level + text)
+        return "\n".join(lines) or None
+
+    return None
+
+
+def _reading_order(shapes) -> list:
+    """Sort shapes top to bottom, then left to right."""
+    return sorted(shapes, key=lambda shape: (shape.top or 0, shape.left or 0))
+
+
+def _extract_slide_range(pptx_path: str, start: int, end: int,
+                         image_dir: Optional[str] = None, link_base: Optional[str] = None) -> list:
+    """
+    Extract slides [start, end) as (text, title) pairs in a worker process.
+
+    A slide's text is its shapes' text in reading order, with tables as pipe
+    separated rows and speaker notes at the end. Pictures are skipped unless
+    image_dir is given, in which case they are saved there and referenced
+    by a path relative to link_base (the output directory).
+    """
+    presentation = _open_presentation(pptx_path)
+    slides = list(presentation.slides)[start:end]
+    stem = Path(pptx_path).stem
+
+    results = []
+    for slide_num, slide in enumerate(slides, start + 1):
+        parts = []
+        for i, shape in enumerate(_reading_order(slide.shapes)):
+            text = _shape_text(shape, image_dir, f"{stem}_slide{slide_num}_{i + 1}", link_base)
+            if text:
+                parts.append(text)
+
+        if slide.has_notes_slide:
+            notes = slide.notes_slide.notes_text_frame.text.strip()
+            if notes:
+                parts.append(f"Speaker notes:\n{notes}")
+
+        title_shape = slide.shapes.title
+        title = title_shape.text_frame.text.strip() if title_shape is not None else ""
+        results.append(("\n\n".join(parts), title))
+    return results
+
+
+def iter_slide_texts(pptx_path: Path, total_slides: int, workers: int = 1,
+                     image_dir: Optional[Path] = None, link_base: Optional[Path] = None) -> Iterator[tuple]:
+    """
+    Yield (slide_num, (text, title)) for the first total_slides slides, in order.
+
+    Like iter_page_texts, batches of slides are extracted by a process pool
+    when more than one worker is requested.
+    """
+    image_dir = str(image_dir) if image_dir else None
+    link_base = str(link_base) if link_base else None
+    if workers <= 1 or total_slides <= EXTRACT_BATCH_PAGES:
+        slides = _extract_slide_range(str(pptx_path), 0, total_slides, image_dir, link_base)
+        for offset, slide in enumerate(slides):
+            yield offset + 1, slide
+        return
+
+    yield from _iter_ranges_in_pool(_extract_slide_range, pptx_path, total_slides, workers,
+                                    image_dir, link_base)
+
+
+# Fonts treated as monospace (code) in layout extraction, besides those flagged as such
+MONOSPACE_FONT_RE = re.compile(r"courier|mono|consol|menlo|lucida ?console", re.IGNORECASE)
+
+# Prose (characters outside tables, code and headings) a page may have and still be
+# converted entirely locally by layout extraction
+LAYOUT_LOCAL_PROSE_CHARS = 300
+
+# Dot leaders and a page number ending a table of contents line
+TOC_LEADER_RE = re.compile(r"\s*\.{4,}\s*\d+$")
+
+# Font size ratios to the page's body text for heading levels 1-3
+HEADING_SIZE_RATIOS = (1.6, 1.3, 1.1)
+
+# Complexity score per layout feature found on a page; pages scoring at most
+# SIMPLE_PAGE_MAX_SCORE are formatted locally when simple-page routing is on
+COMPLEXITY_WEIGHTS = {'table': 3, 'code': 2, 'columns': 2, 'aligned': 2}
+SIMPLE_PAGE_MAX_SCORE = 0
+
+# Ruling lines in each direction that mark a drawn table
+COMPLEXITY_RULE_LINES = 3
+
+# Monospace characters that mark a page as containing code
+COMPLEXITY_CODE_CHARS = 20
+
+# Characters a text block needs to count towards a multi-column layout
+COMPLEXITY_COLUMN_CHARS = 40
+
+# Rows with three or more separately placed lines that mark an unruled table
+COMPLEXITY_ALIGNED_ROWS = 3
+
+
+def _markdown_table(rows: list) -> Optional[str]:
+    """Render extracted table rows as a GitHub table, taking the first row as the header."""
+    rows = [
+        [(cell or "").replace("\n", " ").replace("|", "\\|").strip() for cell in row]
+        for row in rows
+    ]
+    rows = [row for row in rows if any(row)]
+    if len(rows) < 2:
+        return None
+    lines = ["| " + " | ".join(rows[0]) + " |", "|" + " --- |" * len(rows[0])]
+    lines.extend("| " + " | ".join(row) + " |" for row in rows[1:])
+    return "\n".join(lines)
+
+
+def _guess_code_language(code: str) -> str:
+    """Pick a fence language for the guide's code samples (VBA, C# or SQL), if obvious."""
+    if re.search(r"^\s*(Dim|Set|Sub|End Sub|Private|Public Sub)\b", code, re.MULTILINE):
+        return "vb"
+    if re.search(r"^\s*(SELECT|UPDATE|INSERT|DELETE)\b", code, re.MULTILINE | re.IGNORECASE):
+        return "sql"
+    if re.search(r";\s*$", code, re.MULTILINE) and "{" in code:
+        return "csharp"
+    return ""
+
+
+def _is_monospace(span: dict) -> bool:
+    """Whether a text span is set in a monospace font."""
+    return bool(span['flags'] & 8 or MONOSPACE_FONT_RE.search(span['font']))
+
+
+def _text_blocks(page) -> list:
+    return [block for block in page.get_text("dict")['blocks'] if block['type'] == 0]
+
+
+def score_page_complexity(page, blocks: Optional[list] = None) -> tuple:
+    """
+    Score how hard a PDF page is to convert without the model.
+
+    Looks for the layouts plain text extraction loses: drawn tables (ruling
+    lines in both directions), code (monospace text), multiple columns (text
+    blocks side by side) and unruled tables (several rows of lines placed
+    apart at the same height). Only drawing and text positions are used, so
+    this is much cheaper than table detection.
+
+    Returns:
+        tuple: (score, list of features found - keys of COMPLEXITY_WEIGHTS)
+    """
+    if blocks is None:
+        blocks = _text_blocks(page)
+    features = []
+
+    horizontal = vertical = 0
+    for drawing in page.get_drawings():
+        for item in drawing['items']:
+            if item[0] == 'l':
+                width, height = abs(item[2].x - item[1].x), abs(item[2].y - item[1].y)
+            elif item[0] == 're':
+                width, height = item[1].width, item[1].height
+            else:
+                continue
+            if width > 20 and height < 2:
+                horizontal += 1
+            elif height > 20 and width < 2:
+                vertical += 1
+            elif width > 20 and height > 20:
+                # A box contributes two rules each way
+                horizontal += 2
+                vertical += 2
+    if horizontal >= COMPLEXITY_RULE_LINES and vertical >= COMPLEXITY_RULE_LINES:
+        features.append('table')
+
+    code_chars = sum(
+        len(span['text'].strip())
+        for block in blocks for line in block['lines'] for span in line['spans']
+        if _is_monospace(span)
+    )
+    if code_chars >= COMPLEXITY_CODE_CHARS:
+        features.append('code')
+
+    texts = [
+        fitz.Rect(block['bbox']) for block in blocks
+        if sum(len(span['text'].strip()) for line in block['lines'] for span in line['spans'])
+        >= COMPLEXITY_COLUMN_CHARS
+    ]
+    for i, a in enumerate(texts):
+        if any(
+            (a.x1 <= b.x0 or b.x1 <= a.x0)
+            and min(a.y1, b.y1) - max(a.y0, b.y0) > 0.5 * min(a.height, b.height)
+            for b in texts[i + 1:]
+        ):
+            features.append('columns')
+            break
+
+    rows: Dict[int, list] = {}
+    for block in blocks:
+        for line in block['lines']:
+            if any(span['text'].strip() for span in line['spans']):
+                rows.setdefault(round(line['bbox'][1] / 3), []).append(line['bbox'][0])
+    aligned = 0
+    for xs in rows.values():
+        xs.sort()
+        if 1 + sum(1 for left, right in zip(xs, xs[1:]) if right - left > 20) >= 3:
+            aligned += 1
+    if aligned >= COMPLEXITY_ALIGNED_ROWS:
+        features.append('aligned')
+
+    return sum(COMPLEXITY_WEIGHTS[feature] for feature in features), features
+
+
+def _layout_page(page, detect_tables: bool = True, blocks: Optional[list] = None) -> tuple:
+    """
+    Render a page from its text blocks and detected tables.
+
+    Tables with at least two rows and columns become markdown tables; runs of
+    lines set entirely in a monospace font become fenced code blocks (with
+    indentation recovered from their x positions); single lines set larger
+    than the page's body text become headings, and short bold lines bold
+    run-in headings; table of contents lines become list items without their
+    page numbers; everything else is joined into paragraphs, broken at
+    vertical gaps. Items are emitted in reading order. Without
+    detect_tables this is a plain formatter for pages with no tables.
+
+    Returns:
+        tuple: (markdown text, whether the page is fully handled locally - it
+                has tables or code and little remaining prose)
+    """
+    tables = [
+        table for table in page.find_tables().tables
+        if table.row_count >= 2 and table.col_count >= 2
+    ] if detect_tables else []
+    table_rects = [fitz.Rect(table.bbox) for table in tables]
+
+    items = []  # (y, x, kind, content)
+    for table, rect in zip(tables, table_rects):
+        markdown = _markdown_table(table.extract())
+        if markdown:
+            items.append((rect.y0, rect.x0, 'table', markdown))
+
+    # Body size is the most common size by characters, ignoring code
+    if blocks is None:
+        blocks = _text_blocks(page)
+    sizes: Counter = Counter()
+    for block in blocks:
+        for line in block['lines']:
+            for span in line['spans']:
+                if not _is_monospace(span):
+                    sizes[round(span['size'], 1)] += len(span['text'].strip())
+    body_size = sizes.most_common(1)[0][0] if sizes else 0
+
+    for block in blocks:
+        paragraph = []
+        code = []
+        last_bottom = 0.0
+
+        def flush():
+            if paragraph:
+                text = " ".join(line_text for _, _, line_text in paragraph)
+                items.append((paragraph[0][0], paragraph[0][1], 'prose', text))
+                paragraph.clear()
+            if code:
+                left = min(x for _, x, _, _ in code)
+                # Monospace glyphs are about 0.6 em wide
+                lines = [" " * round((x - left) / max(1.0, size * 0.6)) + text for _, x, size, text in code]
+                items.append((code[0][0], left, 'code', "\n".join(lines)))
+                code.clear()
+
+        for line in block['lines']:
+            spans = [span for span in line['spans'] if span['text'].strip()]
+            if not spans:
+                continue
+            bbox = fitz.Rect(line['bbox'])
+            if any(rect.contains(fitz.Point((bbox.x0 + bbox.x1) / 2, (bbox.y0 + bbox.y1) / 2))
+                   for rect in table_rects):
+                continue
+
+            text = "".join(span['text'] for span in line['spans']).rstrip()
+            size = max(span['size'] for span in spans)
+
+            if all(_is_monospace(span) for span in spans):
+                if paragraph:
+                    flush()
+                code.append((bbox.y0, bbox.x0, size, text))
+                continue
+            if code:
+                flush()
+
+            level = next((i + 1 for i, ratio in enumerate(HEADING_SIZE_RATIOS)
+                          if body_size and size >= body_size * ratio), None)
+            if level and len(block['lines']) == 1 and len(text) < 120:
+                items.append((bbox.y0, bbox.x0, 'heading', "#" * level + " " + text.strip()))
+                continue
+
+            text = text.strip()
+            leader = TOC_LEADER_RE.search(text)
+            if leader:
+                # Table of contents entry; page numbers mean nothing in markdown
+                flush()
+                items.append((bbox.y0, bbox.x0, 'prose', "- " + text[:leader.start()].strip()))
+                continue
+            if all(span['flags'] & 16 for span in spans) and len(text) < 80 and text[-1] not in ".,;":
+                # A short bold line is a run-in heading
+                flush()
+                items.append((bbox.y0, bbox.x0, 'prose', f"**{text}**"))
+                continue
+
+            # A gap of more than half a line starts a new paragraph
+            if paragraph and bbox.y0 - last_bottom > 0.5 * bbox.height:
+                flush()
+            if text[:1] in "•▪◦●":
+                flush()
+                text = "- " + text[1:].strip()
+            paragraph.append((bbox.y0, bbox.x0, text))
+            last_bottom = bbox.y1
+        flush()
+
+    items.sort(key=lambda item: (item[0], item[1]))
+
+    # Code samples are often split into several blocks; merge neighbours back together
+    merged = []
+    for item in items:
+        if merged and item[2] == 'code' and merged[-1][2] == 'code':
+            y, x, kind, content = merged[-1]
+            merged[-1] = (y, x, kind, content + "\n" + item[3])
+        else:
+            merged.append(item)
+
+    parts = []
+    prose_chars = 0
+    for _, _, kind, content in merged:
+        if kind == 'code':
+            parts.append(f"```{_guess_code_language(content)}\n{content}\n```")
+        else:
+            parts.append(content)
+        if kind == 'prose':
+            prose_chars += len(content)
+
+    structured = any(kind in ('table', 'code') for _, _, kind, _ in merged)
+    return "\n\n".join(parts), structured and prose_chars <= LAYOUT_LOCAL_PROSE_CHARS
+
+
+def _analyze_page(page, layout: bool, route_simple: bool) -> dict:
+    """
+    Extract one page for iter_analyzed_pages.
+
+    Returns:
+        dict: 'text' for the model (layout markdown in layout mode, else plain
+              text), 'markdown' if the page needs no model call (else None),
+              and 'complexity'/'features' from score_page_complexity
+    """
+    blocks = _text_blocks(page)
+    score, features = score_page_complexity(page, blocks)
+    markdown = None
+    if layout:
+        text, local = _layout_page(page, blocks=blocks)
+        if local or (route_simple and score <= SIMPLE_PAGE_MAX_SCORE):
+            markdown = text
+    elif route_simple and score <= SIMPLE_PAGE_MAX_SCORE:
+        text = markdown = _layout_page(page, detect_tables=False, blocks=blocks)[0]
+    else:
+        text = page.get_text()
+    return {'text': text, 'markdown': markdown, 'complexity': score, 'features': features}
+
+
+def _extract_analyzed_range(pdf_path: str, start: int, end: int, layout: bool,
+                            route_simple: bool) -> list:
+    """Run _analyze_page on pages [start, end) in a worker process."""
+    doc = fitz.open(pdf_path)
+    try:
+        return [_analyze_page(doc[page_num], layout, route_simple) for page_num in range(start, end)]
+    finally:
+        doc.close()
+
+
+def iter_analyzed_pages(pdf_path: Path, total_pages: int, workers: int = 1, layout: bool = False,
+                        route_simple: bool = False) -> Iterator[tuple]:
+    """
+    Yield (page_num, analysis) for the first total_pages pages, in order.
+
+    Like iter_page_texts, but each page is scored for complexity and, with
+    layout or route_simple, rendered locally where possible (see
+    _analyze_page). Table detection is much slower than plain text
+    extraction, so extra workers help more in layout mode.
+    """
+    if workers <= 1 or total_pages <= EXTRACT_BATCH_PAGES:
+        doc = fitz.open(pdf_path)
+        try:
+            for page_num in range(total_pages):
+                yield page_num + 1, _analyze_page(doc[page_num], layout, route_simple)
+        finally:
+            doc.close()
+        return
+
+    yield from _iter_ranges_in_pool(_extract_analyzed_range, pdf_path, total_pages, workers,
+                                    layout, route_simple)
+
+
+# Pages buffered between the extractor and the chunk planner when pipelining
+PIPELINE_QUEUE_PAGES = 64
+
+
+class PrefetchIterator:
+    """
+    Pulls items from an iterable on a background thread into a bounded queue.
+
+    Iterating yields the items in order; the producer blocks while the queue
+    is full, which applies backpressure to the source. Exceptions raised by
+    the source are re-raised to the consumer. on_item, if set, is called from
+    the producer thread for every item produced; produced counts them.
+    """
+
+    _DONE = object()
+
+    def __init__(self, source: Iterable, maxsize: int):
+        self.on_item = None
+        self.produced = 0
+        self._source = source
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self) -> None:
+        try:
+            for item in self._source:
+                self.produced += 1
+                if self.on_item:
+                    self.on_item(item)
+                if not self._put((item, None)):
+                    break
+        except BaseException as e:
+            self._put((self._DONE, e))
+            return
+        finally:
+            if hasattr(self._source, 'close'):
+                self._source.close()
+        self._put((self._DONE, None))
+
+    def __iter__(self) -> "PrefetchIterator":
+        return self
+
+    def __next__(self):
+        item, error = self._queue.get()
+        if item is self._DONE:
+            if error is not None:
+                raise error
+            raise StopIteration
+        return item
+
+    def close(self) -> None:
+        """Stop the producer early and wait for it to release the source."""
+        self._stop.set()
+        self._thread.join()
+
+
+# Expected output tokens per input token (markdown adds syntax to the raw text)
+OUTPUT_TOKEN_RATIO = 1.2
+
+# Fraction of a chunk's budget after which the planner cuts at the next section start
+SECTION_MIN_FILL = 0.5
+
+
+def plan_chunks(pages: Iterable[dict], max_pages: int, target_tokens: int,
+                max_output_tokens: int, section_level: int = 2,
+                router: Optional["ModelRouter"] = None) -> Iterator[list]:
+    """
+    Pack consecutive pages into chunks against a token budget.
+
+    A chunk is closed before it would exceed target_tokens of estimated input,
+    before its estimated output would exceed max_output_tokens, or when it
+    reaches max_pages pages. A single page over budget becomes its own chunk.
+    Once a chunk is at least SECTION_MIN_FILL full, it is also closed before
+    any page that starts an outline section at or above section_level, so
+    sections are not split across model calls. Each page dict gets a
+    'tokens' estimate; pages already converted locally (with a 'markdown'
+    key) cost nothing against the budget. Pages are consumed lazily, so a
+    chunk is yielded as soon as it is full.
+
+    With a router that has a fast model, a run of model-bound pages that
+    would all go to the fast model (see ModelRouter.select) is also held to
+    the fast model's output cap, so routing a chunk to it cannot truncate
+    the response.
+
+    Args:
+        pages: Page dictionaries in document order
+        max_pages: Maximum pages per chunk
+        target_tokens: Target estimated input tokens per chunk
+        max_output_tokens: The primary model's max_tokens cap for a single response
+        section_level: Deepest outline level treated as a preferred boundary
+        router: Model router whose fast-model cap applies to fast-eligible runs
+
+    Yields:
+        Lists of page dictionaries
+    """
+    budget = min(target_tokens, int(max_output_tokens / OUTPUT_TOKEN_RATIO))
+    routed = router is not None and router.fast_model is not None
+    if routed:
+        fast_budget = min(budget, int(min(max_output_tokens, router.fast_max_tokens) / OUTPUT_TOKEN_RATIO))
+    chunk = []
+    chunk_tokens = 0
+    # The chunk's current run of model-bound pages, which is routed on its own
+    run_tokens = 0
+    run_fast = True
+
+    for page in pages:
+        local = page.get('markdown') is not None
+        page['tokens'] = 0 if local else estimate_tokens(page['text'])
+        fast = routed and not local and run_fast and router.fast_eligible(page)
+
+        starts_section = any(level <= section_level for level, _ in page.get('sections', []))
+        section_break = starts_section and (
+            chunk_tokens >= budget * SECTION_MIN_FILL or len(chunk) >= max_pages * SECTION_MIN_FILL
+        )
+        over_budget = (chunk_tokens + page['tokens'] > budget
+                       or (fast and run_tokens + page['tokens'] > fast_budget))
+
+        if chunk and (over_budget or len(chunk) >= max_pages or section_break):
+            yield chunk
+            chunk = []
+            chunk_tokens = 0
+            run_tokens = 0
+            run_fast = True
+
+        chunk.append(page)
+        chunk_tokens += page['tokens']
+        if local:
+            run_tokens = 0
+            run_fast = True
+        else:
+            run_tokens += page['tokens']
+            run_fast = routed and run_fast and router.fast_eligible(page)
+
+    if chunk:
+        yield chunk
+
+
+# Pages either side of a page that are compared with it to find running headers/footers
+CLEAN_WINDOW_PAGES = 10
+
+# Fraction of the window a line must appear in (and minimum pages) to count as repeated
+CLEAN_REPEAT_FRACTION = 0.4
+CLEAN_REPEAT_MIN_PAGES = 3
+
+# Non-empty lines at the top and bottom of a page that may be headers or footers
+CLEAN_EDGE_LINES = 3
+
+PAGE_NUMBER_RE = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+# Front-matter page numbers (i to cccxcix); only the first or last line of a page is checked,
+# since a lone word such as "vi" is also a valid numeral
+ROMAN_PAGE_NUMBER_RE = re.compile(r"^(?=[ivxlc]+$)c{0,3}(xc|xl|l?x{0,3})(ix|iv|v?i{0,3})$", re.IGNORECASE)
+HYPHENATED_WRAP_RE = re.compile(r"(\w)-\n(?=[a-z])")
+
+
+class PageCleaner:
+    """
+    Deterministic clean-up of extracted page text before it is sent to the model.
+
+    Running headers and footers are found by comparing the first and last few
+    lines of each page with those of the pages around it: a line (with digits
+    ignored, so "Page 12" matches "Page 13") that appears on enough
+    neighbouring pages is dropped, as are bare page numbers. Code fences, the
+    lines inside them and table rows from layout extraction are always kept.
+    Words hyphenated across a line break are rejoined and runs of whitespace
+    collapsed.
+
+    clean() works on a stream of pages, holding back only CLEAN_WINDOW_PAGES
+    pages of lookahead, and gives the same result whether the document is
+    extracted up front or pipelined. Token savings are tallied for summary().
+    remove_repeats=False keeps every line (for slide decks, whose footers are
+    already dropped and whose titles legitimately repeat).
+    """
+
+    def __init__(self, window: int = CLEAN_WINDOW_PAGES, remove_repeats: bool = True):
+        self.window = window
+        self.remove_repeats = remove_repeats
+        self.pages = 0
+        self.removed_lines = 0
+        self.dehyphenated = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    @staticmethod
+    def _normalize(line: str) -> str:
+        # Heading and bullet markers from layout extraction are ignored too
+        line = re.sub(r"^(#+|-)\s+", "", line.strip())
+        return re.sub(r"\s+", " ", re.sub(r"\d+", "#", line.lower()))
+
+    @staticmethod
+    def _edge_lines(lines: list) -> list:
+        """Indexes of the first and last few non-empty lines (fewer on short pages)."""
+        non_empty = [i for i, line in enumerate(lines) if line.strip()]
+        edge = max(1, min(CLEAN_EDGE_LINES, len(non_empty) // 4))
+        return sorted(set(non_empty[:edge] + non_empty[-edge:]))
+
+    @staticmethod
+    def _protected_lines(lines: list) -> set:
+        """Indexes of code fences, lines inside them and table rows, which are never dropped."""
+        protected = set()
+        in_fence = False
+        for i, line in enumerate(lines):
+            stripped = line.strip()
+            if stripped.startswith("```"):
+                in_fence = not in_fence
+                protected.add(i)
+            elif in_fence or (stripped.startswith("|") and stripped.endswith("|")):
+                protected.add(i)
+        return protected
+
+    def clean(self, pages: Iterable[dict]) -> Iterator[dict]:
+        """Yield cleaned copies of the page dicts, in order."""
+        buffer: deque = deque()
+        counts: Counter = Counter()
+        next_out = 0
+
+        def emit():
+            nonlocal next_out
+            first_index = buffer[0][0]
+            _, page, lines, _keys = buffer[next_out - first_index]
+            threshold = max(CLEAN_REPEAT_MIN_PAGES, math.ceil(CLEAN_REPEAT_FRACTION * len(buffer)))
+            cleaned = self._clean_page(page, lines, counts, threshold)
+            next_out += 1
+            # Pages more than a window behind the next page are no longer needed
+            while buffer and buffer[0][0] < next_out - self.window:
+                counts.subtract(buffer.popleft()[3])
+            return cleaned
+
+        for index, page in enumerate(pages):
+            lines = page['text'].splitlines()
+            keys = {self._normalize(lines[i]) for i in self._edge_lines(lines)}
+            buffer.append((index, page, lines, keys))
+            counts.update(keys)
+            if index - next_out >= self.window:
+                yield emit()
+
+        while buffer and next_out <= buffer[-1][0]:
+            yield emit()
+
+    def _clean_page(self, page: dict, lines: list, counts: Counter, threshold: int) -> dict:
+        drop = set()
+        # Layout markdown keeps its fences and table rows, whose normalized
+        # forms (digits ignored) repeat across pages
+        protected = self._protected_lines(lines)
+        edge = self._edge_lines(lines) if self.remove_repeats else []
+        for i in edge:
+            if i in protected:
+                continue
+            stripped = lines[i].strip()
+            outermost = i in (edge[0], edge[-1])
+            if (PAGE_NUMBER_RE.match(stripped) or (outermost and ROMAN_PAGE_NUMBER_RE.match(stripped))
+                    or counts[self._normalize(stripped)] >= threshold):
+                drop.add(i)
+
+        text = "\n".join(line for i, line in enumerate(lines) if i not in drop)
+        text, joined = HYPHENATED_WRAP_RE.subn(r"\1", text)
+
+        # Collapse runs of spaces inside lines (keeping indentation, and leaving
+        # fenced code from layout extraction alone) and runs of blank lines
+        collapsed = []
+        in_fence = False
+        for line in text.split("\n"):
+            if line.startswith("```"):
+                in_fence = not in_fence
+            elif not in_fence:
+                line = re.sub(r"(?<=\S)[ \t]+", " ", line)
+            collapsed.append(line.rstrip())
+        text = re.sub(r"\n{3,}", "\n\n", "\n".join(collapsed)).strip()
+
+        self.pages += 1
+        self.removed_lines += len(drop)
+        self.dehyphenated += joined
+        self.tokens_before += estimate_tokens(page['text'])
+        self.tokens_after += estimate_tokens(text)
+        cleaned = dict(page, text=text)
+        if page.get('markdown') is not None:
+            cleaned['markdown'] = text
+        return cleaned
+
+    def summary(self) -> dict:
+        saved = self.tokens_before - self.tokens_after
+        return {
+            'pages': self.pages,
+            'removed_lines': self.removed_lines,
+            'dehyphenated': self.dehyphenated,
+            'tokens_before': self.tokens_before,
+            'tokens_after': self.tokens_after,
+            'tokens_saved': saved,
+            'percent_saved': round(100 * saved / self.tokens_before, 1) if self.tokens_before else 0.0
+        }
+
+
+class RateLimitError(Exception):
+    """Raised when the provider keeps throttling a request after all retries."""
+
+
+class ChunkTimeoutError(Exception):
+    """Raised when a chunk request keeps timing out or stalling after all retries."""
+
+    def __init__(self, message: str, partial: str = ""):
+        super().__init__(message)
+        self.partial = partial
+
+
+class ContextOverflowError(Exception):
+    """
+    Raised when a chunk does not fit the model's context window, or its
+    response was cut off at the output token limit.
+
+    ratio is how many times over the limit the request was, when the provider
+    says; partial holds any output received before a cut-off.
+    """
+
+    def __init__(self, message: str, partial: str = "", ratio: Optional[float] = None):
+        super().__init__(message)
+        self.partial = partial
+        self.ratio = ratio
+
+
+class OutputValidationError(Exception):
+    """Raised when a response fails validate_chunk_output; problems lists why."""
+
+    def __init__(self, message: str, problems: list):
+        super().__init__(message)
+        self.problems = problems
+
+
+class EmptyResponseError(OutputValidationError):
+    """Raised when a response's message has no content; the request is retried."""
+
+    def __init__(self, message: str):
+        super().__init__(message, ["empty response"])
+
+
+# Provider error messages for requests larger than the context window
+CONTEXT_OVERFLOW_RE = re.compile(
+    r"context.{0,20}(length|window|limit)|too (long|large)|maximum.{0,30}tokens",
+    re.IGNORECASE
+)
+
+
+def context_overflow_error(chunk_label: str, status: int, body: str) -> Optional[ContextOverflowError]:
+    """Return a ContextOverflowError if an HTTP error response is a context-length rejection."""
+    if status not in (400, 413) or not CONTEXT_OVERFLOW_RE.search(body):
+        return None
+
+    # e.g. "maximum context length is 200000 tokens. However, you requested about 260000 tokens"
+    numbers = [int(n.replace(',', '')) for n in re.findall(r"(\d[\d,]*) tokens", body)]
+    ratio = None
+    if len(numbers) >= 2 and 0 < numbers[0] < numbers[1]:
+        ratio = numbers[1] / numbers[0]
+    return ContextOverflowError(f"{chunk_label} exceeds the model's context (HTTP {status})", ratio=ratio)
+
+
+def strip_page_markers(markdown: str) -> str:
+    """Remove the per-page marker lines from converted markdown."""
+    return PAGE_MARKER_RE.sub("", markdown)
+
+
+# Estimated tokens of page text above which the page must have output
+VALIDATION_MIN_PAGE_TOKENS = 20
+
+# Smallest acceptable ratio of output to input characters for a chunk
+VALIDATION_MIN_OUTPUT_RATIO = 0.3
+
+
+def validate_chunk_output(content: str, chunk_pages: list) -> list:
+    """
+    Check a chunk response (with its page markers) for signs of lost content.
+
+    Returns:
+        list: Problems found - pages with text but no page marker, output much
+              shorter than the input, or an unclosed code fence (empty if valid)
+    """
+    problems = []
+    marked = {int(n) for n in PAGE_MARKER_RE.findall(content)}
+    missing = [
+        page['page_num'] for page in chunk_pages
+        if page['page_num'] not in marked and estimate_tokens(page['text']) > VALIDATION_MIN_PAGE_TOKENS
+    ]
+    if missing:
+        problems.append(f"no output for pages {', '.join(map(str, missing))}")
+
+    input_chars = sum(len(page['text'].strip()) for page in chunk_pages)
+    output_chars = len(strip_page_markers(content).strip())
+    if input_chars and output_chars < VALIDATION_MIN_OUTPUT_RATIO * input_chars:
+        problems.append(f"output is {output_chars / input_chars:.0%} of the input length")
+
+    if _unclosed_fence(content):
+        problems.append("unclosed code block")
+    return problems
+
+
+def _unclosed_fence(markdown: str) -> bool:
+    return len(re.findall(r"^[ \t]*```", markdown, re.MULTILINE)) % 2 == 1
+
+
+# Placeholders left in the output for pages that could not be converted
+FAILED_OUTPUT_RE = re.compile(r"<!-- (Failed to process page \d+|No content generated for [^>]*) -->")
+
+# Share of each page's distinctive source words its range's output must contain
+VALIDATION_MIN_COVERAGE = 0.6
+
+# Distinct source words a page needs before its coverage is checked at all
+VALIDATION_MIN_WORDS = 20
+
+# Output size, as a fraction of the output token cap, that suggests a cut-off response
+VALIDATION_TRUNCATION_FRACTION = 0.9
+
+
+def _table_problems(markdown: str) -> list:
+    """Describe malformed markdown tables (outside code blocks)."""
+    problems = []
+    table: list = []
+    in_fence = False
+
+    def check():
+        # A lone line starting with a pipe is more likely text than a table
+        if len(table) < 2:
+            table.clear()
+            return
+        if not re.match(r"^\|?\s*:?-{3,}", table[1]):
+            problems.append("table without a header separator")
+        else:
+            columns = [len(re.split(r"(?<!\\)\|", row.strip("|"))) for row in table]
+            if any(count != columns[0] for count in columns[2:]):
+                problems.append(f"table rows with a different number of cells than the "
+                                f"{columns[0]}-column header")
+        table.clear()
+
+    for line in markdown.split("\n"):
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            in_fence = not in_fence
+        if not in_fence and stripped.startswith("|"):
+            table.append(stripped)
+        else:
+            check()
+    check()
+    return problems
+
+
+def validate_output_range(markdown: str, pages: list, max_tokens: int) -> list:
+    """
+    Check the converted markdown for a page range against its source pages.
+
+    Looks for failure placeholders, pages whose distinctive words are mostly
+    missing from the output (dropped or replaced content), unclosed code
+    blocks, malformed tables and output close to the output token cap (a
+    likely cut-off).
+
+    Returns:
+        list: Problems found (empty if the range looks sound)
+    """
+    problems = [f"placeholder: {match.group(1)}" for match in FAILED_OUTPUT_RE.finditer(markdown)]
+
+    output_words = set(re.findall(r"[a-z][a-z0-9_]{3,}", markdown.lower()))
+    missing = []
+    for page in pages:
+        source_words = set(re.findall(r"[a-z][a-z0-9_]{3,}", page['text'].lower()))
+        if len(source_words) >= VALIDATION_MIN_WORDS:
+            coverage = len(source_words & output_words) / len(source_words)
+            if coverage < VALIDATION_MIN_COVERAGE:
+                missing.append(f"{page['page_num']} ({coverage:.0%})")
+    if missing:
+        problems.append(f"low coverage of source words on pages {', '.join(missing)}")
+
+    if _unclosed_fence(markdown):
+        problems.append("unclosed code block")
+    problems.extend(_table_problems(markdown))
+
+    if estimate_tokens(markdown) >= VALIDATION_TRUNCATION_FRACTION * max_tokens:
+        problems.append(f"output is near the {max_tokens:,}-token output cap")
+    return problems
+
+
+def page_map(pieces: list) -> list:
+    """
+    Locate each converted piece in the combined output.
+
+    pieces is a list of (pages, markdown) in page order, as joined by
+    DocumentJob.markdown().
+
+    Returns:
+        list: {'first_page', 'last_page', 'start', 'end'} character ranges
+    """
+    ranges = []
+    offset = 0
+    for pages, markdown in pieces:
+        ranges.append({
+            'first_page': pages[0]['page_num'],
+            'last_page': pages[-1]['page_num'],
+            'start': offset,
+            'end': offset + len(markdown)
+        })
+        offset += len(markdown) + 2
+    return ranges
+
+
+def split_page_output(content: str, chunk_pages: list) -> list:
+    """
+    Split a chunk's output into per-page pieces at its page markers.
+
+    Text before the first marker goes with the first page, and a page without
+    a marker of its own stays in the piece before it, so the pieces always
+    tile chunk_pages. Output without markers is a single piece.
+
+    Returns:
+        list: (pages, markdown) pairs in page order, markers removed
+    """
+    positions = {page['page_num']: i for i, page in enumerate(chunk_pages)}
+    cuts = [(0, 0)]
+    for match in PAGE_MARKER_RE.finditer(content):
+        index = positions.get(int(match.group(1)))
+        if index is not None and index > cuts[-1][0]:
+            cuts.append((index, match.start()))
+    cuts.append((len(chunk_pages), len(content)))
+
+    return [
+        (chunk_pages[index:next_index], strip_page_markers(content[start:next_start]).strip())
+        for (index, start), (next_index, next_start) in zip(cuts, cuts[1:])
+    ]
+
+
+def split_partial_output(partial: str, chunk_pages: list) -> tuple:
+    """
+    Credit a cut-off response to the pages it completed.
+
+    A page counts as complete once the marker of a later page in the chunk has
+    started. Returns (markdown, completed_pages, remaining_pages).
+    """
+    if not partial:
+        return "", [], chunk_pages
+
+    positions = {page['page_num']: i for i, page in enumerate(chunk_pages)}
+    cut, completed = None, 0
+    for match in PAGE_MARKER_RE.finditer(partial):
+        index = positions.get(int(match.group(1)))
+        if index is not None and index > completed:
+            cut, completed = match.start(), index
+
+    if cut is None:
+        return "", [], chunk_pages
+    markdown = strip_page_markers(partial[:cut]).strip()
+    return markdown, chunk_pages[:completed], chunk_pages[completed:]
+
+
+def split_local_runs(pages: list) -> list:
+    """
+    Split a chunk into contiguous runs of locally converted and model-bound pages.
+
+    Returns:
+        list: (local, pages) pairs in page order
+    """
+    runs = []
+    for page in pages:
+        local = page.get('markdown') is not None
+        if runs and runs[-1][0] == local:
+            runs[-1][1].append(page)
+        else:
+            runs.append((local, [page]))
+    return runs
+
+
+def split_pages(pages: list, pieces: int) -> list:
+    """Split pages into at most `pieces` contiguous runs of roughly equal estimated tokens."""
+    pieces = max(1, min(pieces, len(pages)))
+    tokens = [page.get('tokens') or estimate_tokens(page['text']) for page in pages]
+    target = sum(tokens) / pieces
+
+    runs, current, total = [], [], 0
+    for i, (page, page_tokens) in enumerate(zip(pages, tokens)):
+        current.append(page)
+        total += page_tokens
+        pieces_left = pieces - len(runs) - 1
+        pages_left = len(pages) - i - 1
+        if pieces_left and (total >= target * (len(runs) + 1) or pages_left == pieces_left):
+            runs.append(current)
+            current = []
+    if current:
+        runs.append(current)
+    return runs
+
+
+def plan_recovery(chunk_pages: list, error: Exception) -> tuple:
+    """
+    Decide how to retry a failed chunk.
+
+    Output that streamed in before the failure is kept for the pages it
+    completed. The rest is split according to the failure: a context-length
+    rejection is split by the ratio the provider reported (or into quarters),
+    a response truncated at the output limit into runs no longer than the
+    part that fit, and timeouts or other errors in half.
+
+    Returns:
+        tuple: (reused_markdown, reused_pages, list of page runs to retry)
+    """
+    markdown, completed, remaining = split_partial_output(getattr(error, 'partial', ""), chunk_pages)
+    if not remaining:
+        return markdown, completed, []
+
+    pieces = 2
+    if isinstance(error, ContextOverflowError):
+        if error.ratio:
+            pieces = math.ceil(error.ratio * 1.2)
+        elif completed:
+            pieces = math.ceil(len(remaining) / len(completed))
+        else:
+            pieces = 4
+    elif completed:
+        # The stalled request already made progress; retry the rest as one request
+        pieces = 1
+
+    return markdown, completed, split_pages(remaining, max(1, pieces))
+
+
+class AdaptiveRateLimiter:
+    """
+    Client-side rate limiter shared by every worker of a conversion run.
+
+    Combines a token bucket (steady request rate with a small burst allowance)
+    with AIMD concurrency control: each successful response raises the
+    in-flight limit additively, while a 429 or 5xx halves it and pauses all
+    workers for the provider's Retry-After (or an exponential backoff when the
+    header is missing), with jitter so workers don't resume in lockstep.
+    Callers hold a slot for each request with slot() or slot_async(), which
+    always return it, so the same limiter serves both the thread and asyncio
+    engines.
+    """
+
+    THROTTLE_STATUSES = {429, 500, 502, 503, 504, 529}
+
+    def __init__(self, max_concurrency: int, requests_per_second: float = 10.0,
+                 burst: Optional[int] = None, jitter: float = 0.25):
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests_per_second = requests_per_second
+        self.burst = burst or self.max_concurrency
+        self.jitter = jitter
+
+        self.limit = float(self.max_concurrency)
+        self.throttle_events = 0
+
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._backoff = 1.0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """Take a request slot; returns 0 on success or the seconds to wait before retrying."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self._in_flight >= int(self.limit):
+                return 0.05
+
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.requests_per_second)
+            self._last_refill = now
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.requests_per_second
+
+            self._tokens -= 1
+            self._in_flight += 1
+            return 0.0
+
+    def acquire(self) -> None:
+        """Block the calling thread until a request slot is available."""
+        while True:
+            delay = self.try_acquire()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """Wait on the event loop until a request slot is available."""
+        while True:
+            delay = self.try_acquire()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold a request slot for the duration of a with block.
+
+        The slot is returned on exit however the block ends; call record()
+        on the yielded RequestSlot once a response has been read so the
+        limiter can adapt to it, then check its backoff after the block.
+        """
+        self.acquire()
+        request_slot = RequestSlot()
+        try:
+            yield request_slot
+        finally:
+            request_slot.backoff = self.release(request_slot.status, request_slot.headers)
+
+    @asynccontextmanager
+    async def slot_async(self):
+        """Async counterpart of slot()."""
+        await self.acquire_async()
+        request_slot = RequestSlot()
+        try:
+            yield request_slot
+        finally:
+            request_slot.backoff = self.release(request_slot.status, request_slot.headers)
+
+    def release(self, status: Optional[int] = None, headers=None) -> Optional[float]:
+        """
+        Return a request slot and adapt to the response.
+
+        Args:
+            status: HTTP status code, or None if the request never got a response
+            headers: Response headers (case-insensitive mapping)
+
+        Returns:
+            The global backoff in seconds if the response was throttled, else None
+        """
+        with self._lock:
+            self._in_flight -= 1
+            if status is None:
+                return None
+
+            now = time.monotonic()
+            if status in self.THROTTLE_STATUSES:
+                self.throttle_events += 1
+                self.limit = max(1.0, self.limit / 2)
+
+                delay = self._retry_after(headers)
+                if delay is None:
+                    delay = self._backoff
+                    self._backoff = min(self._backoff * 2, 60.0)
+                delay *= 1 + random.uniform(0, self.jitter)
+
+                self._paused_until = max(self._paused_until, now + delay)
+                return delay
+
+            if status < 400:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+                self._backoff = 1.0
+
+                reset_delay = self._exhausted_reset(headers)
+                if reset_delay:
+                    self._paused_until = max(self._paused_until, now + reset_delay)
+
+            return None
+
+    @staticmethod
+    def _retry_after(headers) -> Optional[float]:
+        """Parse Retry-After as delta-seconds or an HTTP date."""
+        value = headers.get('Retry-After') if headers else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _exhausted_reset(headers) -> Optional[float]:
+        """Seconds until the rate-limit window resets, if the remaining quota is zero."""
+        if not headers:
+            return None
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        if remaining is None or reset is None:
+            return None
+        try:
+            if float(remaining) > 0:
+                return None
+            reset = float(reset)
+        except ValueError:
+            return None
+
+        # Reset may be a delta, an epoch in seconds, or an epoch in milliseconds
+        if reset > 1e12:
+            reset = reset / 1000 - time.time()
+        elif reset > 1e9:
+            reset = reset - time.time()
+        return max(0.0, reset)
+
+
+class RequestSlot:
+    """A request slot held from AdaptiveRateLimiter.slot(); backoff is set when it is returned."""
+
+    def __init__(self):
+        self.status: Optional[int] = None
+        self.headers = None
+        self.backoff: Optional[float] = None
+
+    def record(self, status: int, headers=None) -> None:
+        """Note the response the slot was used for."""
+        self.status = status
+        self.headers = headers
+
+
+class StreamStalledError(Exception):
+    """Raised when a streamed response stops producing content; partial holds what arrived."""
+
+    def __init__(self, message: str, partial: str = ""):
+        super().__init__(message)
+        self.partial = partial
+
+
+class StreamEventError(StreamStalledError):
+    """Raised for an error event inside a streamed response; retried like a stalled stream."""
+
+
+class SSEAccumulator:
+    """
+    Incrementally assembles an OpenRouter server-sent event stream.
+
+    Lines are fed as they arrive; content deltas are accumulated and the time
+    to first token, finish reason and usage block are recorded. result()
+    returns the same shape as a non-streaming completion response.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.last_activity = self.started
+        self.first_token_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.parts: list = []
+        self.finish_reason: Optional[str] = None
+        self.usage: Optional[dict] = None
+        self.done = False
+
+    def feed(self, line) -> None:
+        """Consume one line of the event stream."""
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.rstrip('\r\n')
+        self.last_activity = time.monotonic()
+
+        # Blank separators and ": OPENROUTER PROCESSING" keep-alive comments
+        if not line.startswith('data:'):
+            return
+
+        data_text = line[5:].strip()
+        if data_text == '[DONE]':
+            self.done = True
+            self.finished_at = self.last_activity
+            return
+
+        try:
+            data = json.loads(data_text)
+        except json.JSONDecodeError:
+            return
+
+        if 'error' in data:
+            raise StreamEventError(f"stream error event: {data['error']}")
+
+        if data.get('choices'):
+            choice = data['choices'][0]
+            content = choice.get('delta', {}).get('content')
+            if content:
+                if self.first_token_at is None:
+                    self.first_token_at = self.last_activity
+                self.parts.append(content)
+            if choice.get('finish_reason'):
+                self.finish_reason = choice['finish_reason']
+
+        if data.get('usage'):
+            self.usage = data['usage']
+
+    def check_stalled(self, first_token_timeout: float) -> None:
+        """Raise StreamStalledError if no content has arrived within the timeout."""
+        if self.first_token_at is None and time.monotonic() - self.started > first_token_timeout:
+            raise StreamStalledError(f"no content after {first_token_timeout:.0f}s")
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        if self.first_token_at is None:
+            return None
+        end = self.finished_at or time.monotonic()
+        if end <= self.first_token_at:
+            return None
+        if self.usage and self.usage.get('completion_tokens'):
+            tokens = self.usage['completion_tokens']
+        else:
+            tokens = estimate_tokens(''.join(self.parts))
+        return tokens / (end - self.first_token_at)
+
+    def result(self) -> dict:
+        """Return the accumulated response as a completion-shaped dict."""
+        return {
+            'choices': [{
+                'message': {'role': 'assistant', 'content': ''.join(self.parts)},
+                'finish_reason': self.finish_reason
+            }],
+            'usage': self.usage
+        }
+
+
+def percentile(values: list, pct: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of numbers (None if empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+# Default model and output token cap for chunks
+DEFAULT_MODEL = "anthropic/claude-sonnet-4"
+DEFAULT_MAX_TOKENS = 50000
+
+# Failures of a fast-model chunk that ModelRouter can escalate to the primary model
+ESCALATION_RULES = ('invalid', 'truncated', 'error')
+
+
+class ModelRouter:
+    """
+    Picks the model for each chunk.
+
+    Without a fast model every chunk goes to the primary model. With one,
+    chunks whose pages all score at most fast_max_complexity (see
+    score_page_complexity) go to the fast model, with its own output token
+    cap. A fast-model response is validated (see validate_chunk_output), and
+    failures named in escalate_on are retried on the primary model:
+    'invalid' for responses that fail validation, 'truncated' for responses
+    cut off at the output cap or prompts over the context window, and
+    'error' for requests that keep failing. Other failures are handled as
+    they would be on the primary model.
+    """
+
+    def __init__(self, model: str = DEFAULT_MODEL, max_tokens: int = DEFAULT_MAX_TOKENS,
+                 fast_model: Optional[str] = None, fast_max_tokens: int = 16000,
+                 fast_max_complexity: int = 2, escalate_on: Iterable[str] = ('invalid', 'truncated')):
+        self.escalate_on = set(escalate_on)
+        unknown = self.escalate_on - set(ESCALATION_RULES)
+        if unknown:
+            raise ValueError(f"Unknown escalation rules: {', '.join(sorted(unknown))} "
+                             f"(expected {', '.join(ESCALATION_RULES)})")
+        self.model = model
+        self.max_tokens = max_tokens
+        self.fast_model = fast_model
+        self.fast_max_tokens = fast_max_tokens
+        self.fast_max_complexity = fast_max_complexity
+
+    @staticmethod
+    def page_complexity(page: dict) -> int:
+        """A page's complexity score; pages without one (slides) are scored from their text."""
+        if page.get('complexity') is not None:
+            return page['complexity']
+        # Slide tables are extracted as pipe-separated rows
+        if re.search(r"^\|.*\|$", page['text'], re.MULTILINE):
+            return COMPLEXITY_WEIGHTS['table']
+        return 0
+
+    def fast_eligible(self, page: dict) -> bool:
+        """Whether a page is simple enough for the fast model."""
+        return self.page_complexity(page) <= self.fast_max_complexity
+
+    def select(self, chunk_pages: list) -> tuple:
+        """
+        Returns:
+            tuple: (model, max_tokens, whether this is the fast tier)
+        """
+        if self.fast_model and all(self.fast_eligible(page) for page in chunk_pages):
+            return self.fast_model, self.fast_max_tokens, True
+        return self.model, self.max_tokens, False
+
+    def should_escalate(self, error: Exception) -> bool:
+        """Whether a fast-tier failure should be retried on the primary model."""
+        if isinstance(error, RateLimitError):
+            # Throttling is not the model's fault, and escalating would add load
+            return False
+        if isinstance(error, OutputValidationError):
+            return 'invalid' in self.escalate_on
+        if isinstance(error, ContextOverflowError):
+            return 'truncated' in self.escalate_on
+        return 'error' in self.escalate_on
+
+
+class RunMetrics:
+    """
+    Per-call instrumentation for a conversion run.
+
+    Every call to the chunk API, including cache hits, produces one record
+    with its page range, subdivision depth, queue wait (time spent waiting for
+    a worker and a rate-limiter slot), attempts, final HTTP status, wall time,
+    token usage and cost from the response's usage block, and streaming
+    metrics. If a log file is opened, records are appended to it as JSON lines
+    as soon as each call finishes.
+    """
+
+    def __init__(self):
+        self.calls: list = []
+        self.subdivisions = 0
+        self.reused_pages = 0
+        self.failed_pages = 0
+        self.local_pages = 0
+        self.model_pages = 0
+        self.page_features: Counter = Counter()
+        self.escalations = 0
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._log = None
+
+    def open_log(self, path: Path) -> None:
+        """Stream call records to a JSONL file."""
+        self._log = open(path, 'w', encoding='utf-8')
+
+    def close(self) -> None:
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def start_call(self, chunk_pages: list, chunk_label: str, depth: int = 0,
+                   queued_at: Optional[float] = None) -> dict:
+        """Begin a call record; pass it to finish_call when the call ends."""
+        now = time.monotonic()
+        return {
+            'chunk': chunk_label,
+            'first_page': chunk_pages[0]['page_num'],
+            'last_page': chunk_pages[-1]['page_num'],
+            'pages': len(chunk_pages),
+            'depth': depth,
+            'model': None,
+            'cached': False,
+            'queue_wait': now - queued_at if queued_at else 0.0,
+            'attempts': 0,
+            'throttled': 0,
+            'status': None,
+            'prompt_tokens': None,
+            'completion_tokens': None,
+            'cost': None,
+            'ttft': None,
+            'tokens_per_second': None,
+            'error': None,
+            '_started': now
+        }
+
+    def finish_call(self, call: dict) -> None:
+        """Complete a call record and log it."""
+        call['wall_time'] = time.monotonic() - call.pop('_started')
+        for key in ('wall_time', 'queue_wait', 'ttft', 'tokens_per_second', 'cost'):
+            if call[key] is not None:
+                call[key] = round(call[key], 6 if key == 'cost' else 3)
+
+        with self._lock:
+            self.calls.append(call)
+            if self._log is not None:
+                self._log.write(json.dumps(call) + "\n")
+                self._log.flush()
+
+    def record_subdivision(self, reused_pages: int = 0) -> None:
+        """Count a failed request that was split, and pages kept from its partial output."""
+        with self._lock:
+            self.subdivisions += 1
+            self.reused_pages += reused_pages
+
+    def record_failed_page(self) -> None:
+        with self._lock:
+            self.failed_pages += 1
+
+    def record_local_pages(self, pages: int) -> None:
+        """Count pages converted without a model call."""
+        with self._lock:
+            self.local_pages += pages
+
+    def record_escalation(self) -> None:
+        with self._lock:
+            self.escalations += 1
+
+    def record_model_pages(self, pages: list) -> None:
+        """Count pages routed to the model, by the complexity features that sent them there."""
+        with self._lock:
+            self.model_pages += len(pages)
+            for page in pages:
+                self.page_features.update(page.get('features', ()))
+
+    def summary(self) -> dict:
+        """Aggregate the call records."""
+        with self._lock:
+            calls = list(self.calls)
+
+        api_calls = [c for c in calls if not c['cached']]
+        latencies = [c['wall_time'] for c in api_calls if c['error'] is None]
+        ttfts = [c['ttft'] for c in api_calls if c['ttft'] is not None]
+        rates = [c['tokens_per_second'] for c in api_calls if c['tokens_per_second']]
+        costs = [c['cost'] for c in api_calls if c['cost'] is not None]
+
+        return {
+            'elapsed': round(time.time() - self.started, 3),
+            'calls': len(calls),
+            'cached_calls': len(calls) - len(api_calls),
+            'api_calls': len(api_calls),
+            'failed_calls': sum(1 for c in api_calls if c['error'] is not None),
+            'http_requests': sum(c['attempts'] for c in api_calls),
+            'retries': sum(max(0, c['attempts'] - 1) for c in api_calls),
+            'throttled': sum(c['throttled'] for c in api_calls),
+            'subdivisions': self.subdivisions,
+            'reused_pages': self.reused_pages,
+            'failed_pages': self.failed_pages,
+            'local_pages': self.local_pages,
+            'model_pages': self.model_pages,
+            'page_features': dict(self.page_features.most_common()),
+            'calls_by_model': dict(Counter(c['model'] for c in api_calls).most_common()),
+            'escalations': self.escalations,
+            'max_depth': max((c['depth'] for c in calls), default=0),
+            'prompt_tokens': sum(c['prompt_tokens'] or 0 for c in api_calls),
+            'completion_tokens': sum(c['completion_tokens'] or 0 for c in api_calls),
+            'cost': round(sum(costs), 6) if costs else None,
+            'latency_p50': percentile(latencies, 50),
+            'latency_p95': percentile(latencies, 95),
+            'latency_p99': percentile(latencies, 99),
+            'queue_wait_p95': percentile([c['queue_wait'] for c in api_calls], 95),
+            'ttft_p50': percentile(ttfts, 50),
+            'tokens_per_second_p50': percentile(rates, 50),
+            'slowest_calls': [
+                {k: c[k] for k in ('chunk', 'first_page', 'last_page', 'wall_time', 'attempts', 'status')}
+                for c in sorted(api_calls, key=lambda c: c['wall_time'], reverse=True)[:10]
+            ]
+        }
+
+    @classmethod
+    def combine(cls, runs: list) -> "RunMetrics":
+        """Merge the metrics of several runs, e.g. the documents of a batch."""
+        combined = cls()
+        for run in runs:
+            combined.calls.extend(run.calls)
+            combined.subdivisions += run.subdivisions
+            combined.reused_pages += run.reused_pages
+            combined.failed_pages += run.failed_pages
+            combined.local_pages += run.local_pages
+            combined.model_pages += run.model_pages
+            combined.page_features.update(run.page_features)
+            combined.escalations += run.escalations
+            combined.started = min(combined.started, run.started)
+        return combined
+
+    def write_report(self, path: Path, **extra) -> dict:
+        """Write the aggregated run report as JSON and return it."""
+        report = dict(extra)
+        report.update(self.summary())
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        return report
+
+
+class AsyncChunkEngine:
+    """
+    Runs chunk coroutines on a private asyncio event loop in a background thread.
+
+    All requests share one aiohttp session, so connections are kept alive and
+    reused, and a semaphore bounds the number of requests in flight. Coroutines
+    are submitted from synchronous code and tracked with regular
+    concurrent.futures.Future objects, so callers can wait() on them just as
+    they would with a ThreadPoolExecutor.
+    """
+
+    def __init__(self, concurrency: int = 16):
+        self.concurrency = concurrency
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+
+        self.session, self.semaphore = asyncio.run_coroutine_threadsafe(
+            self._open(), self.loop
+        ).result()
+
+    async def _open(self) -> tuple:
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        return aiohttp.ClientSession(connector=connector), asyncio.Semaphore(self.concurrency)
+
+    def submit(self, coro) -> Future:
+        """Schedule a coroutine on the engine's loop and return a Future for it."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def close(self) -> None:
+        """Close the shared session and stop the event loop."""
+        asyncio.run_coroutine_threadsafe(self.session.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+    def __enter__(self) -> "AsyncChunkEngine":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class DocumentJob:
+    """
+    Scheduling state for one document in a conversion run.
+
+    Holds the document's chunk source (a planned list or a pipelined planner),
+    its checkpoint journal and call metrics, and the results of its chunks as
+    they complete. A chunk may finish in several pieces (page runs converted
+    locally or split after a failure); chunk_parts holds (pages, markdown) for
+    those by first page until all are done, and completed_chunks the pieces
+    of each finished chunk in page order.
+    """
+
+    def __init__(self, name: str, chunk_source: Iterable[list], metrics: "RunMetrics",
+                 journal: Optional[CheckpointJournal] = None, num_chunks: Optional[int] = None,
+                 total_pages: Optional[int] = None, page_feed: Optional[PrefetchIterator] = None,
+                 label_prefix: str = ""):
+        self.name = name
+        self.chunks = enumerate(chunk_source)
+        self.metrics = metrics
+        self.journal = journal
+        self.num_chunks = num_chunks
+        self.total_pages = total_pages
+        self.page_feed = page_feed
+        self.label_prefix = label_prefix
+
+        self.exhausted = False
+        self.completed_chunks: Dict[int, list] = {}
+        self.chunk_parts: Dict[int, Dict[int, tuple]] = {}
+        self.outstanding: Dict[int, int] = {}
+        self.planned = 0
+        self.resumed = 0
+        self.pages_processed = 0
+        self.task = None
+
+    def chunk_label(self, chunk_idx: int) -> str:
+        if self.num_chunks:
+            return f"{self.label_prefix}Chunk {chunk_idx + 1}/{self.num_chunks}"
+        return f"{self.label_prefix}Chunk {chunk_idx + 1}"
+
+    def pieces(self) -> list:
+        """(pages, markdown) for every converted piece, in page order."""
+        return [piece for i in range(self.planned) for piece in self.completed_chunks[i]]
+
+    def markdown(self) -> str:
+        """Combine the completed chunks in order."""
+        return "\n\n".join(markdown for _, markdown in self.pieces())
+
+    def close(self) -> None:
+        if self.page_feed:
+            self.page_feed.close()
+        if self.journal:
+            self.journal.close()
+
+
+def load_manifest(path: Path) -> list:
+    """
+    Read a batch manifest.
+
+    The manifest is a JSON list (or an object with a "documents" list) whose
+    entries are either a source string or an object with "source" and
+    optional "output" and "max_pages" keys. Sources may be URLs, file:// URLs
+    or local paths; outputs default to the source's file name with a .md
+    suffix.
+
+    Returns:
+        list: Entries as dicts with source, output and max_pages
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if isinstance(manifest, dict):
+        manifest = manifest.get('documents')
+    if not isinstance(manifest, list) or not manifest:
+        raise ValueError(f"Manifest {path} must contain a non-empty list of documents")
+
+    entries = []
+    outputs = set()
+    for item in manifest:
+        entry = {'source': item} if isinstance(item, str) else dict(item)
+        if not entry.get('source'):
+            raise ValueError(f"Manifest entry without a source: {item!r}")
+        if not entry.get('output'):
+            name = Path(url2pathname(urlparse(entry['source']).path)).stem or f"document{len(entries) + 1}"
+            entry['output'] = f"{name}.md"
+        if entry['output'] in outputs:
+            raise ValueError(f"Manifest lists output {entry['output']} more than once")
+        outputs.add(entry['output'])
+        entry.setdefault('max_pages', None)
+        entries.append(entry)
+    return entries
+
 
 class PDFToMarkdownConverter:
-    def __init__(self, output_dir: str = "docs_mistral"):
-        """Initialize the converter."""
+    def __init__(self, output_dir: str = "docs_mistral", cache_dir: Optional[str] = ".converter_cache",
+                 cache_max_bytes: int = 512 * 1024 * 1024, requests_per_second: float = 10.0,
+                 stream: bool = False, stream_idle_timeout: float = 30.0,
+                 first_token_timeout: float = 120.0,
+                 download_dir: str = ".converter_cache/downloads",
+                 api_url: Optional[str] = None, request_timeout: float = 300.0,
+                 retry_delay: float = 5.0, pptx_image_dir: Optional[str] = None,
+                 layout: bool = False, route_simple: bool = False, model: str = DEFAULT_MODEL,
+                 max_tokens: int = DEFAULT_MAX_TOKENS, fast_model: Optional[str] = None,
+                 fast_max_tokens: int = 16000, fast_max_complexity: int = 2,
+                 escalate_on: Iterable[str] = ('invalid', 'truncated')):
+        """
+        Initialize the converter.
+
+        Args:
+            output_dir: Directory for output files
+            cache_dir: Directory for the chunk response cache (None disables caching)
+            cache_max_bytes: Maximum total size of the response cache
+            requests_per_second: Steady-state request rate for the shared rate limiter
+            stream: Request streamed (SSE) responses instead of blocking calls
+            stream_idle_timeout: Seconds without any bytes before a stream is abandoned
+            first_token_timeout: Seconds without any content before a stream is abandoned
+            download_dir: Directory for cached copies of downloaded source documents
+            api_url: Chat completions endpoint (default: OPENROUTER_API_URL or OpenRouter)
+            request_timeout: Wall-clock timeout for non-streaming requests
+            retry_delay: Initial delay before retrying a timed-out or dropped request
+            pptx_image_dir: Directory to save pictures from .pptx slides into, so they
+                            are referenced in the output (None skips pictures)
+            layout: Extract PDFs with layout analysis, rendering tables and code locally
+                    and skipping the model for pages that need nothing else
+            route_simple: Format PDF pages with no tables, code or columns locally
+                          instead of sending them to the model
+            model: Primary model for chunks
+            max_tokens: Output token cap for the primary model
+            fast_model: Model for low-complexity chunks (None sends everything to model)
+            fast_max_tokens: Output token cap for the fast model
+            fast_max_complexity: Highest page complexity score a fast-model chunk may contain
+            escalate_on: Fast-model failures retried on the primary model (see ModelRouter)
+        """
         load_dotenv()
 
         self.api_key = os.getenv("OPENROUTER_API_KEY")
@@ -44,25 +2138,137 @@ class PDFToMarkdownConverter:
 
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.download_dir = Path(download_dir)
+        self.pptx_image_dir = Path(pptx_image_dir) if pptx_image_dir else None
+        self.layout = layout
+        self.route_simple = route_simple
 
-        self.api_url = "https://openrouter.ai/api/v1/chat/completions"
+        self.api_url = api_url or os.getenv(
+            "OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions"
+        )
+        self.request_timeout = request_timeout
+        self.retry_delay = retry_delay
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
             "HTTP-Referer": "https://github.com/devinmlowe/Deltek-OPP-Docs",
             "X-Title": "Deltek OPP Documentation Converter"
         }
+        self.router = ModelRouter(model, max_tokens, fast_model, fast_max_tokens,
+                                  fast_max_complexity, escalate_on)
+        self.model = model
+        self.max_tokens = max_tokens
+
+        # Shared keep-alive connection pool for the thread engine
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.cache = ResponseCache(Path(cache_dir), cache_max_bytes) if cache_dir else None
+
+        self.requests_per_second = requests_per_second
+        self.rate_limiter = AdaptiveRateLimiter(HTTP_POOL_SIZE, requests_per_second)
+
+        self.stream = stream
+        self.stream_idle_timeout = stream_idle_timeout
+        self.first_token_timeout = first_token_timeout
+        self.metrics = RunMetrics()
+
+        self.pages_processed = 0
+        self.pieces: list = []
+
+        # Cleared while repairing, so known-bad responses are not served from the cache
+        self.cache_reads = True
 
         self.console = Console()
 
-    def download_pdf(self, url: str, save_path: Path) -> None:
-        """Download PDF with progress bar."""
+    def fetch_source(self, source: str) -> Path:
+        """
+        Return a local path for a source document.
+
+        Local paths and file:// URLs are used in place. HTTP(S) URLs are kept in
+        the download cache, keyed by URL, and revalidated on each run (see
+        download_pdf), so an unchanged source is never downloaded twice.
+        """
+        parsed = urlparse(source)
+        if parsed.scheme == 'file':
+            path = Path(url2pathname(parsed.path))
+        elif parsed.scheme in ('http', 'https'):
+            suffix = Path(parsed.path).suffix.lower()
+            if suffix not in SOURCE_SUFFIXES:
+                suffix = '.pdf'
+            key = hashlib.sha256(source.encode('utf-8')).hexdigest()[:32]
+            return self.download_pdf(source, self.download_dir / f"{key}{suffix}")
+        else:
+            path = Path(source)
+
+        if not path.exists():
+            raise ValueError(f"Source document not found: {source}")
+        self.console.print(f"\n[green]✓ Using local file {path}[/green]\n")
+        return path
+
+    def download_pdf(self, url: str, save_path: Path) -> Path:
+        """
+        Download a document with a progress bar, reusing and resuming earlier downloads.
+
+        A sidecar <save_path>.meta.json records the URL's ETag and Last-Modified
+        validators. If a complete copy exists, the request is conditional and a
+        304 response skips the download. An interrupted download left in
+        <save_path>.part is resumed with an HTTP Range request, guarded by
+        If-Range so a changed source restarts from scratch.
+        """
         self.console.print(f"\n[bold cyan]📥 Downloading PDF...[/bold cyan]")
 
-        response = requests.get(url, stream=True, timeout=60)
+        save_path.parent.mkdir(parents=True, exist_ok=True)
+        meta_path = save_path.with_name(f"{save_path.name}.meta.json")
+        part_path = save_path.with_name(f"{save_path.name}.part")
+
+        meta = {}
+        if meta_path.exists():
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            except ValueError:
+                meta = {}
+        if meta.get('url') != url:
+            meta = {}
+        validator = meta.get('etag') or meta.get('last_modified')
+
+        headers = {}
+        resume_from = 0
+        if meta.get('complete') and save_path.exists():
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        elif part_path.exists() and validator:
+            resume_from = part_path.stat().st_size
+            headers['Range'] = f"bytes={resume_from}-"
+            headers['If-Range'] = validator
+
+        response = requests.get(url, stream=True, timeout=60, headers=headers)
+        if response.status_code == 304:
+            response.close()
+            self.console.print(f"[green]✓ Source unchanged, using cached copy {save_path}[/green]\n")
+            return save_path
         response.raise_for_status()
 
+        if response.status_code != 206:
+            resume_from = 0
+
+        meta = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'complete': False
+        }
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
         total_size = int(response.headers.get('content-length', 0))
+        if total_size:
+            total_size += resume_from
 
         with Progress(
             SpinnerColumn(),
@@ -73,23 +2279,129 @@ class PDFToMarkdownConverter:
             TimeElapsedColumn(),
             console=self.console
         ) as progress:
-            task = progress.add_task("[cyan]Downloading...", total=total_size)
+            description = "[cyan]Resuming download..." if resume_from else "[cyan]Downloading..."
+            task = progress.add_task(description, total=total_size or None, completed=resume_from)
 
-            with open(save_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
+            with open(part_path, 'ab' if resume_from else 'wb') as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
                     if chunk:
                         f.write(chunk)
                         progress.update(task, advance=len(chunk))
 
+        os.replace(part_path, save_path)
+        meta['complete'] = True
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
         self.console.print(f"[green]✓ Downloaded to {save_path}[/green]\n")
+        return save_path
 
-    def extract_text_from_pdf(self, pdf_path: Path, max_pages: Optional[int] = None) -> list:
-        """Extract text from PDF using PyMuPDF."""
-        self.console.print("[bold yellow]📄 Extracting text from PDF...[/bold yellow]")
+    def count_pdf_pages(self, pdf_path: Path, max_pages: Optional[int] = None) -> int:
+        """Return how many pages of the PDF will be extracted."""
+        doc = fitz.open(pdf_path)
+        total_pages = len(doc) if max_pages is None else min(max_pages, len(doc))
+        doc.close()
+        return total_pages
+
+    def iter_pdf_pages(self, pdf_path: Path, max_pages: Optional[int] = None,
+                       workers: int = 1) -> Iterator[dict]:
+        """
+        Yield page dicts from the PDF as they are extracted.
 
+        Each page dict also carries the outline (bookmark) entries that start on
+        that page as [level, title] pairs under 'sections', so the chunk planner
+        can prefer section boundaries. With workers > 1, pages are extracted by
+        a process pool (see iter_page_texts).
+
+        In layout mode the text is pre-structured markdown (see _layout_page).
+        In layout, simple-page or fast-model routing mode each page is also
+        scored for complexity (see score_page_complexity), and pages that need
+        no model call carry their final text under 'markdown'.
+        """
         doc = fitz.open(pdf_path)
         total_pages = len(doc) if max_pages is None else min(max_pages, len(doc))
 
+        sections_by_page: Dict[int, list] = {}
+        toc = doc.get_toc()
+        for level, title, page_num in toc:
+            if page_num >= 1:
+                sections_by_page.setdefault(page_num, []).append([level, title.strip()])
+        doc.close()
+
+        self.console.print(f"[dim]Outline: {len(toc)} entries on {len(sections_by_page)} pages[/dim]")
+
+        # Complexity scores are needed for local formatting and model routing
+        if self.layout or self.route_simple or self.router.fast_model:
+            pages = iter_analyzed_pages(pdf_path, total_pages, workers, self.layout, self.route_simple)
+            for page_num, analysis in pages:
+                page = {
+                    'page_num': page_num,
+                    'text': analysis['text'],
+                    'sections': sections_by_page.get(page_num, []),
+                    'complexity': analysis['complexity'],
+                    'features': analysis['features']
+                }
+                if analysis['markdown'] is not None:
+                    page['markdown'] = analysis['markdown']
+                yield page
+            return
+
+        for page_num, text in iter_page_texts(pdf_path, total_pages, workers):
+            yield {
+                'page_num': page_num,
+                'text': text,
+                'sections': sections_by_page.get(page_num, [])
+            }
+
+    def count_slides(self, pptx_path: Path, max_pages: Optional[int] = None) -> int:
+        """Return how many slides of the deck will be extracted."""
+        total_slides = len(_open_presentation(str(pptx_path)).slides)
+        return total_slides if max_pages is None else min(max_pages, total_slides)
+
+    def iter_pptx_pages(self, pptx_path: Path, max_pages: Optional[int] = None,
+                        workers: int = 1) -> Iterator[dict]:
+        """
+        Yield one page dict per slide, in slide order.
+
+        A slide whose title differs from the previous slide's is recorded as
+        starting a level-2 section, so the chunk planner prefers to cut between
+        topics rather than through a run of continuation slides. Embedded
+        pictures are skipped unless the converter was given a pptx_image_dir.
+        """
+        total_slides = self.count_slides(pptx_path, max_pages)
+        if self.pptx_image_dir:
+            self.pptx_image_dir.mkdir(parents=True, exist_ok=True)
+
+        slides = iter_slide_texts(pptx_path, total_slides, workers, self.pptx_image_dir, self.output_dir)
+        previous_title = None
+        for slide_num, (text, title) in slides:
+            new_topic = title and title.lower() != previous_title
+            previous_title = title.lower() if title else previous_title
+            yield {
+                'page_num': slide_num,
+                'text': text,
+                'sections': [[2, title]] if new_topic else []
+            }
+
+    def count_source_pages(self, path: Path, max_pages: Optional[int] = None) -> int:
+        """Return how many pages (or slides) of a source document will be extracted."""
+        if Path(path).suffix.lower() == '.pptx':
+            return self.count_slides(path, max_pages)
+        return self.count_pdf_pages(path, max_pages)
+
+    def iter_source_pages(self, path: Path, max_pages: Optional[int] = None,
+                          workers: int = 1) -> Iterator[dict]:
+        """Yield page dicts from a PDF or a .pptx deck (one page per slide)."""
+        if Path(path).suffix.lower() == '.pptx':
+            return self.iter_pptx_pages(path, max_pages, workers)
+        return self.iter_pdf_pages(path, max_pages, workers)
+
+    def extract_text_from_pdf(self, pdf_path: Path, max_pages: Optional[int] = None,
+                              workers: int = 1) -> list:
+        """Extract text from every page of the document up front (see iter_source_pages)."""
+        self.console.print("[bold yellow]📄 Extracting text from PDF...[/bold yellow]")
+
+        total_pages = self.count_source_pages(pdf_path, max_pages)
         pages_text = []
 
         with Progress(
@@ -105,47 +2417,54 @@ class PDFToMarkdownConverter:
                 total=total_pages
             )
 
-            for page_num in range(total_pages):
-                page = doc[page_num]
-                text = page.get_text()
-                pages_text.append({
-                    'page_num': page_num + 1,
-                    'text': text
-                })
+            for page in self.iter_source_pages(pdf_path, max_pages, workers):
+                pages_text.append(page)
                 progress.update(task, advance=1)
 
-        doc.close()
         self.console.print(f"[green]✓ Extracted text from {total_pages} pages[/green]\n")
 
         return pages_text
 
-    def _process_single_chunk_api(self, chunk_pages: list, chunk_label: str) -> str:
-        """Make a single API call to process pages and return markdown content."""
+    def _read_source(self, path: Path, max_pages: Optional[int], workers: int, pipeline: bool,
+                     clean: bool) -> tuple:
+        """
+        Set up page extraction for a source, with optional pre-cleaning.
+
+        Returns:
+            tuple: (pages (an iterator if pipelined, else a list), PageCleaner or None)
+        """
+        if pipeline:
+            pages_text = self.iter_source_pages(path, max_pages, workers)
+        else:
+            pages_text = self.extract_text_from_pdf(path, max_pages, workers)
+
+        cleaner = None
+        if clean:
+            cleaner = PageCleaner(remove_repeats=Path(path).suffix.lower() != '.pptx')
+            pages_text = cleaner.clean(pages_text)
+            if not pipeline:
+                pages_text = list(pages_text)
+        return pages_text, cleaner
+
+    def _build_chunk_request(self, chunk_pages: list, model: Optional[str] = None,
+                             max_tokens: Optional[int] = None) -> tuple:
+        """Build the cache key and API payload for a chunk of pages (for the primary model by default)."""
+        model = model or self.model
         # Combine chunk text
         chunk_text = "\n\n---PAGE BREAK---\n\n".join([
             f"PAGE {p['page_num']}:\n{p['text']}"
             for p in chunk_pages
         ])
 
-        prompt = f"""Convert this PDF text extract to clean, well-formatted GitHub Flavored Markdown.
+        cache_key = None
+        if self.cache:
+            cache_key = ResponseCache.make_key(model, PROMPT_TEMPLATE, chunk_text)
 
-The text is from pages {chunk_pages[0]['page_num']} to {chunk_pages[-1]['page_num']} of a technical document.
-
-Requirements:
-- Remove headers, footers, and page numbers
-- Preserve all headings using proper markdown levels (# ## ### etc.)
-- Maintain code examples in proper code blocks with language identifiers
-- Convert tables to markdown table format
-- Preserve the document structure
-- Keep all technical content
-- Use proper markdown formatting for lists, emphasis, and links
-- Remove artifacts like repeated headers or footers
-
-Here is the extracted text:
-
-{chunk_text}
-
-Please convert this to clean markdown format."""
+        prompt = PROMPT_TEMPLATE.format(
+            first_page=chunk_pages[0]['page_num'],
+            last_page=chunk_pages[-1]['page_num'],
+            chunk_text=chunk_text
+        )
 
         messages = [{
             "role": "user",
@@ -153,203 +2472,686 @@ Please convert this to clean markdown format."""
         }]
 
         payload = {
-            "model": "anthropic/claude-sonnet-4",
+            "model": model,
             "messages": messages,
-            "max_tokens": 50000
+            "max_tokens": max_tokens or self.max_tokens,
+            "usage": {"include": True}
         }
+        if self.stream:
+            payload["stream"] = True
+
+        return cache_key, payload
+
+    def _extract_markdown(self, data: dict, chunk_label: str, cache_key: Optional[str],
+                          chunk_pages: Optional[list] = None) -> str:
+        """
+        Pull the markdown out of a completion response and cache it.
+
+        A message with no content raises EmptyResponseError, which the
+        callers retry like a dropped connection.
+
+        The page markers are kept, so the checkpoint journal can split the
+        output per page; they are stripped when the chunk is assembled. If
+        chunk_pages is given the response is validated first, and one that
+        fails validation raises OutputValidationError without being cached.
+        """
+        if 'choices' in data and len(data['choices']) > 0:
+            choice = data['choices'][0]
+            content = (choice.get('message') or {}).get('content')
+            if choice.get('finish_reason') == 'length':
+                raise ContextOverflowError(
+                    f"{chunk_label} response was cut off at the output token limit",
+                    partial=content or ""
+                )
+            if not content or not content.strip():
+                raise EmptyResponseError(f"{chunk_label} response has no content")
+            if chunk_pages is not None:
+                problems = validate_chunk_output(content, chunk_pages)
+                if problems:
+                    raise OutputValidationError(f"{chunk_label} failed validation: {'; '.join(problems)}",
+                                                problems)
+            if self.cache:
+                self.cache.put(cache_key, content)
+            return content
+        else:
+            return f"<!-- No content generated for {chunk_label} -->"
+
+    @staticmethod
+    def _record_usage(call: dict, data: dict) -> None:
+        """Copy token counts and cost from a response's usage block into a call record."""
+        usage = data.get('usage') or {}
+        call['prompt_tokens'] = usage.get('prompt_tokens')
+        call['completion_tokens'] = usage.get('completion_tokens')
+        call['cost'] = usage.get('cost')
+
+    def _read_stream(self, response: requests.Response, call: dict) -> dict:
+        """Accumulate a streamed response, abandoning it if it stalls."""
+        accumulator = SSEAccumulator()
+        try:
+            # Read to the end of the body so the connection returns to the pool
+            for line in response.iter_lines():
+                if not accumulator.done:
+                    accumulator.feed(line)
+                    accumulator.check_stalled(self.first_token_timeout)
+        except (requests.exceptions.RequestException, StreamStalledError) as e:
+            raise StreamStalledError(str(e), ''.join(accumulator.parts))
+
+        call['ttft'] = accumulator.time_to_first_token
+        call['tokens_per_second'] = accumulator.tokens_per_second
+        return accumulator.result()
+
+    async def _read_stream_async(self, response: aiohttp.ClientResponse, call: dict) -> dict:
+        """Async counterpart of _read_stream."""
+        accumulator = SSEAccumulator()
+        while not accumulator.done:
+            try:
+                line = await asyncio.wait_for(response.content.readline(), self.stream_idle_timeout)
+                if not line:
+                    break
+                accumulator.feed(line)
+                accumulator.check_stalled(self.first_token_timeout)
+            except asyncio.TimeoutError:
+                raise StreamStalledError(f"no data for {self.stream_idle_timeout:.0f}s",
+                                         ''.join(accumulator.parts))
+            except (aiohttp.ClientError, StreamStalledError) as e:
+                raise StreamStalledError(str(e), ''.join(accumulator.parts))
+
+        call['ttft'] = accumulator.time_to_first_token
+        call['tokens_per_second'] = accumulator.tokens_per_second
+        return accumulator.result()
+
+    def _process_single_chunk_api(self, chunk_pages: list, chunk_label: str, depth: int = 0,
+                                  queued_at: Optional[float] = None,
+                                  metrics: Optional[RunMetrics] = None) -> str:
+        """
+        Process pages on the model the router picks and return markdown content.
+
+        A fast-model failure the router escalates is retried once on the
+        primary model, as a separate call record.
+        """
+        metrics = metrics or self.metrics
+        model, max_tokens, fast = self.router.select(chunk_pages)
+        call = metrics.start_call(chunk_pages, chunk_label, depth, queued_at)
+        try:
+            return self._call_chunk_api(chunk_pages, chunk_label, call, model, max_tokens, validate=fast)
+        except Exception as e:
+            call['error'] = str(e)
+            if not (fast and self.router.should_escalate(e)):
+                raise
+            reason = e
+        finally:
+            metrics.finish_call(call)
 
-        # Retry logic
+        self._report_escalation(chunk_label, reason, metrics)
+        call = metrics.start_call(chunk_pages, chunk_label, depth)
+        try:
+            markdown = self._call_chunk_api(chunk_pages, chunk_label, call)
+        except Exception as e:
+            call['error'] = str(e)
+            raise
+        finally:
+            metrics.finish_call(call)
+        self._cache_escalated(chunk_pages, model, max_tokens, markdown)
+        return markdown
+
+    def _report_escalation(self, chunk_label: str, error: Exception, metrics: RunMetrics) -> None:
+        metrics.record_escalation()
+        self.console.print(f"[yellow]↑ {chunk_label}: escalating to {self.router.model} ({error})[/yellow]")
+
+    def _cache_escalated(self, chunk_pages: list, model: str, max_tokens: int, markdown: str) -> None:
+        """Cache an escalated result under the fast model's key too, so reruns skip the fast call."""
+        if self.cache and markdown:
+            self.cache.put(self._build_chunk_request(chunk_pages, model, max_tokens)[0], markdown)
+
+    def _call_chunk_api(self, chunk_pages: list, chunk_label: str, call: dict,
+                        model: Optional[str] = None, max_tokens: Optional[int] = None,
+                        validate: bool = False) -> str:
+        cache_key, payload = self._build_chunk_request(chunk_pages, model, max_tokens)
+        call['model'] = payload['model']
+        if self.cache and self.cache_reads:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                call['cached'] = True
+                return cached
+
+        # Retry logic: transport failures back off locally, throttling backs off globally
         max_retries = 3
-        retry_delay = 5
+        max_throttle_retries = 8
+        retry_delay = self.retry_delay
+        attempt = 0
+        throttled = 0
+        partial = ""
+
+        # Streams use an idle-gap read timeout instead of a wall-clock one
+        timeout = (10, self.stream_idle_timeout) if self.stream else self.request_timeout
 
-        for attempt in range(max_retries):
+        while True:
+            wait_start = time.monotonic()
             try:
-                response = requests.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json=payload,
-                    timeout=300
+                with self.rate_limiter.slot() as slot:
+                    call['queue_wait'] += time.monotonic() - wait_start
+                    call['attempts'] += 1
+                    response = self.session.post(
+                        self.api_url,
+                        headers=self.headers,
+                        json=payload,
+                        timeout=timeout,
+                        stream=self.stream
+                    )
+                    call['status'] = response.status_code
+                    data = None
+                    if self.stream and response.status_code == 200:
+                        data = self._read_stream(response, call)
+                    slot.record(response.status_code, response.headers)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError,
+                    requests.exceptions.ChunkedEncodingError, StreamStalledError) as e:
+                attempt += 1
+                partial = max(partial, getattr(e, 'partial', ""), key=len)
+                # Once a stalled stream has completed some pages, recover the rest instead
+                if attempt < max_retries and not split_partial_output(partial, chunk_pages)[1]:
+                    time.sleep(retry_delay)
+                    retry_delay *= 2
+                    continue
+                raise ChunkTimeoutError(f"{chunk_label} failed after {attempt} attempts: {e}", partial)
+
+            if slot.backoff is not None:
+                # A streamed response holds its pooled connection until the body is read or closed
+                response.close()
+                throttled += 1
+                call['throttled'] = throttled
+                if throttled < max_throttle_retries:
+                    continue
+                raise RateLimitError(
+                    f"{chunk_label} throttled by provider (HTTP {response.status_code}) "
+                    f"after {max_throttle_retries} attempts"
                 )
-                response.raise_for_status()
 
-                data = response.json()
-                if 'choices' in data and len(data['choices']) > 0:
-                    markdown = data['choices'][0]['message']['content']
-                    return markdown
-                else:
-                    return f"<!-- No content generated for {chunk_label} -->"
+            if response.status_code >= 400:
+                overflow = context_overflow_error(chunk_label, response.status_code, response.text)
+                if overflow:
+                    raise overflow
 
-            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
-                if attempt < max_retries - 1:
+            try:
+                response.raise_for_status()
+                if data is None:
+                    data = response.json()
+                self._record_usage(call, data)
+                return self._extract_markdown(data, chunk_label, cache_key,
+                                              chunk_pages if validate else None)
+            except EmptyResponseError:
+                attempt += 1
+                if attempt < max_retries:
                     time.sleep(retry_delay)
                     retry_delay *= 2
-                else:
-                    raise Exception(f"{chunk_label} failed after {max_retries} attempts: {e}")
+                    continue
+                raise
+            except (ContextOverflowError, OutputValidationError):
+                raise
+            except Exception as e:
+                raise Exception(f"Error processing {chunk_label}: {e}")
+
+    async def _process_single_chunk_api_async(self, engine: "AsyncChunkEngine", chunk_pages: list,
+                                              chunk_label: str, depth: int = 0,
+                                              queued_at: Optional[float] = None,
+                                              metrics: Optional[RunMetrics] = None) -> str:
+        """Async counterpart of _process_single_chunk_api using the engine's pooled session."""
+        metrics = metrics or self.metrics
+        model, max_tokens, fast = self.router.select(chunk_pages)
+        call = metrics.start_call(chunk_pages, chunk_label, depth, queued_at)
+        try:
+            return await self._call_chunk_api_async(engine, chunk_pages, chunk_label, call,
+                                                    model, max_tokens, validate=fast)
+        except Exception as e:
+            call['error'] = str(e)
+            if not (fast and self.router.should_escalate(e)):
+                raise
+            reason = e
+        finally:
+            metrics.finish_call(call)
+
+        self._report_escalation(chunk_label, reason, metrics)
+        call = metrics.start_call(chunk_pages, chunk_label, depth)
+        try:
+            markdown = await self._call_chunk_api_async(engine, chunk_pages, chunk_label, call)
+        except Exception as e:
+            call['error'] = str(e)
+            raise
+        finally:
+            metrics.finish_call(call)
+        self._cache_escalated(chunk_pages, model, max_tokens, markdown)
+        return markdown
+
+    async def _call_chunk_api_async(self, engine: "AsyncChunkEngine", chunk_pages: list,
+                                    chunk_label: str, call: dict, model: Optional[str] = None,
+                                    max_tokens: Optional[int] = None, validate: bool = False) -> str:
+        cache_key, payload = self._build_chunk_request(chunk_pages, model, max_tokens)
+        call['model'] = payload['model']
+        if self.cache and self.cache_reads:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                call['cached'] = True
+                return cached
+
+        # Retry logic: transport failures back off locally, throttling backs off globally
+        max_retries = 3
+        max_throttle_retries = 8
+        retry_delay = self.retry_delay
+        attempt = 0
+        throttled = 0
+        partial = ""
+
+        # Streams use an idle-gap read timeout instead of a wall-clock one
+        if self.stream:
+            timeout = aiohttp.ClientTimeout(total=None, connect=10, sock_read=self.stream_idle_timeout)
+        else:
+            timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+
+        while True:
+            wait_start = time.monotonic()
+            try:
+                async with self.rate_limiter.slot_async() as slot, engine.semaphore:
+                    call['queue_wait'] += time.monotonic() - wait_start
+                    call['attempts'] += 1
+                    async with engine.session.post(
+                        self.api_url,
+                        headers=self.headers,
+                        json=payload,
+                        timeout=timeout
+                    ) as response:
+                        status, headers = response.status, response.headers
+                        call['status'] = status
+                        data = None
+                        if self.stream and status == 200:
+                            data = await self._read_stream_async(response, call)
+                        else:
+                            body = await response.read()
+                        slot.record(status, headers)
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError,
+                    StreamStalledError) as e:
+                attempt += 1
+                partial = max(partial, getattr(e, 'partial', ""), key=len)
+                if attempt < max_retries and not split_partial_output(partial, chunk_pages)[1]:
+                    await asyncio.sleep(retry_delay)
+                    retry_delay *= 2
+                    continue
+                raise ChunkTimeoutError(f"{chunk_label} failed after {attempt} attempts: {e}", partial)
+
+            if slot.backoff is not None:
+                throttled += 1
+                call['throttled'] = throttled
+                if throttled < max_throttle_retries:
+                    continue
+                raise RateLimitError(
+                    f"{chunk_label} throttled by provider (HTTP {status}) "
+                    f"after {max_throttle_retries} attempts"
+                )
 
+            if data is None:
+                overflow = context_overflow_error(chunk_label, status, body.decode('utf-8', 'replace'))
+                if overflow:
+                    raise overflow
+
+            try:
+                if status >= 400:
+                    raise Exception(f"HTTP {status}: {body[:200].decode('utf-8', 'replace')}")
+                if data is None:
+                    data = json.loads(body)
+                self._record_usage(call, data)
+                return self._extract_markdown(data, chunk_label, cache_key,
+                                              chunk_pages if validate else None)
+            except EmptyResponseError:
+                attempt += 1
+                if attempt < max_retries:
+                    await asyncio.sleep(retry_delay)
+                    retry_delay *= 2
+                    continue
+                raise
+            except (ContextOverflowError, OutputValidationError):
+                raise
             except Exception as e:
                 raise Exception(f"Error processing {chunk_label}: {e}")
 
-    def _process_single_chunk(self, chunk_idx: int, chunk_pages: list, num_chunks: int,
-                             min_subdivision_size: int = 5) -> tuple:
+    def _submit_chunk(self, executor, engine: str, job: DocumentJob, chunk_pages: list,
+                      chunk_label: str, depth: int = 0) -> Future:
+        """Start a chunk API call on the thread pool or asyncio engine."""
+        if engine == "async":
+            return executor.submit(self._process_single_chunk_api_async(
+                executor, chunk_pages, chunk_label, depth, queued_at=time.monotonic(), metrics=job.metrics
+            ))
+        return executor.submit(
+            self._process_single_chunk_api, chunk_pages, chunk_label, depth,
+            queued_at=time.monotonic(), metrics=job.metrics
+        )
+
+    def _recover_failed_chunk(self, chunk_pages: list, chunk_label: str, error: Exception,
+                              metrics: RunMetrics) -> tuple:
         """
-        Process a single chunk with automatic subdivision on failure.
+        Plan the retry of a failed chunk (or sub-chunk).
 
-        If processing fails, the chunk is subdivided into smaller chunks and each
-        is processed recursively. This ensures resilience against timeouts and
-        transient failures.
+        Pages completed by partial streamed output are kept, and the rest is
+        split according to the kind of failure (see plan_recovery). The
+        sub-chunks go back into the shared work queue, so they run in parallel
+        with the rest of the document rather than serially in one worker. A
+        single page that fails without partial output is replaced by a
+        placeholder comment.
 
         Args:
-            chunk_idx: Index of the chunk in the overall document
-            chunk_pages: List of page dictionaries to process
-            num_chunks: Total number of chunks (for progress reporting)
-            min_subdivision_size: Minimum pages per subdivision (default: 5)
+            chunk_pages: Pages of the failed request
+            chunk_label: Label of the failed request
+            error: The exception it failed with
+            metrics: Metrics of the document the chunk belongs to
 
         Returns:
-            tuple: (chunk_idx, markdown_content)
+            tuple: (list of (pages, markdown, journal) results, where journal is False
+                    for placeholders, and list of (pages, label) sub-chunks to retry)
         """
-        chunk_label = f"Chunk {chunk_idx + 1}/{num_chunks}"
+        markdown, reused_pages, runs = plan_recovery(chunk_pages, error)
+        results = [(reused_pages, markdown, True)] if reused_pages else []
+
+        if not reused_pages and len(chunk_pages) == 1:
+            page_num = chunk_pages[0]['page_num']
+            self.console.print(f"[red]✗ {chunk_label} failed: {error}[/red]")
+            metrics.record_failed_page()
+            return [(chunk_pages, f"<!-- Failed to process page {page_num} -->", False)], []
+
+        metrics.record_subdivision(len(reused_pages))
+        base_label = chunk_label.split(" (pages ")[0]
+        sub_chunks = [
+            (run, f"{base_label} (pages {run[0]['page_num']}-{run[-1]['page_num']})")
+            for run in runs
+        ]
+
+        if isinstance(error, ContextOverflowError):
+            reason = "too large"
+        elif isinstance(error, ChunkTimeoutError):
+            reason = "timed out"
+        else:
+            reason = "failed"
+        kept = f", kept {len(reused_pages)} completed pages" if reused_pages else ""
+        retry_pages = len(chunk_pages) - len(reused_pages)
+        self.console.print(
+            f"[yellow]⚠ {chunk_label} {reason} with {len(chunk_pages)} pages{kept}. "
+            f"Retrying {retry_pages} pages as {len(sub_chunks)} sub-chunk(s)...[/yellow]"
+        )
+        return results, sub_chunks
+
+    def _print_chunk_plan(self, chunks: list) -> None:
+        """Show the planned chunks and their estimated token sizes."""
+        plan = Table(title="Chunk plan", title_justify="left", box=None, padding=(0, 2))
+        plan.add_column("Chunk", justify="right", style="cyan")
+        plan.add_column("Pages", justify="right")
+        plan.add_column("Page range")
+        plan.add_column("Est. input tokens", justify="right")
+        plan.add_column("Est. output tokens", justify="right")
+        plan.add_column("Starts at section", overflow="ellipsis", max_width=40)
+
+        for chunk_idx, chunk_pages in enumerate(chunks):
+            plan.add_row(str(chunk_idx + 1), *self._chunk_plan_row(chunk_pages))
+
+        self.console.print(plan)
+        self.console.print()
 
-        try:
-            # Try to process the entire chunk
-            markdown = self._process_single_chunk_api(chunk_pages, chunk_label)
-            return (chunk_idx, markdown)
+    @staticmethod
+    def _chunk_plan_row(chunk_pages: list) -> tuple:
+        """Pages, page range, estimated input/output tokens and starting section of a chunk."""
+        tokens = sum(p['tokens'] for p in chunk_pages)
+        sections = chunk_pages[0].get('sections', [])
+        return (
+            str(len(chunk_pages)),
+            f"{chunk_pages[0]['page_num']}-{chunk_pages[-1]['page_num']}",
+            f"{tokens:,}",
+            f"{int(tokens * OUTPUT_TOKEN_RATIO):,}",
+            min(sections)[1] if sections else ""
+        )
 
-        except Exception as e:
-            # If chunk is already at minimum size, can't subdivide further
-            if len(chunk_pages) <= min_subdivision_size:
-                self.console.print(
-                    f"[red]✗ {chunk_label} failed and cannot be subdivided further "
-                    f"({len(chunk_pages)} pages)[/red]"
-                )
-                raise
+    def _print_planned_chunk(self, label: str, chunk_pages: list) -> None:
+        """Show one chunk of a pipelined plan as the planner yields it."""
+        pages, page_range, tokens, output_tokens, section = self._chunk_plan_row(chunk_pages)
+        line = (f"[dim]Planned {label}: pages {page_range} ({pages}), "
+                f"~{tokens} input / ~{output_tokens} output tokens")
+        if section:
+            line += f", starts at {escape(section)}"
+        self.console.print(line + "[/dim]")
+
+    def _plan_document(self, name: str, pages_text: Iterable[dict], chunk_size: int, chunk_tokens: int,
+                       checkpoint_file: Optional[Path] = None, total_pages: Optional[int] = None,
+                       metrics: Optional[RunMetrics] = None, label_prefix: str = "") -> DocumentJob:
+        """
+        Set up a document for scheduling.
 
-            # Subdivide the chunk into smaller pieces
-            num_pages = len(chunk_pages)
-            sub_chunk_size = max(min_subdivision_size, num_pages // 2)
+        A list of pages is planned up front and the plan printed; any other
+        iterable is pulled from a background thread through a bounded queue
+        and planned as pages arrive, each chunk printed as it is planned.
+        """
+        page_feed = None
+        num_chunks = None
+        if isinstance(pages_text, list):
+            total_pages = len(pages_text)
+            chunk_source = list(plan_chunks(pages_text, chunk_size, chunk_tokens, self.max_tokens,
+                                            router=self.router))
+            num_chunks = len(chunk_source)
+            self._print_chunk_plan(chunk_source)
+        else:
+            page_feed = PrefetchIterator(pages_text, PIPELINE_QUEUE_PAGES)
+            chunk_source = plan_chunks(page_feed, chunk_size, chunk_tokens, self.max_tokens,
+                                       router=self.router)
 
-            self.console.print(
-                f"[yellow]⚠ {chunk_label} failed with {len(chunk_pages)} pages. "
-                f"Subdividing into ~{sub_chunk_size}-page chunks...[/yellow]"
-            )
+        # Load checkpoint journal if exists
+        journal = CheckpointJournal(checkpoint_file) if checkpoint_file else None
+        if journal and journal.load():
+            self.console.print(f"[cyan]📋 Resuming {name} from checkpoint journal[/cyan]\n")
 
-            # Process subdivisions recursively
-            markdown_parts = []
-            for i in range(0, num_pages, sub_chunk_size):
-                sub_pages = chunk_pages[i:i + sub_chunk_size]
-                sub_label = f"{chunk_label} (sub-chunk {i//sub_chunk_size + 1}, pages {sub_pages[0]['page_num']}-{sub_pages[-1]['page_num']})"
+        return DocumentJob(name, chunk_source, metrics or self.metrics, journal, num_chunks,
+                           total_pages, page_feed, label_prefix)
 
-                try:
-                    # Recursive call with subdivision
-                    sub_markdown = self._process_single_chunk_api(sub_pages, sub_label)
-                    markdown_parts.append(sub_markdown)
-                    self.console.print(f"[green]✓ {sub_label} processed successfully[/green]")
-
-                except Exception as sub_e:
-                    # If subdivision still fails, try even smaller chunks
-                    if len(sub_pages) > 1:
-                        self.console.print(
-                            f"[yellow]⚠ {sub_label} failed. "
-                            f"Further subdividing into 1-page chunks...[/yellow]"
-                        )
-
-                        # Process one page at a time as last resort
-                        for page in sub_pages:
-                            page_label = f"{chunk_label} (page {page['page_num']})"
-                            try:
-                                page_markdown = self._process_single_chunk_api([page], page_label)
-                                markdown_parts.append(page_markdown)
-                                self.console.print(f"[green]✓ {page_label} processed[/green]")
-                            except Exception as page_e:
-                                self.console.print(f"[red]✗ {page_label} failed: {page_e}[/red]")
-                                markdown_parts.append(f"<!-- Failed to process page {page['page_num']} -->")
-                    else:
-                        raise sub_e
-
-            # Combine all subdivisions
-            combined_markdown = "\n\n".join(markdown_parts)
-            self.console.print(f"[green]✓ {chunk_label} completed via subdivision[/green]")
-            return (chunk_idx, combined_markdown)
-
-    def convert_to_markdown(self, pages_text: list, chunk_size: int = 25,
-                          checkpoint_file: Optional[Path] = None, max_workers: int = 4) -> str:
-        """Convert extracted text to markdown using Claude with parallel processing."""
-        self.console.print("[bold yellow]🚀 Converting to Markdown with Claude Sonnet 4...[/bold yellow]")
-        self.console.print(f"[dim]Using {max_workers} parallel workers for faster processing[/dim]\n")
-
-        total_pages = len(pages_text)
-        num_chunks = (total_pages + chunk_size - 1) // chunk_size
-
-        # Load checkpoint if exists
-        completed_chunks: Dict[int, str] = {}
-
-        if checkpoint_file and checkpoint_file.exists():
-            with open(checkpoint_file, 'r', encoding='utf-8') as f:
-                checkpoint_data = json.load(f)
-                completed_chunks = {int(k): v for k, v in checkpoint_data.get('completed_chunks', {}).items()}
-                self.console.print(f"[cyan]📋 Resuming: {len(completed_chunks)}/{num_chunks} chunks already completed[/cyan]\n")
-
-        # Prepare all chunks
-        chunks_to_process = []
-        for chunk_idx in range(num_chunks):
-            if chunk_idx not in completed_chunks:
-                start_idx = chunk_idx * chunk_size
-                end_idx = min((chunk_idx + 1) * chunk_size, total_pages)
-                chunk_pages = pages_text[start_idx:end_idx]
-                chunks_to_process.append((chunk_idx, chunk_pages))
-
-        # Process chunks in parallel
-        if not chunks_to_process:
-            self.console.print(f"[green]✓ All {num_chunks} chunks already completed![/green]\n")
-        else:
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[bold blue]{task.description}"),
-                BarColumn(),
-                TaskProgressColumn(),
-                TimeElapsedColumn(),
-                console=self.console
-            ) as progress:
-                task = progress.add_task(
-                    f"[cyan]Processing {len(chunks_to_process)} chunks in parallel...",
-                    total=len(chunks_to_process)
-                )
+    def _run_jobs(self, jobs: list, max_workers: int = 4, engine: str = "threads",
+                  concurrency: int = 16) -> None:
+        """
+        Convert the chunks of one or more documents on a shared worker pool.
 
-                # Use ThreadPoolExecutor for parallel processing
-                with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                    # Submit all chunks
-                    future_to_chunk = {
-                        executor.submit(self._process_single_chunk, chunk_idx, chunk_pages, num_chunks): chunk_idx
-                        for chunk_idx, chunk_pages in chunks_to_process
-                    }
+        All documents share one worker pool (or asyncio engine) and one
+        adaptive rate limiter. New chunks are taken from the documents in
+        turn, so a batch progresses on every document at once rather than one
+        after another. At most two requests per worker are dispatched ahead;
+        beyond that, planning (and pipelined extraction) waits.
 
-                    # Process completed chunks as they finish
-                    for future in as_completed(future_to_chunk):
-                        chunk_idx = future_to_chunk[future]
-                        try:
-                            chunk_idx, markdown = future.result()
-                            completed_chunks[chunk_idx] = markdown
+        Failed requests are split (see _recover_failed_chunk) and their
+        sub-chunks are dispatched ahead of new chunks; a chunk is complete
+        once all of its pieces are.
+        """
+        # One limiter shared by every worker, sized to the engine's concurrency
+        worker_count = concurrency if engine == "async" else max_workers
+        self.rate_limiter = AdaptiveRateLimiter(worker_count, self.requests_per_second)
 
-                            # Save checkpoint
-                            if checkpoint_file:
-                                with open(checkpoint_file, 'w', encoding='utf-8') as f:
-                                    json.dump({
-                                        'completed_chunks': completed_chunks
-                                    }, f)
+        # Sub-chunks of failed requests, dispatched ahead of new chunks
+        retry_queue: deque = deque()
+        pending: Dict[Future, tuple] = {}
+        max_pending = 2 * worker_count
+        next_job = 0
 
-                            progress.update(task, advance=1)
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[bold blue]{task.description}"),
+            BarColumn(),
+            TaskProgressColumn(),
+            TimeElapsedColumn(),
+            console=self.console
+        ) as progress:
+            for job in jobs:
+                prefix = f"{job.name}: " if len(jobs) > 1 else ""
+                if job.page_feed:
+                    # Extraction started when the document was planned, so track the feed's count
+                    extract_task = progress.add_task(f"[cyan]{prefix}Extracting pages...", total=job.total_pages)
+                    job.page_feed.on_item = lambda _page, t=extract_task, feed=job.page_feed: \
+                        progress.update(t, completed=feed.produced)
+                    progress.update(extract_task, completed=job.page_feed.produced)
+                job.task = progress.add_task(f"[cyan]{prefix}Processing chunks in parallel...",
+                                             total=job.num_chunks)
+
+            # Use ThreadPoolExecutor (or the asyncio engine) for parallel processing
+            if engine == "async":
+                executor = AsyncChunkEngine(concurrency)
+            else:
+                executor = ThreadPoolExecutor(max_workers=max_workers)
+
+            try:
+                with executor:
+                    while True:
+                        # Dispatch retries, then planned chunks from each document in turn,
+                        # until enough are queued for the workers
+                        while len(pending) < max_pending:
+                            if retry_queue:
+                                request = retry_queue.popleft()
+                                job, _, chunk_pages, chunk_label, depth = request
+                                future = self._submit_chunk(executor, engine, job, chunk_pages, chunk_label, depth)
+                                pending[future] = request
+                                continue
+
+                            active = [j for j in jobs if not j.exhausted]
+                            if not active:
+                                break
+                            job = active[next_job % len(active)]
+                            next_job += 1
+
+                            try:
+                                chunk_idx, chunk_pages = next(job.chunks)
+                            except StopIteration:
+                                job.exhausted = True
+                                continue
+
+                            job.planned += 1
+                            job.pages_processed += len(chunk_pages)
+                            if job.num_chunks is None:
+                                progress.update(job.task, total=job.planned)
+                                self._print_planned_chunk(job.chunk_label(chunk_idx), chunk_pages)
+
+                            markdown = job.journal.lookup(chunk_pages) if job.journal else None
+                            if markdown is not None:
+                                job.completed_chunks[chunk_idx] = [(chunk_pages, markdown)]
+                                job.resumed += 1
+                                progress.update(job.task, advance=1)
+                                continue
+
+                            chunk_label = job.chunk_label(chunk_idx)
+                            job.chunk_parts[chunk_idx] = {}
+                            job.outstanding[chunk_idx] = 0
+                            runs = split_local_runs(chunk_pages)
+                            for local, run_pages in runs:
+                                if local:
+                                    # Layout extraction already produced final markdown
+                                    markdown = "\n\n".join(page['markdown'] for page in run_pages)
+                                    job.chunk_parts[chunk_idx][run_pages[0]['page_num']] = (run_pages, markdown)
+                                    job.metrics.record_local_pages(len(run_pages))
+                                    if job.journal:
+                                        job.journal.append_pieces([([page], page['markdown'])
+                                                                   for page in run_pages])
+                                    continue
+                                run_label = chunk_label
+                                if len(runs) > 1:
+                                    run_label = (f"{chunk_label} (pages {run_pages[0]['page_num']}-"
+                                                 f"{run_pages[-1]['page_num']})")
+                                job.metrics.record_model_pages(run_pages)
+                                job.outstanding[chunk_idx] += 1
+                                future = self._submit_chunk(executor, engine, job, run_pages, run_label)
+                                pending[future] = (job, chunk_idx, run_pages, run_label, 0)
+                            if not job.outstanding[chunk_idx]:
+                                self._finish_chunk(job, chunk_idx)
+                                progress.update(job.task, advance=1)
+
+                        if not pending:
+                            break
+
+                        # Process completed requests as they finish
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            job, chunk_idx, chunk_pages, chunk_label, depth = pending.pop(future)
+                            try:
+                                results = [(chunk_pages, future.result(), True)]
+                                sub_chunks = []
+                                if depth:
+                                    self.console.print(f"[green]✓ {chunk_label} processed successfully[/green]")
+                            except RateLimitError as e:
+                                # Splitting a throttled chunk would only multiply requests
+                                self.console.print(f"\n[red]✗ {str(e)}[/red]")
+                                raise
+                            except Exception as e:
+                                results, sub_chunks = self._recover_failed_chunk(
+                                    chunk_pages, chunk_label, e, job.metrics
+                                )
+
+                            for pages, markdown, durable in results:
+                                job.chunk_parts[chunk_idx][pages[0]['page_num']] = (
+                                    pages, strip_page_markers(markdown)
+                                )
+                                # Append to checkpoint journal (failed pages are retried on resume)
+                                if job.journal and durable:
+                                    job.journal.append(pages, markdown)
+                            for pages, label in sub_chunks:
+                                retry_queue.append((job, chunk_idx, pages, label, depth + 1))
+                            job.outstanding[chunk_idx] += len(sub_chunks) - 1
+
+                            if not job.outstanding[chunk_idx]:
+                                self._finish_chunk(job, chunk_idx)
+                                if depth:
+                                    self.console.print(f"[green]✓ {chunk_label.split(' (pages ')[0]} "
+                                                       f"completed via subdivision[/green]")
+                                progress.update(job.task, advance=1)
+            finally:
+                for job in jobs:
+                    job.close()
+
+    @staticmethod
+    def _finish_chunk(job: 'DocumentJob', chunk_idx: int) -> None:
+        """Put a chunk's pieces in page order once none are outstanding."""
+        parts = job.chunk_parts.pop(chunk_idx)
+        del job.outstanding[chunk_idx]
+        job.completed_chunks[chunk_idx] = [parts[k] for k in sorted(parts)]
+
+    def _print_models(self) -> None:
+        self.console.print(f"[bold yellow]🚀 Converting to Markdown with {self.model}...[/bold yellow]")
+        if self.router.fast_model:
+            self.console.print(f"[dim]Chunks with page complexity up to {self.router.fast_max_complexity} "
+                               f"go to {self.router.fast_model}[/dim]")
+
+    def convert_to_markdown(self, pages_text: Iterable[dict], chunk_size: int = 25,
+                          checkpoint_file: Optional[Path] = None, max_workers: int = 4,
+                          engine: str = "threads", concurrency: int = 16,
+                          chunk_tokens: int = 16000, total_pages: Optional[int] = None) -> str:
+        """
+        Convert extracted text to markdown using Claude with parallel processing.
+
+        Pages are packed into chunks of up to chunk_size pages and roughly
+        chunk_tokens estimated input tokens (see plan_chunks). The "threads"
+        engine runs each chunk on a worker thread; the "async" engine runs all
+        chunks as coroutines on one event loop, with up to `concurrency`
+        requests in flight over a shared connection pool.
+
+        pages_text may be a list, in which case the whole plan is printed before
+        dispatch, or any iterable of page dicts (such as iter_pdf_pages), in
+        which case each chunk is dispatched as soon as it is planned, so API
+        calls overlap with extraction (see _run_jobs).
+        """
+        self._print_models()
+        if engine == "async":
+            self.console.print(f"[dim]Using asyncio engine with up to {concurrency} concurrent requests[/dim]\n")
+        else:
+            self.console.print(f"[dim]Using {max_workers} parallel workers for faster processing[/dim]\n")
 
-                        except Exception as e:
-                            self.console.print(f"\n[red]✗ {str(e)}[/red]")
-                            raise
+        job = self._plan_document("document", pages_text, chunk_size, chunk_tokens, checkpoint_file, total_pages)
+        self._run_jobs([job], max_workers, engine, concurrency)
+        self.pages_processed = job.pages_processed
+        self.pieces = job.pieces()
 
-            self.console.print(f"[green]✓ Converted {num_chunks} chunks to markdown[/green]\n")
+        if job.resumed:
+            self.console.print(f"[cyan]📋 Resumed {job.resumed}/{job.planned} chunks from checkpoint[/cyan]")
+        self.console.print(f"[green]✓ Converted {job.planned} chunks to markdown[/green]\n")
 
-        # Combine chunks in order
-        markdown_parts = [completed_chunks[i] for i in range(num_chunks)]
-        return "\n\n".join(markdown_parts)
+        return job.markdown()
 
     def convert(self, pdf_url: str, output_filename: str = "DeltekOpenPlanDeveloperGuide.md",
-                max_pages: Optional[int] = None, chunk_size: int = 25, max_workers: int = 4) -> Path:
+                max_pages: Optional[int] = None, chunk_size: int = 25, max_workers: int = 4,
+                engine: str = "threads", concurrency: int = 16, chunk_tokens: int = 16000,
+                extract_workers: int = 1, pipeline: bool = True, clean: bool = True) -> Path:
         """Main conversion workflow."""
         output_path = self.output_dir / output_filename
 
@@ -357,32 +3159,41 @@ Please convert this to clean markdown format."""
         self.console.print("\n" + "="*80)
         self.console.print(Panel.fit(
             "[bold cyan]PDF to Markdown Converter (Parallel Processing)[/bold cyan]\n"
-            f"[white]PDF URL:[/white] {pdf_url}\n"
+            f"[white]Source:[/white] {pdf_url}\n"
             f"[white]Output:[/white] {output_path}\n"
-            f"[white]Parallel workers:[/white] {max_workers}",
+            + (f"[white]Async concurrency:[/white] {concurrency}" if engine == "async"
+               else f"[white]Parallel workers:[/white] {max_workers}"),
             border_style="cyan"
         ))
         self.console.print("="*80)
 
-        # Download PDF
-        temp_pdf = self.output_dir.parent / "temp_downloaded.pdf"
-        self.download_pdf(pdf_url, temp_pdf)
+        # Download PDF (or reuse the cached/local copy)
+        pdf_path = self.fetch_source(pdf_url)
 
-        # Extract text
-        pages_text = self.extract_text_from_pdf(temp_pdf, max_pages)
+        # Extract text, either up front or streamed into the converter as pages are ready,
+        # and strip running headers/footers locally so the model never sees them
+        total_pages = self.count_source_pages(pdf_path, max_pages)
+        pages_text, cleaner = self._read_source(pdf_path, max_pages, extract_workers, pipeline, clean)
 
         # Convert to markdown with checkpoint support and parallel processing
-        checkpoint_file = self.output_dir / ".checkpoint.json"
-        markdown_content = self.convert_to_markdown(pages_text, chunk_size, checkpoint_file, max_workers)
+        checkpoint_file = self.output_dir / ".checkpoint.jsonl"
+        calls_path = output_path.with_suffix(".calls.jsonl")
+        report_path = output_path.with_suffix(".report.json")
+        self.metrics = RunMetrics()
+        self.metrics.open_log(calls_path)
+        try:
+            markdown_content = self.convert_to_markdown(pages_text, chunk_size, checkpoint_file, max_workers,
+                                                        engine, concurrency, chunk_tokens, total_pages)
+        finally:
+            self.metrics.close()
 
-        # Save
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
+        # Save, with the page map that --repair uses to find each page range in the output
+        write_file_durably(output_path, markdown_content)
+        self._write_page_map(output_path, pdf_url, self.pieces)
+        flagged = self.validate_pieces(self.pieces)
 
         # Cleanup
-        temp_pdf.unlink()
-        if checkpoint_file.exists():
-            checkpoint_file.unlink()  # Remove checkpoint after successful completion
+        CheckpointJournal(checkpoint_file).remove()  # Output is on disk, checkpoint no longer needed
 
         # Display success
         file_size = output_path.stat().st_size
@@ -391,13 +3202,377 @@ Please convert this to clean markdown format."""
         summary = Table(show_header=False, box=None, padding=(0, 2))
         summary.add_row("[cyan]Output file:", f"[white]{output_path}[/white]")
         summary.add_row("[cyan]File size:", f"[white]{file_size:,} bytes[/white]")
-        summary.add_row("[cyan]Pages processed:", f"[white]{len(pages_text)}[/white]")
+        summary.add_row("[cyan]Pages processed:", f"[white]{self.pages_processed}[/white]")
+        report = self.metrics.write_report(
+            report_path,
+            source=pdf_url,
+            output=str(output_path),
+            pages=self.pages_processed,
+            engine=engine,
+            cleaning=cleaner.summary() if cleaner else None,
+            validation=flagged,
+            cache_hits=self.cache.hits if self.cache else None,
+            cache_misses=self.cache.misses if self.cache else None
+        )
+        if cleaner:
+            cleaning = report['cleaning']
+            summary.add_row("[cyan]Pre-cleaning:", f"[white]~{cleaning['tokens_saved']:,} tokens saved "
+                            f"({cleaning['percent_saved']}%, {cleaning['removed_lines']} header/footer lines)[/white]")
+        summary.add_row("[cyan]API calls:", f"[white]{report['api_calls']} "
+                        f"({report['retries']} retries, {report['subdivisions']} subdivisions)[/white]")
+        if report['local_pages'] or report['page_features']:
+            features = ", ".join(f"{name} {count}" for name, count in report['page_features'].items())
+            summary.add_row("[cyan]Page routing:", f"[white]{report['local_pages']} local, "
+                            f"{report['model_pages']} to the model"
+                            + (f" ({features})" if features else "") + "[/white]")
+        if len(report['calls_by_model']) > 1 or report['escalations']:
+            models = ", ".join(f"{model} {count}" for model, count in report['calls_by_model'].items())
+            summary.add_row("[cyan]Calls by model:", f"[white]{models} "
+                            f"({report['escalations']} escalated)[/white]")
+        if report['reused_pages']:
+            summary.add_row("[cyan]Pages kept from partial output:", f"[white]{report['reused_pages']}[/white]")
+        if report['failed_pages']:
+            summary.add_row("[cyan]Failed pages:", f"[red]{report['failed_pages']}[/red]")
+        summary.add_row("[cyan]Validation:", self._validation_status(flagged))
+        if report['latency_p50'] is not None:
+            summary.add_row(
+                "[cyan]Latency p50/p95/p99:",
+                f"[white]{report['latency_p50']:.1f}s / {report['latency_p95']:.1f}s / "
+                f"{report['latency_p99']:.1f}s[/white]"
+            )
+        if report['prompt_tokens'] or report['completion_tokens']:
+            summary.add_row("[cyan]Tokens (prompt/completion):",
+                            f"[white]{report['prompt_tokens']:,} / {report['completion_tokens']:,}[/white]")
+        if report['cost'] is not None:
+            summary.add_row("[cyan]Cost:", f"[white]${report['cost']:.4f}[/white]")
+        if report['ttft_p50'] is not None:
+            summary.add_row("[cyan]Median time to first token:", f"[white]{report['ttft_p50']:.1f}s[/white]")
+        if report['tokens_per_second_p50'] is not None:
+            summary.add_row("[cyan]Median tokens/sec:", f"[white]{report['tokens_per_second_p50']:.0f}[/white]")
+        if self.rate_limiter.throttle_events:
+            summary.add_row("[cyan]Throttled responses:", f"[white]{self.rate_limiter.throttle_events}[/white]")
+        if self.cache:
+            summary.add_row("[cyan]Cache hits:", f"[white]{self.cache.hits}[/white]")
+            summary.add_row("[cyan]Cache misses:", f"[white]{self.cache.misses}[/white]")
+        summary.add_row("[cyan]Run report:", f"[white]{report_path} ({calls_path.name})[/white]")
 
         self.console.print(summary)
         self.console.print()
+        self._print_flagged(flagged)
 
         return output_path
 
+    def _write_page_map(self, output_path: Path, source: str, pieces: list) -> None:
+        """Write the output's page map sidecar (<output>.pages.json)."""
+        write_file_durably(output_path.with_suffix(".pages.json"), json.dumps({
+            'source': source,
+            'ranges': page_map(pieces)
+        }, indent=1))
+
+    def validate_pieces(self, pieces: list) -> list:
+        """
+        Validate each converted piece against its source pages (see validate_output_range).
+
+        Returns:
+            list: {'first_page', 'last_page', 'index', 'problems'} for each flagged piece
+        """
+        flagged = []
+        for index, (pages, markdown) in enumerate(pieces):
+            problems = validate_output_range(markdown, pages, self.router.select(pages)[1])
+            if problems:
+                flagged.append({
+                    'first_page': pages[0]['page_num'],
+                    'last_page': pages[-1]['page_num'],
+                    'index': index,
+                    'problems': problems
+                })
+        return flagged
+
+    @staticmethod
+    def _validation_status(flagged: list) -> str:
+        if not flagged:
+            return "[green]passed[/green]"
+        return f"[yellow]{len(flagged)} page ranges flagged (fix with --repair)[/yellow]"
+
+    def _print_flagged(self, flagged: list) -> None:
+        if not flagged:
+            return
+        table = Table(title="Flagged page ranges", box=None, padding=(0, 2))
+        table.add_column("Pages", style="cyan", justify="right")
+        table.add_column("Problems", style="yellow")
+        for entry in flagged:
+            table.add_row(f"{entry['first_page']}-{entry['last_page']}", "; ".join(entry['problems']))
+        self.console.print(table)
+        self.console.print()
+
+    def repair(self, pdf_url: str, output_filename: str = "DeltekOpenPlanDeveloperGuide.md",
+               max_pages: Optional[int] = None, max_workers: int = 4, engine: str = "threads",
+               concurrency: int = 16, extract_workers: int = 1, clean: bool = True) -> Path:
+        """
+        Re-convert only the page ranges of an existing output that fail validation.
+
+        The page map written next to the output locates each converted page
+        range. The source is extracted again (with the same options as the
+        original run), each range is validated against its pages, and flagged
+        ranges are re-converted with the primary model, bypassing cached
+        responses, and spliced back into the output in place. Every other
+        range is left as it is.
+        """
+        output_path = self.output_dir / output_filename
+        map_path = output_path.with_suffix(".pages.json")
+        if not output_path.exists() or not map_path.exists():
+            raise Exception(f"Nothing to repair: {output_path} or its page map {map_path.name} is missing")
+
+        self.console.print(f"[bold yellow]🔧 Repairing {output_path}[/bold yellow]")
+        markdown = output_path.read_text(encoding='utf-8')
+        with open(map_path, 'r', encoding='utf-8') as f:
+            ranges = json.load(f)['ranges']
+
+        pdf_path = self.fetch_source(pdf_url)
+        pages_text, _ = self._read_source(pdf_path, max_pages, extract_workers, False, clean)
+        pages_by_num = {page['page_num']: page for page in pages_text}
+
+        pieces = []
+        for entry in ranges:
+            pages = [pages_by_num.get(n) for n in range(entry['first_page'], entry['last_page'] + 1)]
+            if None in pages or entry['end'] > len(markdown):
+                raise Exception(f"Page map {map_path.name} does not match the source or output "
+                                f"(pages {entry['first_page']}-{entry['last_page']})")
+            pieces.append((pages, markdown[entry['start']:entry['end']]))
+
+        flagged = self.validate_pieces(pieces)
+        if not flagged:
+            self.console.print("[green]✓ No page ranges need repair[/green]\n")
+            return output_path
+        self._print_flagged(flagged)
+
+        # Flagged ranges go to the model even if they were converted locally
+        chunks = [
+            [{k: v for k, v in page.items() if k != 'markdown'} for page in pieces[entry['index']][0]]
+            for entry in flagged
+        ]
+        job = DocumentJob("repair", chunks, self.metrics, num_chunks=len(chunks),
+                          total_pages=sum(len(chunk) for chunk in chunks), label_prefix="Repair ")
+        fast_model = self.router.fast_model
+        self.router.fast_model = None
+        self.cache_reads = False
+        try:
+            self._run_jobs([job], max_workers, engine, concurrency)
+        finally:
+            self.router.fast_model = fast_model
+            self.cache_reads = True
+            job.close()
+
+        replacements = {entry['index']: job.completed_chunks[i] for i, entry in enumerate(flagged)}
+        repaired = []
+        for index, piece in enumerate(pieces):
+            repaired.extend(replacements.get(index, [piece]))
+
+        write_file_durably(output_path, "\n\n".join(markdown for _, markdown in repaired))
+        self._write_page_map(output_path, pdf_url, repaired)
+
+        remaining = self.validate_pieces(repaired)
+        self.metrics.write_report(
+            output_path.with_suffix(".repair.json"),
+            source=pdf_url,
+            output=str(output_path),
+            repaired=[{k: entry[k] for k in ('first_page', 'last_page', 'problems')} for entry in flagged],
+            validation=remaining
+        )
+        self.console.print(f"[bold green]✓ Re-converted {len(flagged)} page ranges "
+                           f"({job.total_pages} pages)[/bold green]")
+        self.console.print(f"[cyan]Validation:[/cyan] {self._validation_status(remaining)}\n")
+        self._print_flagged(remaining)
+        return output_path
+
+    def convert_batch(self, entries: list, chunk_size: int = 25, max_workers: int = 4,
+                      engine: str = "threads", concurrency: int = 16, chunk_tokens: int = 16000,
+                      extract_workers: int = 1, pipeline: bool = True, clean: bool = True,
+                      report_filename: str = "batch.report.json") -> list:
+        """
+        Convert several documents in one run (see load_manifest).
+
+        Chunks from all documents are interleaved on one shared worker pool
+        and rate limiter. Each document gets its own output, checkpoint
+        journal, call log and report; a consolidated report with per-document
+        and overall figures is written to report_filename. A source that
+        cannot be fetched is reported and skipped.
+
+        Returns:
+            list: Paths of the outputs written
+        """
+        self.console.print("\n" + "="*80)
+        self.console.print(Panel.fit(
+            "[bold cyan]PDF to Markdown Converter (Batch)[/bold cyan]\n"
+            f"[white]Documents:[/white] {len(entries)}\n"
+            f"[white]Output directory:[/white] {self.output_dir}\n"
+            + (f"[white]Async concurrency:[/white] {concurrency}" if engine == "async"
+               else f"[white]Parallel workers:[/white] {max_workers}"),
+            border_style="cyan"
+        ))
+        self.console.print("="*80)
+
+        # Documents extract side by side, so split the extraction processes between them
+        workers_per_document = max(1, extract_workers // len(entries))
+
+        jobs = []
+        documents = []
+        failed_sources = []
+        try:
+            for entry in entries:
+                output_path = self.output_dir / entry['output']
+                try:
+                    pdf_path = self.fetch_source(entry['source'])
+                    total_pages = self.count_source_pages(pdf_path, entry['max_pages'])
+                except Exception as e:
+                    self.console.print(f"[red]✗ Skipping {entry['source']}: {e}[/red]\n")
+                    failed_sources.append({'source': entry['source'], 'error': str(e)})
+                    continue
+
+                pages_text, cleaner = self._read_source(pdf_path, entry['max_pages'], workers_per_document,
+                                                        pipeline, clean)
+
+                metrics = RunMetrics()
+                metrics.open_log(output_path.with_suffix(".calls.jsonl"))
+                checkpoint_file = self.output_dir / f".{output_path.stem}.checkpoint.jsonl"
+                jobs.append(self._plan_document(output_path.stem, pages_text, chunk_size, chunk_tokens,
+                                                checkpoint_file, total_pages, metrics,
+                                                label_prefix=f"{output_path.stem}: "))
+                documents.append((entry, output_path, checkpoint_file, cleaner))
+
+            if not jobs:
+                raise Exception("No documents could be fetched")
+
+            self._print_models()
+            self._run_jobs(jobs, max_workers, engine, concurrency)
+        finally:
+            for job in jobs:
+                job.close()
+                job.metrics.close()
+
+        results = Table(title="Batch results", title_justify="left", box=None, padding=(0, 2))
+        results.add_column("Document", style="cyan")
+        results.add_column("Pages", justify="right")
+        results.add_column("Chunks", justify="right")
+        results.add_column("API calls", justify="right")
+        results.add_column("Subdivisions", justify="right")
+        results.add_column("Failed pages", justify="right")
+        results.add_column("Tokens saved", justify="right")
+        results.add_column("Local pages", justify="right")
+        results.add_column("Flagged", justify="right")
+        results.add_column("Size", justify="right")
+
+        outputs = []
+        reports = []
+        for job, (entry, output_path, checkpoint_file, cleaner) in zip(jobs, documents):
+            write_file_durably(output_path, job.markdown())
+            self._write_page_map(output_path, entry['source'], job.pieces())
+            CheckpointJournal(checkpoint_file).remove()  # Output is on disk, checkpoint no longer needed
+            outputs.append(output_path)
+            flagged = self.validate_pieces(job.pieces())
+
+            report = job.metrics.write_report(
+                output_path.with_suffix(".report.json"),
+                source=entry['source'],
+                output=str(output_path),
+                pages=job.pages_processed,
+                engine=engine,
+                cleaning=cleaner.summary() if cleaner else None,
+                validation=flagged
+            )
+            reports.append({k: v for k, v in report.items() if k != 'slowest_calls'})
+            results.add_row(
+                output_path.name,
+                str(job.pages_processed),
+                f"{job.planned}" + (f" ({job.resumed} resumed)" if job.resumed else ""),
+                str(report['api_calls']),
+                str(report['subdivisions']),
+                f"[red]{report['failed_pages']}[/red]" if report['failed_pages'] else "0",
+                f"~{report['cleaning']['tokens_saved']:,} ({report['cleaning']['percent_saved']}%)"
+                if cleaner else "-",
+                str(report['local_pages']),
+                f"[yellow]{len(flagged)}[/yellow]" if flagged else "0",
+                f"{output_path.stat().st_size:,} bytes"
+            )
+
+        report_path = self.output_dir / report_filename
+        total = RunMetrics.combine([job.metrics for job in jobs]).write_report(
+            report_path,
+            documents=reports,
+            failed_sources=failed_sources,
+            pages=sum(job.pages_processed for job in jobs),
+            engine=engine,
+            throttled_responses=self.rate_limiter.throttle_events,
+            cache_hits=self.cache.hits if self.cache else None,
+            cache_misses=self.cache.misses if self.cache else None
+        )
+
+        self.console.print(f"[bold green]✓ Batch completed: {len(outputs)}/{len(entries)} documents converted[/bold green]")
+        self.console.print(results)
+        self.console.print()
+
+        summary = Table(show_header=False, box=None, padding=(0, 2))
+        summary.add_row("[cyan]Pages processed:", f"[white]{total['pages']}[/white]")
+        summary.add_row("[cyan]API calls:", f"[white]{total['api_calls']} "
+                        f"({total['retries']} retries, {total['subdivisions']} subdivisions)[/white]")
+        if total['latency_p50'] is not None:
+            summary.add_row(
+                "[cyan]Latency p50/p95/p99:",
+                f"[white]{total['latency_p50']:.1f}s / {total['latency_p95']:.1f}s / "
+                f"{total['latency_p99']:.1f}s[/white]"
+            )
+        if total['cost'] is not None:
+            summary.add_row("[cyan]Cost:", f"[white]${total['cost']:.4f}[/white]")
+        if self.rate_limiter.throttle_events:
+            summary.add_row("[cyan]Throttled responses:", f"[white]{self.rate_limiter.throttle_events}[/white]")
+        if failed_sources:
+            summary.add_row("[cyan]Skipped sources:", f"[red]{len(failed_sources)}[/red]")
+        summary.add_row("[cyan]Batch report:", f"[white]{report_path}[/white]")
+
+        self.console.print(summary)
+        self.console.print()
+
+        return outputs
+
+
+def split_output(output_path: Path, split_dir: Path) -> None:
+    """Run the guide splitter over a converted document."""
+    # Imported here: split_guide imports from this module
+    from split_guide import split_guide
+
+    stats = split_guide(output_path, split_dir)
+    Console().print(
+        f"[bold green]✓ Split into {split_dir}:[/bold green] {stats['written']} written, "
+        f"{stats['unchanged']} unchanged, {stats['removed']} removed"
+    )
+
+
+def index_outputs(db_path: str, roots: list) -> None:
+    """Update the docs search index for the converted output."""
+    # Imported here to keep sqlite out of the conversion path
+    from docs_index import update_index
+
+    stats = update_index(db_path, roots)
+    Console().print(
+        f"[bold green]✓ Search index updated:[/bold green] {stats['indexed']} files re-indexed, "
+        f"{stats['unchanged']} unchanged, {stats['removed']} removed"
+    )
+
+
+def check_output_links(root: str) -> int:
+    """Check relative links under root; returns the exit code (1 if any link is dangling)."""
+    from link_checker import check_links
+
+    result = check_links([root])
+    if result['dangling']:
+        console = Console()
+        console.print(f"[bold red]✗ {len(result['dangling'])} dangling links in {root}:[/bold red]")
+        for source, line, target, problem in result['dangling'][:20]:
+            console.print(f"  {source}:{line} → {target} ({problem})")
+        return 1
+    Console().print(f"[bold green]✓ {result['links']} links checked in {root}[/bold green]")
+    return 0
+
 
 def main():
     """Main entry point."""
@@ -410,7 +3585,12 @@ def main():
         '--pdf-url',
         type=str,
         default='https://dsm.deltek.com/DeltekSoftwareManagerWebServices/downloadFile.ashx?documentid=C6E40CBC-E0A5-4722-8E62-1E827AD56D8A',
-        help='URL to the PDF document'
+        help='URL, file:// URL or local path of the PDF (or .pptx) document'
+    )
+    parser.add_argument(
+        '--manifest',
+        type=str,
+        help='JSON manifest of documents to convert in one batch (replaces --pdf-url/--output)'
     )
     parser.add_argument(
         '--output',
@@ -433,7 +3613,13 @@ def main():
         '--chunk-size',
         type=int,
         default=25,
-        help='Pages per processing chunk (default: 25, smaller = more reliable)'
+        help='Maximum pages per processing chunk (default: 25, smaller = more reliable)'
+    )
+    parser.add_argument(
+        '--chunk-tokens',
+        type=int,
+        default=16000,
+        help='Target estimated input tokens per chunk (default: 16000)'
     )
     parser.add_argument(
         '--workers',
@@ -441,18 +3627,231 @@ def main():
         default=4,
         help='Number of parallel workers (default: 4, max recommended: 6)'
     )
+    parser.add_argument(
+        '--extract-workers',
+        type=int,
+        default=min(8, os.cpu_count() or 1),
+        help='Processes used for PDF text extraction (default: CPU count, max 8)'
+    )
+    parser.add_argument(
+        '--no-pipeline',
+        action='store_true',
+        help='Extract the whole PDF before converting instead of streaming pages to the workers'
+    )
+    parser.add_argument(
+        '--no-clean',
+        action='store_true',
+        help='Send extracted text as-is instead of stripping running headers/footers locally'
+    )
+    parser.add_argument(
+        '--split-dir',
+        type=str,
+        help='After converting, split the output into one page per object/property/method here '
+             '(see split_guide.py; not with --manifest)'
+    )
+    parser.add_argument(
+        '--index-db',
+        type=str,
+        help='After converting, update the docs search index at this path for the output (see docs_index.py)'
+    )
+    parser.add_argument(
+        '--check-links',
+        action='store_true',
+        help='After converting, check relative links in the output (or --split-dir tree) (see link_checker.py)'
+    )
+    parser.add_argument(
+        '--layout',
+        action='store_true',
+        help='Render PDF tables and code blocks locally and skip the model for pages with nothing else'
+    )
+    parser.add_argument(
+        '--route-simple',
+        action='store_true',
+        help='Format PDF pages without tables, code or multi-column layout locally instead of with the model'
+    )
+    parser.add_argument(
+        '--repair',
+        action='store_true',
+        help='Re-convert only the page ranges of an existing output that fail validation '
+             '(use the same extraction options as the original run)'
+    )
+    parser.add_argument(
+        '--model',
+        type=str,
+        default=DEFAULT_MODEL,
+        help=f'Primary OpenRouter model (default: {DEFAULT_MODEL})'
+    )
+    parser.add_argument(
+        '--max-tokens',
+        type=int,
+        default=DEFAULT_MAX_TOKENS,
+        help=f'Output token cap for the primary model (default: {DEFAULT_MAX_TOKENS})'
+    )
+    parser.add_argument(
+        '--fast-model',
+        type=str,
+        help='Faster, cheaper model for low-complexity chunks (e.g. anthropic/claude-3.5-haiku)'
+    )
+    parser.add_argument(
+        '--fast-max-tokens',
+        type=int,
+        default=16000,
+        help='Output token cap for the fast model (default: 16000)'
+    )
+    parser.add_argument(
+        '--fast-max-complexity',
+        type=int,
+        default=2,
+        help='Highest page complexity score sent to the fast model (default: 2; tables score 3)'
+    )
+    parser.add_argument(
+        '--escalate-on',
+        choices=ESCALATION_RULES,
+        nargs='+',
+        default=['invalid', 'truncated'],
+        help='Fast-model failures retried on the primary model (default: invalid truncated)'
+    )
+    parser.add_argument(
+        '--engine',
+        choices=['threads', 'async'],
+        default='threads',
+        help='Conversion engine: thread pool or asyncio with pooled connections (default: threads)'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=16,
+        help='Maximum in-flight requests for the async engine (default: 16)'
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Stream responses (SSE) so stalled requests are abandoned quickly'
+    )
+    parser.add_argument(
+        '--stream-idle-timeout',
+        type=float,
+        default=30.0,
+        help='Seconds without any streamed data before a request is retried (default: 30)'
+    )
+    parser.add_argument(
+        '--first-token-timeout',
+        type=float,
+        default=120.0,
+        help='Seconds without any streamed content before a request is retried (default: 120)'
+    )
+    parser.add_argument(
+        '--rate-limit',
+        type=float,
+        default=10.0,
+        help='Maximum requests per second across all workers (default: 10)'
+    )
+    parser.add_argument(
+        '--download-dir',
+        type=str,
+        default='.converter_cache/downloads',
+        help='Directory for cached source downloads (default: .converter_cache/downloads)'
+    )
+    parser.add_argument(
+        '--pptx-images',
+        type=str,
+        help='Save pictures from .pptx slides to this directory and reference them (skipped by default)'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default='.converter_cache',
+        help='Directory for cached chunk responses (default: .converter_cache)'
+    )
+    parser.add_argument(
+        '--cache-max-mb',
+        type=int,
+        default=512,
+        help='Maximum size of the response cache in MB (default: 512)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Disable the response cache and always call the API'
+    )
 
     args = parser.parse_args()
+    if args.split_dir and args.manifest:
+        # The splitter builds one tree from the developer guide, not one per document
+        parser.error("--split-dir cannot be combined with --manifest")
 
     try:
-        converter = PDFToMarkdownConverter(output_dir=args.output_dir)
-        converter.convert(
-            pdf_url=args.pdf_url,
-            output_filename=args.output,
-            max_pages=args.max_pages,
-            chunk_size=args.chunk_size,
-            max_workers=args.workers
+        entries = load_manifest(Path(args.manifest)) if args.manifest else None
+        converter = PDFToMarkdownConverter(
+            output_dir=args.output_dir,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+            requests_per_second=args.rate_limit,
+            stream=args.stream,
+            stream_idle_timeout=args.stream_idle_timeout,
+            first_token_timeout=args.first_token_timeout,
+            download_dir=args.download_dir,
+            pptx_image_dir=args.pptx_images,
+            layout=args.layout,
+            route_simple=args.route_simple,
+            model=args.model,
+            max_tokens=args.max_tokens,
+            fast_model=args.fast_model,
+            fast_max_tokens=args.fast_max_tokens,
+            fast_max_complexity=args.fast_max_complexity,
+            escalate_on=args.escalate_on
         )
+        if entries:
+            for entry in entries:
+                if entry['max_pages'] is None:
+                    entry['max_pages'] = args.max_pages
+
+        if args.repair:
+            for entry in entries or [{'source': args.pdf_url, 'output': args.output,
+                                      'max_pages': args.max_pages}]:
+                converter.repair(
+                    pdf_url=entry['source'],
+                    output_filename=entry['output'],
+                    max_pages=entry['max_pages'],
+                    max_workers=args.workers,
+                    engine=args.engine,
+                    concurrency=args.concurrency,
+                    extract_workers=args.extract_workers,
+                    clean=not args.no_clean
+                )
+        elif entries:
+            converter.convert_batch(
+                entries,
+                chunk_size=args.chunk_size,
+                max_workers=args.workers,
+                engine=args.engine,
+                concurrency=args.concurrency,
+                chunk_tokens=args.chunk_tokens,
+                extract_workers=args.extract_workers,
+                pipeline=not args.no_pipeline,
+                clean=not args.no_clean
+            )
+        else:
+            converter.convert(
+                pdf_url=args.pdf_url,
+                output_filename=args.output,
+                max_pages=args.max_pages,
+                chunk_size=args.chunk_size,
+                max_workers=args.workers,
+                engine=args.engine,
+                concurrency=args.concurrency,
+                chunk_tokens=args.chunk_tokens,
+                extract_workers=args.extract_workers,
+                pipeline=not args.no_pipeline,
+                clean=not args.no_clean
+            )
+
+        if args.split_dir:
+            split_output(Path(args.output_dir) / args.output, Path(args.split_dir))
+        if args.index_db:
+            index_outputs(args.index_db, [args.output_dir] + ([args.split_dir] if args.split_dir else []))
+        if args.check_links:
+            return check_output_links(args.split_dir or args.output_dir)
         return 0
 
     except KeyboardInterrupt:
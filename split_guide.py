@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Split the monolithic developer guide into the docs/developer-guide tree
+One page per object, collection, property and method, plus index pages
+
+  python3 split_guide.py
+  python3 split_guide.py --guide docs_mistral/DeltekOpenPlanDeveloperGuide.md --dry-run
+"""
+
+import re
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Dict, Optional
+from rich.console import Console
+from rich.table import Table
+
+from converter_utils import write_file_durably
+
+
+# Headings that name a reference entry, e.g. "OPActivity Object" or "Duration Property"
+ENTITY_HEADING_RE = re.compile(
+    r"^(?P<name>OP\w+)\s+(?P<kind>Object|Collection)$|^(?P<member>\w[\w ]*?)\s+(?P<member_kind>Property|Method)$",
+    re.IGNORECASE
+)
+
+# Running page headers the conversion left behind as headings
+RUNNING_HEADERS = {
+    "integration developer's guide",
+    "properties reference",
+    "deltek open plan® developer's guide"
+}
+
+# Output directory for each kind of page
+KIND_DIRS = {
+    'object': 'objects',
+    'collection': 'objects',
+    'property': 'properties',
+    'method': 'methods',
+    'topic': 'topics'
+}
+
+# Record of generated files and their content hashes, kept in the output directory
+MANIFEST_NAME = ".split-manifest.json"
+
+# Longest summary taken from a page's description for the index pages
+SUMMARY_CHARS = 120
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+FENCE_RE = re.compile(r"^\s*(```|~~~)")
+MARKDOWN_LINK_RE = re.compile(r"\[[^\]]*\]\([^)]*\)|`[^`]*`")
+OBJECT_NAME_RE = re.compile(r"\bOP[A-Za-z0-9]+\b")
+
+
+def slugify(name: str) -> str:
+    """File name stem for an entry, matching the hand-written pages (e.g. "earlystartstddev")."""
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def topic_slug(title: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-") or "topic"
+
+
+class Page:
+    """One output page: a reference entry or a topic, with its body lines."""
+
+    def __init__(self, kind: str, name: str, title: str, level: int):
+        self.kind = kind
+        self.name = name
+        self.title = title
+        self.level = level
+        self.slug = topic_slug(title) if kind == 'topic' else slugify(name)
+        self.lines: list = []
+
+    @property
+    def path(self) -> str:
+        return f"{KIND_DIRS[self.kind]}/{self.slug}.md"
+
+    def summary(self) -> str:
+        """First sentence of the description, for index pages."""
+        text = "\n".join(self.lines)
+        match = re.search(r"(?:\*\*Description\*\*:?|^#+\s*Description)\s*:?[ \t]*\n?(.+)", text, re.MULTILINE)
+        if not match:
+            return ""
+        sentence = re.split(r"(?<=\.)\s", re.sub(r"[*_`]", "", match.group(1)).strip(), maxsplit=1)[0]
+        return sentence if len(sentence) <= SUMMARY_CHARS else sentence[:SUMMARY_CHARS - 3].rstrip() + "..."
+
+
+def parse_guide(text: str) -> list:
+    """
+    Split the guide into pages in one pass over its lines.
+
+    A heading naming an object, collection, property or method starts a
+    reference page; deeper headings belong to it. Any other heading at level
+    1 or 2 starts a topic page. Running headers are dropped wherever they
+    appear, and headings inside code blocks are ignored. Entries that appear
+    more than once (the guide repeats some) are merged in order.
+
+    Returns:
+        list: Page objects in order of first appearance
+    """
+    pages: Dict[str, Page] = {}
+    current: Optional[Page] = None
+    in_fence = False
+
+    for line in text.splitlines():
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+        heading = None if in_fence else HEADING_RE.match(line)
+        if not heading:
+            if current is not None:
+                current.lines.append(line)
+            continue
+
+        level, title = len(heading.group(1)), heading.group(2).strip()
+        if title.lower() in RUNNING_HEADERS:
+            continue
+
+        entity = ENTITY_HEADING_RE.match(title)
+        if entity:
+            if entity.group('name'):
+                kind, name = entity.group('kind').lower(), entity.group('name')
+            else:
+                kind, name = entity.group('member_kind').lower(), entity.group('member').strip()
+            page = Page(kind, name, title, level)
+        elif current is not None and level > current.level and current.kind != 'topic':
+            # A subsection of the current entry, re-levelled under its title
+            current.lines.append("#" * max(2, level - current.level + 1) + " " + title)
+            continue
+        elif level <= 2:
+            page = Page('topic', title, title, level)
+        elif current is not None:
+            current.lines.append("#" * max(2, level - current.level + 1) + " " + title)
+            continue
+        else:
+            continue
+
+        existing = pages.get(page.path)
+        if existing:
+            existing.lines.append("")
+            current = existing
+        else:
+            pages[page.path] = page
+            current = page
+
+    return [page for page in pages.values() if any(line.strip() for line in page.lines)]
+
+
+def _relative(from_page: Page, kind: str, slug: str) -> str:
+    directory = KIND_DIRS[kind]
+    if directory == KIND_DIRS[from_page.kind]:
+        return f"{slug}.md"
+    return f"../{directory}/{slug}.md"
+
+
+def render_page(page: Page, known: Dict[str, set]) -> str:
+    """
+    Render a page with links to the other generated pages.
+
+    Object names (OP...) are linked wherever they appear in prose. On object
+    pages, table cells and list items that are exactly a property or method
+    name are linked to that page, according to the Properties or Methods
+    label they fall under.
+    """
+    lines = [f"# {page.title}", ""]
+    in_fence = False
+    member_kind = None
+
+    def link_objects(segment: str) -> str:
+        def replace(match):
+            slug = slugify(match.group(0))
+            if slug in known['objects'] and not (page.kind in ('object', 'collection') and slug == page.slug):
+                return f"[{match.group(0)}]({_relative(page, 'object', slug)})"
+            return match.group(0)
+        return OBJECT_NAME_RE.sub(replace, segment)
+
+    def link_member(cell: str) -> str:
+        name = cell.strip()
+        if member_kind and slugify(name) in known[KIND_DIRS[member_kind]]:
+            return cell.replace(name, f"[{name}]({_relative(page, member_kind, slugify(name))})")
+        return cell
+
+    for line in page.lines:
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+        if in_fence or FENCE_RE.match(line) or line.startswith("#"):
+            lines.append(line)
+            if line.startswith("#") and not in_fence:
+                label = line.lstrip("#").strip().lower()
+                member_kind = 'property' if 'propert' in label else 'method' if 'method' in label else None
+            continue
+
+        label = re.match(r"^\*\*(\w+)\*\*:?\s*$", line.strip())
+        if label:
+            word = label.group(1).lower()
+            member_kind = 'property' if word == 'properties' else 'method' if word == 'methods' else None
+
+        if page.kind in ('object', 'collection') and member_kind:
+            if line.lstrip().startswith("|") and not re.match(r"^\s*\|[\s:|-]+\|\s*$", line):
+                line = "|".join(link_member(cell) if cell.strip() else cell for cell in line.split("|"))
+            elif re.match(r"^\s*[-*]\s+\w+\s*$", line):
+                bullet, name = re.match(r"^(\s*[-*]\s+)(\w+)\s*$", line).groups()
+                line = bullet + link_member(name)
+
+        # Link object names outside existing links and inline code
+        parts = []
+        position = 0
+        for match in MARKDOWN_LINK_RE.finditer(line):
+            parts.append(link_objects(line[position:match.start()]))
+            parts.append(match.group(0))
+            position = match.end()
+        parts.append(link_objects(line[position:]))
+        lines.append("".join(parts))
+
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip() + "\n"
+
+
+def render_indexes(pages: list) -> Dict[str, str]:
+    """Index pages for each directory, plus objects/collections.md with one anchor per collection."""
+    def entry(page: Page) -> str:
+        summary = page.summary()
+        return f"- [{page.name}]({page.slug}.md)" + (f" - {summary}" if summary else "")
+
+    by_kind: Dict[str, list] = {}
+    for page in pages:
+        by_kind.setdefault(page.kind, []).append(page)
+    for kind_pages in by_kind.values():
+        kind_pages.sort(key=lambda p: p.name.lower())
+
+    indexes = {}
+    objects = ["# Objects and Collections", ""]
+    for kind, heading in (('object', "Objects"), ('collection', "Collections")):
+        if by_kind.get(kind):
+            objects += [f"## {heading}", ""] + [entry(page) for page in by_kind[kind]] + [""]
+    indexes['objects/index.md'] = "\n".join(objects)
+
+    collections = ["# Collections", ""]
+    for page in by_kind.get('collection', []):
+        collections += [f"## {page.title}", "", entry(page)[2:], ""]
+    indexes['objects/collections.md'] = "\n".join(collections)
+
+    for kind, title in (('property', "Properties"), ('method', "Methods")):
+        lines = [f"# {title}", ""]
+        letter = None
+        for page in by_kind.get(kind, []):
+            if page.name[0].upper() != letter:
+                letter = page.name[0].upper()
+                lines += ["", f"## {letter}", ""]
+            lines.append(entry(page))
+        indexes[f"{KIND_DIRS[kind]}/index.md"] = re.sub(r"\n{3,}", "\n\n", "\n".join(lines))
+
+    indexes['topics/index.md'] = "\n".join(
+        ["# Topics", ""] + [f"- [{page.title}]({page.slug}.md)" for page in by_kind.get('topic', [])]
+    )
+    return {path: content.strip() + "\n" for path, content in indexes.items()}
+
+
+def split_guide(guide_path: Path, out_dir: Path, force: bool = False, dry_run: bool = False) -> dict:
+    """
+    Split the guide into out_dir, writing only pages whose content changed.
+
+    Generated files are recorded with their content hashes in a manifest in
+    out_dir, so an unchanged page is not rewritten and pages no longer
+    generated are removed. Files the splitter did not create (the
+    hand-written pages) are left alone unless force is set.
+
+    Returns:
+        dict: Counts of pages written, unchanged, kept (hand-written), removed, total
+    """
+    text = guide_path.read_text(encoding='utf-8')
+    pages = parse_guide(text)
+    known = {directory: set() for directory in set(KIND_DIRS.values())}
+    for page in pages:
+        known[KIND_DIRS[page.kind]].add(page.slug)
+
+    outputs = {page.path: render_page(page, known) for page in pages}
+    outputs.update(render_indexes(pages))
+
+    manifest_path = out_dir / MANIFEST_NAME
+    manifest = {}
+    if manifest_path.exists():
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    stats = {'written': 0, 'unchanged': 0, 'kept': 0, 'removed': 0, 'total': len(outputs)}
+    new_manifest = {}
+    for path, content in sorted(outputs.items()):
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        target = out_dir / path
+        if target.exists() and path not in manifest and not force:
+            stats['kept'] += 1
+            continue
+        new_manifest[path] = digest
+        if target.exists() and manifest.get(path) == digest:
+            stats['unchanged'] += 1
+            continue
+        stats['written'] += 1
+        if not dry_run:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            write_file_durably(target, content)
+
+    for path in set(manifest) - set(new_manifest):
+        stats['removed'] += 1
+        if not dry_run:
+            (out_dir / path).unlink(missing_ok=True)
+
+    if not dry_run:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        write_file_durably(manifest_path, json.dumps(new_manifest, indent=1, sort_keys=True))
+    return stats
+
+
+def print_stats(console: Console, stats: dict, out_dir: Path) -> None:
+    summary = Table(show_header=False, box=None, padding=(0, 2))
+    summary.add_row("[cyan]Output:", f"[white]{out_dir}[/white]")
+    summary.add_row("[cyan]Pages generated:", f"[white]{stats['total']}[/white]")
+    summary.add_row("[cyan]Written:", f"[white]{stats['written']}[/white]")
+    summary.add_row("[cyan]Unchanged:", f"[white]{stats['unchanged']}[/white]")
+    summary.add_row("[cyan]Hand-written pages kept:", f"[white]{stats['kept']}[/white]")
+    summary.add_row("[cyan]Removed:", f"[white]{stats['removed']}[/white]")
+    console.print(summary)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Split the developer guide into one page per object, property and method',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        '--guide',
+        type=str,
+        default='docs/DeltekOpenPlanDeveloperGuide.md',
+        help='Monolithic guide to split (default: docs/DeltekOpenPlanDeveloperGuide.md)'
+    )
+    parser.add_argument(
+        '--out',
+        type=str,
+        default='docs/developer-guide',
+        help='Output tree (default: docs/developer-guide)'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Overwrite hand-written pages that a generated page would replace'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Report what would change without writing anything'
+    )
+
+    args = parser.parse_args()
+    console = Console()
+
+    try:
+        stats = split_guide(Path(args.guide), Path(args.out), args.force, args.dry_run)
+        console.print(f"[bold green]✓ Split {args.guide}[/bold green]" + (" (dry run)" if args.dry_run else ""))
+        print_stats(console, stats, Path(args.out))
+        return 0
+
+    except FileNotFoundError as e:
+        console.print(f"\n[bold red]✗ Error: {str(e)}[/bold red]")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import re
+
+import pytest
+
+from mistral_ocr_converter import AsyncChunkEngine, PDFToMarkdownConverter
+
+PAGES = [{'page_num': n, 'text': f"Page {n} text"} for n in (1, 2, 3)]
+
+
+class FakeContent:
+    def __init__(self, lines):
+        self.lines = list(lines)
+
+    async def readline(self):
+        return self.lines.pop(0) + b"\n" if self.lines else b""
+
+
+class FakeAsyncResponse:
+    def __init__(self, status=200, body=b"", lines=(), headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self.body = body
+        self.content = FakeContent(lines)
+
+    async def read(self):
+        return self.body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeAsyncSession:
+    """Answers each request with markdown for the pages in its prompt; throttles the first if asked."""
+
+    def __init__(self, stream=False, throttle_first=False):
+        self.stream = stream
+        self.throttle_first = throttle_first
+        self.requests = []
+        self.closed = False
+
+    def post(self, url, **kwargs):
+        payload = kwargs['json']
+        self.requests.append(payload)
+        if self.throttle_first and len(self.requests) == 1:
+            return FakeAsyncResponse(status=429, body=b"rate limited", headers={'Retry-After': '0'})
+        pages = re.findall(r"PAGE (\d+):", payload['messages'][0]['content'])
+        content = "\n\n".join(f"<!-- page {n} -->\n## Page {n}" for n in pages)
+        if self.stream:
+            event = {'choices': [{'delta': {'content': content}, 'finish_reason': 'stop'}]}
+            return FakeAsyncResponse(lines=[f"data: {json.dumps(event)}".encode(), b"data: [DONE]"])
+        body = {'choices': [{'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+                'usage': {'prompt_tokens': 10, 'completion_tokens': 5}}
+        return FakeAsyncResponse(body=json.dumps(body).encode())
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def async_converter(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test")
+
+    def make(**session_options):
+        session = FakeAsyncSession(**session_options)
+
+        async def fake_open(engine):
+            return session, asyncio.Semaphore(engine.concurrency)
+
+        monkeypatch.setattr(AsyncChunkEngine, "_open", fake_open)
+        converter = PDFToMarkdownConverter(output_dir=str(tmp_path / "out"), cache_dir=None,
+                                           stream=session.stream, retry_delay=0, requests_per_second=1000)
+        return converter, session
+    return make
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_async_engine_converts_chunks_in_page_order(async_converter, stream):
+    converter, session = async_converter(stream=stream)
+    markdown = converter.convert_to_markdown(iter(PAGES), chunk_size=1, engine="async", concurrency=3)
+
+    assert markdown.index("## Page 1") < markdown.index("## Page 2") < markdown.index("## Page 3")
+    assert len(session.requests) == 3
+    assert session.closed
+    assert converter.metrics.summary()['api_calls'] == 3
+    assert converter.rate_limiter._in_flight == 0
+
+
+def test_async_engine_retries_throttled_request(async_converter):
+    converter, session = async_converter(throttle_first=True)
+    markdown = converter.convert_to_markdown(list(PAGES), chunk_size=3, engine="async")
+
+    assert "## Page 3" in markdown
+    assert len(session.requests) == 2
+    summary = converter.metrics.summary()
+    assert (summary['throttled'], summary['http_requests'], summary['prompt_tokens']) == (1, 2, 10)
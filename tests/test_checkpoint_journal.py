@@ -0,0 +1,64 @@
+from mistral_ocr_converter import CheckpointJournal, split_page_output
+
+PAGES = [{'page_num': n, 'text': f"Source text of page {n}"} for n in range(1, 26)]
+
+
+def marked(pages, skip=()):
+    return "\n\n".join(
+        (f"<!-- page {page['page_num']} -->\n" if page['page_num'] not in skip else "")
+        + f"Page {page['page_num']} markdown"
+        for page in pages
+    )
+
+
+def expected(pages):
+    return "\n\n".join(f"Page {page['page_num']} markdown" for page in pages)
+
+
+def test_sub_ranges_of_a_recorded_chunk_are_served(tmp_path):
+    journal = CheckpointJournal(tmp_path / "run.jsonl")
+    journal.append(PAGES, marked(PAGES))
+    journal.close()
+
+    resumed = CheckpointJournal(tmp_path / "run.jsonl")
+    assert resumed.load() == 25
+    assert resumed.lookup(PAGES[:10]) == expected(PAGES[:10])
+    assert resumed.lookup(PAGES[7:19]) == expected(PAGES[7:19])
+    assert resumed.lookup(PAGES) == expected(PAGES)
+
+
+def test_changed_page_text_is_not_served(tmp_path):
+    journal = CheckpointJournal(tmp_path / "run.jsonl")
+    journal.append(PAGES, marked(PAGES))
+    changed = [dict(page) for page in PAGES[:10]]
+    changed[4]['text'] = "Edited"
+    assert journal.lookup(changed) is None
+    assert journal.lookup(PAGES[5:10]) == expected(PAGES[5:10])
+
+
+def test_page_without_marker_stays_with_the_page_before(tmp_path):
+    pieces = split_page_output(marked(PAGES[:4], skip={3}), PAGES[:4])
+    assert [[page['page_num'] for page in pages] for pages, _ in pieces] == [[1], [2, 3], [4]]
+
+    journal = CheckpointJournal(tmp_path / "run.jsonl")
+    journal.append(PAGES[:4], marked(PAGES[:4], skip={3}))
+    assert journal.lookup(PAGES[:1]) == expected(PAGES[:1])
+    assert journal.lookup(PAGES[:2]) is None
+    assert journal.lookup(PAGES[1:4]) == expected(PAGES[1:4])
+
+
+def test_unmarked_output_and_torn_line(tmp_path):
+    path = tmp_path / "run.jsonl"
+    journal = CheckpointJournal(path)
+    journal.append(PAGES[:3], "Whole range")
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"first_page": 4, "last_')
+
+    resumed = CheckpointJournal(path)
+    assert resumed.load() == 1
+    assert resumed.lookup(PAGES[:3]) == "Whole range"
+    assert resumed.lookup(PAGES[:2]) is None
+    resumed.append(PAGES[3:4], marked(PAGES[3:4]))
+    resumed.close()
+    assert CheckpointJournal(path).load() == 2
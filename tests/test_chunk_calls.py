@@ -0,0 +1,143 @@
+import io
+import json
+
+import pytest
+from rich.console import Console
+
+from mistral_ocr_converter import (
+    ChunkTimeoutError, EmptyResponseError, PDFToMarkdownConverter, SSEAccumulator, StreamEventError,
+    StreamStalledError
+)
+
+PAGES = [{'page_num': 1, 'text': "Calculated fields"}]
+
+
+class FakeResponse:
+    def __init__(self, lines=None, body=None, status=200, headers=None):
+        self.status_code = status
+        self.headers = headers or {}
+        self.lines = lines or []
+        self.body = body
+        self.text = json.dumps(body)
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def iter_lines(self):
+        return iter(self.lines)
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.posts = 0
+
+    def post(self, *args, **kwargs):
+        self.posts += 1
+        return self.responses.pop(0)
+
+
+def sse(*events):
+    return [f"data: {json.dumps(event)}".encode() for event in events] + [b"data: [DONE]"]
+
+
+@pytest.fixture
+def make_converter(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test")
+
+    def make(responses, stream=False):
+        converter = PDFToMarkdownConverter(output_dir=str(tmp_path / "out"), cache_dir=None,
+                                           stream=stream, retry_delay=0, requests_per_second=1000)
+        converter.session = FakeSession(responses)
+        return converter
+    return make
+
+
+def call_chunk(converter):
+    call = converter.metrics.start_call(PAGES, "Chunk 1")
+    return converter._call_chunk_api(PAGES, "Chunk 1", call), call
+
+
+def test_stream_error_event_is_retryable():
+    accumulator = SSEAccumulator()
+    with pytest.raises(StreamStalledError):
+        accumulator.feed(b'data: {"error": {"message": "upstream overloaded"}}')
+    assert issubclass(StreamEventError, StreamStalledError)
+
+
+def test_stream_error_event_retried_and_slot_returned(make_converter):
+    content = {'choices': [{'delta': {'content': "## Page 1\n\nCalculated fields"}, 'finish_reason': 'stop'}]}
+    converter = make_converter([
+        FakeResponse(sse({'error': {'message': "upstream overloaded"}})),
+        FakeResponse(sse(content))
+    ], stream=True)
+
+    markdown, call = call_chunk(converter)
+    assert "Calculated fields" in markdown
+    assert call['attempts'] == 2
+    assert converter.rate_limiter._in_flight == 0
+
+
+def test_repeated_stream_errors_fail_without_leaking_slots(make_converter):
+    error = FakeResponse(sse({'error': {'message': "upstream overloaded"}}))
+    converter = make_converter([error, error, error], stream=True)
+
+    with pytest.raises(ChunkTimeoutError):
+        call_chunk(converter)
+    assert converter.rate_limiter._in_flight == 0
+
+
+def completion(content):
+    return FakeResponse(body={'choices': [{'message': {'role': 'assistant', 'content': content},
+                                           'finish_reason': 'stop'}]})
+
+
+def test_null_content_retried(make_converter):
+    converter = make_converter([completion(None), completion(""), completion("## Page 1")])
+    markdown, call = call_chunk(converter)
+    assert markdown == "## Page 1"
+    assert call['attempts'] == 3
+
+
+def test_empty_content_fails_as_invalid_after_retries(make_converter):
+    converter = make_converter([completion(None)] * 3)
+    with pytest.raises(EmptyResponseError):
+        call_chunk(converter)
+    assert converter.router.should_escalate(EmptyResponseError("empty"))
+
+
+def test_empty_stream_retried(make_converter):
+    content = {'choices': [{'delta': {'content': "## Page 1"}, 'finish_reason': 'stop'}]}
+    converter = make_converter([FakeResponse(sse()), FakeResponse(sse(content))], stream=True)
+    markdown, call = call_chunk(converter)
+    assert markdown == "## Page 1"
+    assert call['attempts'] == 2
+
+
+def test_throttled_stream_response_closed_before_retry(make_converter):
+    content = {'choices': [{'delta': {'content': "## Page 1"}, 'finish_reason': 'stop'}]}
+    throttled = FakeResponse(status=429, headers={'Retry-After': '0'})
+    converter = make_converter([throttled, FakeResponse(sse(content))], stream=True)
+    markdown, call = call_chunk(converter)
+    assert markdown == "## Page 1"
+    assert call['throttled'] == 1
+    assert throttled.closed
+
+
+def test_pipelined_plan_printed_as_chunks_are_planned(make_converter):
+    pages = [{'page_num': n, 'text': f"Page {n} text", 'sections': [[1, f"Section {n}"]]} for n in (1, 2)]
+    converter = make_converter([completion("<!-- page 1 -->\n## Page 1"), completion("<!-- page 2 -->\n## Page 2")])
+    converter.console = Console(file=io.StringIO(), width=200)
+
+    converter.convert_to_markdown(iter(pages), chunk_size=1, max_workers=1)
+    output = converter.console.file.getvalue()
+    assert "Planned Chunk 1: pages 1-1 (1)" in output
+    assert "Planned Chunk 2: pages 2-2 (1)" in output
+    assert "starts at Section 2" in output
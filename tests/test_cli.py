@@ -0,0 +1,14 @@
+import sys
+
+import pytest
+
+import mistral_ocr_converter
+
+
+def test_split_dir_rejected_with_manifest(monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["mistral_ocr_converter.py", "--manifest", "batch.json",
+                                      "--split-dir", "docs/developer-guide"])
+    with pytest.raises(SystemExit) as exit_info:
+        mistral_ocr_converter.main()
+    assert exit_info.value.code == 2
+    assert "--split-dir cannot be combined with --manifest" in capsys.readouterr().err
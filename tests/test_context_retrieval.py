@@ -0,0 +1,73 @@
+import os
+
+from context_retrieval import ContextRetriever
+from converter_utils import estimate_tokens
+
+GUIDE = """# Guide
+
+## Duration Property
+
+The Duration property sets the planned duration of an activity in the schedule.
+
+## Calendar Object
+
+Calendars define working time for activities and resources.
+"""
+
+KB = """# Knowledge Base
+
+## Duration
+
+The Duration property sets the planned duration of an activity in the schedule.
+
+## Filters
+
+Filters restrict which activities a view shows.
+"""
+
+
+def make(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "guide.md").write_text(GUIDE, encoding="utf-8")
+    (docs / "kb.md").write_text(KB, encoding="utf-8")
+    return docs, ContextRetriever(str(tmp_path / "index.db"), [str(docs)])
+
+
+def test_duplicates_skipped_and_budget_respected(tmp_path):
+    _, retriever = make(tmp_path)
+    context = retriever.retrieve("duration activity", 2000)
+    assert context.count("planned duration") == 1
+    assert retriever.last_stats['duplicate'] == 1
+
+    small = retriever.retrieve("duration activity", 30)
+    assert estimate_tokens(small) <= 30
+    retriever.close()
+
+
+def test_cache_hit_reports_its_own_stats(tmp_path):
+    _, retriever = make(tmp_path)
+    first = retriever.retrieve("duration", 2000)
+    first_stats = retriever.last_stats
+    retriever.retrieve("filters", 2000)
+    assert retriever.last_stats != first_stats
+
+    assert retriever.retrieve("duration", 2000) == first
+    assert retriever.last_stats == first_stats
+    assert retriever.cache_info().hits == 1
+    retriever.close()
+
+
+def test_edited_source_invalidates_cache(tmp_path):
+    docs, retriever = make(tmp_path)
+    assert "Calendars define" in retriever.retrieve("calendar", 2000)
+
+    guide = docs / "guide.md"
+    guide.write_text("# Guide\n\nInserted text shifts every offset.\n\n" + GUIDE.replace(
+        "Calendars define working time", "Calendars set working hours"), encoding="utf-8")
+    os.utime(guide, ns=(1, 1))
+
+    context = retriever.retrieve("calendar", 2000)
+    assert "Calendars set working hours" in context
+    assert context.startswith("<!-- source:") and "## Calendar Object" in context
+    retriever.close()
@@ -0,0 +1,109 @@
+import os
+
+from data_dictionary import DataDictionary, parse_csv, render_reference
+
+SHEET = (
+    ",OPP Reserved Code Fields,,,,,,,,,\r\n"
+    ",Act Code position,Code Level,Code Field Name,CSPR 3 System Code Position Requirement,"
+    "CSPR 3 System Code Values Requirement,Code File Maintained By,Example(s),Baselined?,"
+    "Description (w/ notes),Unrotated\r\n"
+    ",1,Activity Level,Work Breakdown Structure      (BDS Programs - if no C4),"
+    "Recommended (Mandatory by process)   ,Either matches WBS,Program Focal,\"1.3.1, 5150\",Yes,"
+    "\"Work Breakdown Structure Code.  \n\nNote:  Not populated   automatically.\",Yes\r\n"
+    ",4,Activity Level,Control Account,Mandatory,Matches Control Accounts,Program Focal,HAA10AAL,Yes,"
+    "Unique Identifier.,Yes\r\n"
+    ",22,Activity Level,Effectivity,Optional,-,Program Focal,\"FT50, IB50\",,Ground test.,\r\n"
+    ",37,Activity Level,Effectivity,Mandatory by Process,,Program Focal,YA001,,Aircraft.,\r\n"
+    ",56-99,Activity Level,\"Program Specific use\n(rotated)\",Optional,Defined by Program,Program Focal,-,,,No\r\n"
+    ",80,Project Level,SVD_C80_Project_Type,,Predetermined,IP&S Home Office Tools Team,"
+    "\"DEVELOPMENT\nPRODUCTION\",,Schedule visibility …,\r\n"
+)
+
+
+def load(tmp_path, cache=True):
+    path = tmp_path / "dictionary.csv"
+    path.write_bytes(SHEET.encode("cp1252"))
+    return path, DataDictionary.load(str(path), str(tmp_path / "cache.db") if cache else None)
+
+
+def test_parse_csv_cleans_cells():
+    fields = parse_csv(SHEET)
+    assert len(fields) == 6
+    wbs = fields[0]
+    assert wbs.level == "activity" and (wbs.first, wbs.last) == (1, 1)
+    assert wbs.name == "Work Breakdown Structure (BDS Programs - if no C4)"
+    assert wbs.short_name == "Work Breakdown Structure"
+    assert wbs.requirement == "Recommended (Mandatory by Process)"
+    assert wbs.examples == ("1.3.1", "5150")
+    assert wbs.baselined is True and wbs.unrotated is True
+    assert wbs.description == "Work Breakdown Structure Code.\n\nNote: Not populated automatically."
+    assert fields[4].examples == () and fields[4].unrotated is False
+
+
+def test_cp1252_sheet_and_lookups(tmp_path):
+    _, dictionary = load(tmp_path)
+    assert dictionary.field("C4").name == "Control Account"
+    assert dictionary.field(4) is dictionary.field("c4")
+    assert dictionary.field("C80").code == "C56-C99"
+    assert dictionary.field("C80", "project").examples == ("DEVELOPMENT", "PRODUCTION")
+    assert dictionary.field("C80", "project").description.endswith("…")
+
+
+def test_range_lookup(tmp_path):
+    _, dictionary = load(tmp_path)
+    for position in (56, 70, 99):
+        assert dictionary.field(position).code == "C56-C99"
+    assert dictionary.field(100) is None
+
+
+def test_find_by_name(tmp_path):
+    _, dictionary = load(tmp_path)
+    assert [f.first for f in dictionary.find("effectivity")] == [22, 37]
+    assert [f.first for f in dictionary.find("work breakdown structure")] == [1]
+    assert dictionary.find("CONTROL  account")[0].first == 4
+
+
+def test_cache_is_reused_and_refreshed(tmp_path):
+    path, first = load(tmp_path)
+    cached = DataDictionary.load(str(path), str(tmp_path / "cache.db"))
+    assert [repr(f) for f in cached.fields] == [repr(f) for f in first.fields]
+
+    path.write_bytes(SHEET.replace("HAA10AAL", "XYZ").encode("cp1252"))
+    os.utime(path, ns=(1, 1))
+    assert DataDictionary.load(str(path), str(tmp_path / "cache.db")).field("C4").examples == ("XYZ",)
+
+
+def test_render_reference_keeps_hand_written_sections(tmp_path):
+    _, dictionary = load(tmp_path)
+    existing = (
+        "# Reference\n\n## Overview\n\nKept.\n\n"
+        "## Activity-Level Code Fields (Critical Fields)\n\nOld entries.\n\n"
+        "## Best Practices\n\nAlso kept.\n"
+    )
+    page = render_reference(dictionary, existing)
+    assert "Kept." in page and "Also kept." in page and "Old entries." not in page
+    assert "### C4 - Control Account ⚠️ MANDATORY" in page
+    assert page.index("## Overview") < page.index("### C4") < page.index("## Best Practices")
+    assert render_reference(dictionary, page) == page
+
+
+def test_blank_baselined_is_unknown_and_keeps_existing_line(tmp_path):
+    _, dictionary = load(tmp_path)
+    assert dictionary.field("C22").baselined is None
+    assert dictionary.field("C4").baselined is True
+
+    existing = (
+        "# Reference\n\n## Activity-Level Code Fields (Standard Fields)\n\n"
+        "### C22 - Effectivity\n\n**Baselined:** Yes (Display Only)\n\n---\n\n"
+        "#### C37 - Effectivity\n\n**Baselined:** No\n"
+    )
+    page = render_reference(dictionary, existing)
+
+    def entry(code):
+        start = page.index(f"### {code} ")
+        return page[start:page.index("---", start)]
+
+    assert "**Baselined:** Yes (Display Only)" in entry("C22")
+    assert "**Baselined:** No" in entry("C37")
+    assert "**Baselined:** Yes" in entry("C4")
+    assert "Baselined" not in entry("C56-C99")
@@ -0,0 +1,97 @@
+import os
+
+from docs_index import DocsIndex, build_match, read_section, split_sections
+
+GUIDE = """Preamble line.
+
+# Objects
+
+## Activity Object
+
+Activities are scheduled units of work.
+
+```
+# not a heading
+```
+
+### Duration Property
+
+Planned duration.
+
+## Calendar Object
+
+Working time.
+"""
+
+
+def make(tmp_path, files):
+    docs = tmp_path / "docs"
+    docs.mkdir(exist_ok=True)
+    for name, text in files.items():
+        (docs / name).write_text(text, encoding="utf-8")
+    return docs, DocsIndex(str(tmp_path / "index.db"))
+
+
+def test_split_sections_offsets_and_heading_paths():
+    data = GUIDE.encode("utf-8")
+    sections = split_sections(data)
+    assert [(heading, path, level) for heading, path, level, _, _ in sections] == [
+        ("", "", 0),
+        ("Objects", "Objects", 1),
+        ("Activity Object", "Objects > Activity Object", 2),
+        ("Duration Property", "Objects > Activity Object > Duration Property", 3),
+        ("Calendar Object", "Objects > Calendar Object", 2),
+    ]
+    assert sections[0][3] == 0 and sections[-1][4] == len(data)
+    for previous, following in zip(sections, sections[1:]):
+        assert previous[4] == following[3]
+    activity = data[sections[2][3]:sections[2][4]].decode("utf-8")
+    assert activity.startswith("## Activity Object") and "# not a heading" in activity
+
+
+def test_unchanged_files_skipped_changed_reindexed_removed_dropped(tmp_path):
+    docs, index = make(tmp_path, {"guide.md": GUIDE, "notes.md": "# Notes\n\nFilters.\n"})
+    assert index.update([str(docs)])['indexed'] == 2
+
+    stats = index.update([str(docs)])
+    assert (stats['indexed'], stats['unchanged']) == (0, 2)
+
+    guide = docs / "guide.md"
+    os.utime(guide, ns=(1, 1))
+    assert index.update([str(docs)])['indexed'] == 0
+
+    guide.write_text(GUIDE.replace("Working time.", "Working time and holidays."), encoding="utf-8")
+    (docs / "notes.md").unlink()
+    stats = index.update([str(docs)])
+    assert (stats['indexed'], stats['removed']) == (1, 1)
+    assert index.search("holidays")[0]['heading'] == "Calendar Object"
+    assert index.search("filters") == []
+    assert {section['path'] for section in index.sections()} == {guide.as_posix()}
+
+
+def test_heading_matches_rank_above_body_matches(tmp_path):
+    docs, index = make(tmp_path, {
+        "body.md": "# Scheduling\n\nThe resource calendar sets working days for every resource.\n",
+        "heading.md": "# Resource Calendar\n\nSets working days.\n",
+    })
+    index.update([str(docs)])
+    results = index.search("resource calendar")
+    assert [result['heading'] for result in results] == ["Resource Calendar", "Scheduling"]
+    assert read_section(results[0]).startswith("# Resource Calendar")
+
+
+def test_within_filter_and_question_words(tmp_path):
+    docs, index = make(tmp_path, {"guide.md": GUIDE})
+    (docs / "kb").mkdir()
+    (docs / "kb" / "duration.md").write_text("# Duration\n\nPlanned duration tips.\n", encoding="utf-8")
+    index.update([str(docs)])
+
+    assert build_match("How do I set the duration?") == '"set" "duration"'
+    assert build_match("how is it") == '"how" "is" "it"'
+    assert build_match("duration calendar", any_term=True) == '"duration" OR "calendar"'
+
+    assert len(index.search("What is the planned duration?")) == 2
+    scoped = index.search("planned duration", within=[str(docs / "kb")])
+    assert [result['path'] for result in scoped] == [(docs / "kb" / "duration.md").as_posix()]
+    scoped = index.search("planned duration", within=[str(docs / "guide.md")])
+    assert [result['heading'] for result in scoped] == ["Duration Property"]
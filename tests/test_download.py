@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+import mistral_ocr_converter
+from mistral_ocr_converter import PDFToMarkdownConverter
+
+URL = "https://example.com/guide.pdf"
+
+
+class FakeDownload:
+    def __init__(self, status=200, body=b"", headers=None):
+        self.status_code = status
+        self.body = body
+        self.headers = {'content-length': str(len(body)), **(headers or {})}
+        self.closed = False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def download(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test")
+    converter = PDFToMarkdownConverter(output_dir=str(tmp_path / "out"), cache_dir=None)
+    sent = []
+
+    def run(response):
+        def fake_get(url, stream=False, timeout=None, headers=None):
+            sent.append(headers)
+            return response
+        monkeypatch.setattr(mistral_ocr_converter.requests, "get", fake_get)
+        return converter.download_pdf(URL, tmp_path / "guide.pdf")
+    return run, sent, tmp_path / "guide.pdf"
+
+
+def read_meta(save_path):
+    return json.loads(save_path.with_name("guide.pdf.meta.json").read_text())
+
+
+def test_complete_copy_revalidated_and_reused_on_304(download):
+    run, sent, save_path = download
+    run(FakeDownload(body=b"%PDF v1", headers={'ETag': '"v1"', 'Last-Modified': "Mon, 05 Oct 2026 10:00:00 GMT"}))
+    assert save_path.read_bytes() == b"%PDF v1"
+    assert read_meta(save_path)['complete']
+    assert sent[0] == {}
+
+    not_modified = FakeDownload(status=304)
+    assert run(not_modified) == save_path
+    assert sent[1] == {'If-None-Match': '"v1"', 'If-Modified-Since': "Mon, 05 Oct 2026 10:00:00 GMT"}
+    assert not_modified.closed
+    assert save_path.read_bytes() == b"%PDF v1"
+
+
+def test_part_file_resumed_with_range_and_if_range(download):
+    run, sent, save_path = download
+    save_path.with_name("guide.pdf.part").write_bytes(b"%PDF ")
+    save_path.with_name("guide.pdf.meta.json").write_text(
+        json.dumps({'url': URL, 'etag': '"v1"', 'last_modified': None, 'complete': False}))
+
+    run(FakeDownload(status=206, body=b"rest", headers={'ETag': '"v1"'}))
+    assert sent[0] == {'Range': "bytes=5-", 'If-Range': '"v1"'}
+    assert save_path.read_bytes() == b"%PDF rest"
+    assert not save_path.with_name("guide.pdf.part").exists()
+    assert read_meta(save_path)['complete']
+
+
+def test_changed_source_restarts_partial_download(download):
+    run, sent, save_path = download
+    save_path.with_name("guide.pdf.part").write_bytes(b"stale")
+    save_path.with_name("guide.pdf.meta.json").write_text(
+        json.dumps({'url': URL, 'etag': None, 'last_modified': "Mon, 05 Oct 2026 10:00:00 GMT", 'complete': False}))
+
+    run(FakeDownload(body=b"%PDF v2", headers={'ETag': '"v2"'}))
+    assert sent[0]['If-Range'] == "Mon, 05 Oct 2026 10:00:00 GMT"
+    assert save_path.read_bytes() == b"%PDF v2"
+    assert read_meta(save_path)['etag'] == '"v2"'
@@ -0,0 +1,45 @@
+from concurrent.futures import Future
+
+import mistral_ocr_converter
+from mistral_ocr_converter import EXTRACT_BATCH_PAGES, EXTRACT_BATCHES_AHEAD, _iter_ranges_in_pool
+
+
+class InlineExecutor:
+    """Runs submissions immediately and records how many were outstanding."""
+
+    submitted = []
+
+    def __init__(self, max_workers):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        self.submitted.append(args[1])
+        return future
+
+
+def fake_range(path, start, end, prefix):
+    return [f"{prefix}{page}" for page in range(start, end)]
+
+
+def test_batches_bounded_and_in_order(monkeypatch):
+    monkeypatch.setattr(mistral_ocr_converter, "ProcessPoolExecutor", InlineExecutor)
+    InlineExecutor.submitted = []
+    total = EXTRACT_BATCH_PAGES * 10 + 3
+    pages = _iter_ranges_in_pool(fake_range, "doc.pdf", total, 2, "p")
+
+    first = next(pages)
+    assert first == (1, "p0")
+    assert len(InlineExecutor.submitted) == EXTRACT_BATCHES_AHEAD * 2
+
+    rest = list(pages)
+    assert [num for num, _ in [first] + rest] == list(range(1, total + 1))
+    assert rest[-1] == (total, f"p{total - 1}")
+    assert InlineExecutor.submitted == list(range(0, total, EXTRACT_BATCH_PAGES))
@@ -0,0 +1,73 @@
+import os
+
+from link_checker import check_links, heading_anchor, parse_markdown
+
+
+def test_heading_anchor_follows_github_rules():
+    assert heading_anchor("OPActivities Collection") == "opactivities-collection"
+    assert heading_anchor("C4 - Control Account ⚠️ MANDATORY") == "c4---control-account--mandatory"
+    assert heading_anchor("🏢 Best Practices") == "-best-practices"
+    assert heading_anchor("The `Add` [method](add.md)") == "the-add-method"
+    assert heading_anchor("Import/Export (Transfer.dat)") == "importexport-transferdat"
+
+
+def test_parse_markdown_anchors_and_links():
+    text = (
+        "# Title\n"
+        "See [a](a.md), ![img](pic.png \"caption\") and [b](b.md#part).\n"
+        "`[not](code.md)`\n"
+        "```\n"
+        "# Not a heading\n"
+        "[not](fenced.md)\n"
+        "```\n"
+        "## Title\n"
+        "<a name=\"custom\"></a>\n"
+        "[ref]: ref.md\n"
+        "[broken](earlystartst ddev.md)\n"
+    )
+    anchors, links = parse_markdown(text)
+    assert anchors == ["title", "title-1", "custom"]
+    assert [target for _, target in links] == ["a.md", "pic.png", "b.md#part", "ref.md", "earlystartst ddev.md"]
+    assert links[0][0] == 2 and links[-1][0] == 11
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def test_check_reports_dangling_links_and_orphans(tmp_path):
+    root = tmp_path / "docs"
+    write(root / "index.md", "[A](objects/a.md) [B](objects/b.md#b-object) [gone](objects/gone.md)\n")
+    write(root / "objects/a.md", "# A Object\n[B](b.md#missing) [top](#a-object) [web](https://example.com)\n")
+    write(root / "objects/b.md", "# B Object\n")
+    write(root / "objects/orphan.md", "# Orphan\n")
+
+    result = check_links([str(root)], str(tmp_path / "graph.json"))
+    problems = sorted((os.path.basename(source), target, problem) for source, _, target, problem in result['dangling'])
+    assert problems == [("a.md", "b.md#missing", "missing anchor"), ("index.md", "objects/gone.md", "missing file")]
+    assert [os.path.basename(path) for path in result['orphans']] == ["orphan.md"]
+    assert result['links'] == 5
+
+
+def test_incremental_check_uses_cached_graph(tmp_path):
+    root = tmp_path / "docs"
+    graph = str(tmp_path / "graph.json")
+    write(root / "index.md", "[B](b.md#b-object)\n")
+    write(root / "b.md", "# B Object\n")
+    assert check_links([str(root)], graph)['parsed'] == 2
+
+    result = check_links([str(root)], graph)
+    assert result['parsed'] == 0 and not result['dangling']
+
+    # Changing the target is picked up even though the linking page is unchanged
+    write(root / "b.md", "# Renamed\n")
+    os.utime(root / "b.md", ns=(1, 1))
+    result = check_links([str(root)], graph)
+    assert result['parsed'] == 1
+    assert [problem for *_, problem in result['dangling']] == ["missing anchor"]
+
+    (root / "b.md").unlink()
+    result = check_links([str(root)], graph)
+    assert result['removed'] == 1
+    assert [problem for *_, problem in result['dangling']] == ["missing file"]
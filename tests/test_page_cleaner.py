@@ -0,0 +1,53 @@
+from mistral_ocr_converter import PageCleaner
+
+HEADER = "Deltek Open Plan Developer Guide"
+
+
+def layout_page(number, markdown):
+    return {'page_num': number, 'text': markdown, 'markdown': markdown}
+
+
+def clean(pages):
+    return list(PageCleaner().clean(pages))
+
+
+def test_running_header_and_page_number_removed():
+    pages = clean([layout_page(n, f"{HEADER}\n\nBody text of page {n}.\n\n{n}") for n in range(1, 7)])
+    for page in pages:
+        assert page['text'] == f"Body text of page {page['page_num']}."
+        assert page['markdown'] == page['text']
+
+
+def test_closing_fence_and_code_kept():
+    def body(n):
+        return f"Example {n}:\n\n```vb\nDim total As Long\ntotal = {n}\n```"
+    pages = clean([layout_page(n, f"{HEADER}\n\n{body(n)}") for n in range(1, 7)])
+    for page in pages:
+        assert page['text'] == body(page['page_num'])
+
+
+def test_table_header_and_separator_rows_kept():
+    notes = ["Activities", "Resources", "Calendars", "Codes", "Risks", "Baselines"]
+
+    def body(n):
+        rows = "\n".join(f"| C{n}{i} | {n * i} |" for i in range(4))
+        return f"| Field | Width |\n| --- | --- |\n{rows}\n\n{notes[n - 1]} fields are listed above."
+    pages = clean([layout_page(n, body(n)) for n in range(1, 7)])
+    for page in pages:
+        assert page['text'] == body(page['page_num'])
+
+
+def test_roman_page_numbers_removed_but_words_kept():
+    words = ["civil", "ill", "livid", "vivid", "ivy", "civic"]
+    pages = clean([
+        {'page_num': n, 'text': f"{word}\n\nPreface paragraph {n}.\n\n{numeral}"}
+        for n, (word, numeral) in enumerate(zip(words, ["ii", "iii", "iv", "xiv", "xl", "xcix"]), 1)
+    ])
+    for page, word in zip(pages, words):
+        assert page['text'] == f"{word}\n\nPreface paragraph {page['page_num']}."
+
+
+def test_roman_numeral_inside_page_kept():
+    lines = ["Introduction", "vi", "Options", "Detail", "More detail", "Closing", "Summary", "xiv"]
+    page = clean([{'page_num': 1, 'text': "\n".join(lines)}])[0]
+    assert page['text'].splitlines() == lines[:-1]
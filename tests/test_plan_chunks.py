@@ -0,0 +1,67 @@
+from mistral_ocr_converter import OUTPUT_TOKEN_RATIO, ModelRouter, plan_chunks
+
+
+def page(num, tokens, complexity=0, **extra):
+    return {'page_num': num, 'text': "x" * max(0, tokens - 1) * 4, 'complexity': complexity, **extra}
+
+
+def sizes(chunks):
+    return [[p['page_num'] for p in chunk] for chunk in chunks]
+
+
+def test_token_budget_and_page_limit():
+    pages = [page(n, 1000) for n in range(1, 11)]
+    assert sizes(plan_chunks(pages, 4, 3000, 100000)) == [[1, 2, 3], [4, 5, 6], [7, 8, 9], [10]]
+    assert sizes(plan_chunks(pages, 2, 100000, 100000)) == [[1, 2], [3, 4], [5, 6], [7, 8], [9, 10]]
+
+
+def test_pages_consumed_lazily():
+    consumed = []
+
+    def feed():
+        for n in range(1, 100):
+            consumed.append(n)
+            yield page(n, 1000)
+
+    first = next(plan_chunks(feed(), 25, 3000, 100000))
+    assert [p['page_num'] for p in first] == [1, 2, 3]
+    assert consumed == [1, 2, 3, 4]
+
+
+def test_output_cap_limits_budget_and_oversize_page_stands_alone():
+    pages = [page(1, 500), page(2, 5000), page(3, 500)]
+    chunks = list(plan_chunks(pages, 25, 100000, int(1000 * OUTPUT_TOKEN_RATIO)))
+    assert sizes(chunks) == [[1], [2], [3]]
+
+
+def test_section_start_closes_a_well_filled_chunk():
+    pages = [page(1, 1000), page(2, 1000), page(3, 1000, sections=[[1, "Chapter 2"]]), page(4, 1000)]
+    assert sizes(plan_chunks(pages, 25, 4000, 100000)) == [[1, 2], [3, 4]]
+
+
+def test_local_pages_cost_nothing():
+    pages = [page(1, 1000), page(2, 1000, markdown="done"), page(3, 1000)]
+    assert sizes(plan_chunks(pages, 25, 2000, 100000)) == [[1, 2, 3]]
+
+
+def test_fast_eligible_runs_held_to_fast_output_cap():
+    router = ModelRouter(max_tokens=64000, fast_model="fast", fast_max_tokens=1200)
+    pages = [page(n, 400) for n in range(1, 7)]
+    chunks = list(plan_chunks(pages, 25, 16000, 64000, router=router))
+    assert sizes(chunks) == [[1, 2], [3, 4], [5, 6]]
+    for chunk in chunks:
+        model, max_tokens, _ = router.select(chunk)
+        assert model == "fast"
+        assert sum(p['tokens'] for p in chunk) * OUTPUT_TOKEN_RATIO <= max_tokens
+
+
+def test_complex_pages_use_the_primary_budget():
+    router = ModelRouter(max_tokens=64000, fast_model="fast", fast_max_tokens=1200)
+    pages = [page(1, 400, complexity=5)] + [page(n, 400) for n in range(2, 7)]
+    assert sizes(plan_chunks(pages, 25, 16000, 64000, router=router)) == [[1, 2, 3, 4, 5, 6]]
+
+
+def test_fast_run_after_a_local_page_is_capped():
+    router = ModelRouter(max_tokens=64000, fast_model="fast", fast_max_tokens=1200)
+    pages = [page(1, 400, complexity=5), page(2, 0, markdown="table")] + [page(n, 400) for n in range(3, 7)]
+    assert sizes(plan_chunks(pages, 25, 16000, 64000, router=router)) == [[1, 2, 3, 4], [5, 6]]
@@ -0,0 +1,34 @@
+import io
+
+import fitz
+from pptx import Presentation
+from pptx.util import Inches
+
+from mistral_ocr_converter import _extract_slide_range
+
+
+def make_deck(path):
+    presentation = Presentation()
+    slide = presentation.slides.add_slide(presentation.slide_layouts[5])
+    slide.shapes.title.text = "Calculated Fields"
+
+    png = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 4, 4), False).tobytes("png")
+    picture = slide.shapes.add_picture(io.BytesIO(png), Inches(1), Inches(2))
+    picture.element.xpath("./p:nvPicPr/p:cNvPr")[0].set("descr", "Expression builder")
+    unlabelled = slide.shapes.add_picture(io.BytesIO(png), Inches(3), Inches(2))
+    unlabelled.name = "Unlabelled"
+    unlabelled.element.xpath("./p:nvPicPr/p:cNvPr")[0].set("descr", "")
+    presentation.save(path)
+
+
+def test_picture_alt_text_from_description_or_name(tmp_path):
+    deck = tmp_path / "deck.pptx"
+    make_deck(deck)
+    images = tmp_path / "images"
+    images.mkdir()
+
+    [(text, title)] = _extract_slide_range(str(deck), 0, 1, str(images), str(tmp_path))
+    assert title == "Calculated Fields"
+    assert "![Expression builder](images/" in text
+    assert "![Unlabelled](images/" in text
+    assert len(list(images.iterdir())) == 2
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from mistral_ocr_converter import AdaptiveRateLimiter
+
+
+def test_in_flight_limit_and_release():
+    limiter = AdaptiveRateLimiter(2, requests_per_second=1000, burst=10)
+    assert limiter.try_acquire() == 0
+    assert limiter.try_acquire() == 0
+    assert limiter.try_acquire() > 0
+    limiter.release(200)
+    assert limiter.try_acquire() == 0
+
+
+def test_throttle_halves_limit_and_pauses_for_retry_after():
+    limiter = AdaptiveRateLimiter(8, requests_per_second=1000, jitter=0)
+    limiter.acquire()
+    delay = limiter.release(429, {'Retry-After': '2'})
+    assert delay == 2
+    assert limiter.limit == 4
+    assert limiter.throttle_events == 1
+    assert 1 < limiter.try_acquire() <= 2
+
+
+def test_backoff_doubles_without_retry_after_and_resets_on_success():
+    limiter = AdaptiveRateLimiter(4, requests_per_second=1000, jitter=0)
+    assert limiter.release(503) == 1
+    assert limiter.release(503) == 2
+    limiter._paused_until = 0
+    limiter.release(200)
+    assert limiter.release(503) == 1
+
+
+def test_slot_returned_when_block_raises():
+    limiter = AdaptiveRateLimiter(1, requests_per_second=1000)
+    with pytest.raises(ValueError):
+        with limiter.slot():
+            raise ValueError("stream error")
+    assert limiter._in_flight == 0
+
+    with limiter.slot() as slot:
+        slot.record(429, {'Retry-After': '0'})
+    assert slot.backoff is not None
+    assert limiter._in_flight == 0
+
+
+def test_async_slot_returned_when_block_raises():
+    limiter = AdaptiveRateLimiter(1, requests_per_second=1000)
+
+    async def run():
+        with pytest.raises(ValueError):
+            async with limiter.slot_async():
+                raise ValueError("payload error")
+        async with limiter.slot_async() as slot:
+            slot.record(200)
+        return slot
+
+    slot = asyncio.run(run())
+    assert slot.backoff is None
+    assert limiter._in_flight == 0
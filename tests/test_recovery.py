@@ -0,0 +1,53 @@
+from mistral_ocr_converter import (
+    ChunkTimeoutError, ContextOverflowError, plan_recovery, split_pages, split_partial_output
+)
+
+PAGES = [{'page_num': n, 'text': "word " * 200} for n in range(1, 9)]
+
+
+def numbers(runs):
+    return [[page['page_num'] for page in run] for run in runs]
+
+
+def partial_through(last):
+    return "\n\n".join(f"<!-- page {n} -->\nPage {n} markdown" for n in range(1, last + 1))
+
+
+def test_split_pages_balances_tokens():
+    assert numbers(split_pages(PAGES, 2)) == [[1, 2, 3, 4], [5, 6, 7, 8]]
+    assert numbers(split_pages(PAGES, 3)) == [[1, 2, 3], [4, 5, 6], [7, 8]]
+    assert numbers(split_pages(PAGES[:2], 5)) == [[1], [2]]
+
+
+def test_partial_output_credits_pages_before_the_last_marker():
+    markdown, completed, remaining = split_partial_output(partial_through(3), PAGES)
+    assert markdown == "Page 1 markdown\n\nPage 2 markdown"
+    assert numbers([completed, remaining]) == [[1, 2], [3, 4, 5, 6, 7, 8]]
+    assert split_partial_output("", PAGES) == ("", [], PAGES)
+
+
+def test_timeout_without_output_is_halved():
+    markdown, completed, runs = plan_recovery(PAGES, ChunkTimeoutError("timed out"))
+    assert (markdown, completed) == ("", [])
+    assert numbers(runs) == [[1, 2, 3, 4], [5, 6, 7, 8]]
+
+
+def test_stalled_stream_keeps_progress_and_retries_the_rest_once():
+    markdown, completed, runs = plan_recovery(PAGES, ChunkTimeoutError("stalled", partial_through(4)))
+    assert numbers([completed]) == [[1, 2, 3]]
+    assert numbers(runs) == [[4, 5, 6, 7, 8]]
+    assert markdown.endswith("Page 3 markdown")
+
+
+def test_context_overflow_split_by_reported_ratio():
+    _, _, runs = plan_recovery(PAGES, ContextOverflowError("too long", ratio=2.5))
+    assert len(runs) == 3
+    _, _, runs = plan_recovery(PAGES, ContextOverflowError("too long"))
+    assert numbers(runs) == [[1, 2], [3, 4], [5, 6], [7, 8]]
+
+
+def test_truncated_output_split_into_runs_no_longer_than_what_fit():
+    _, completed, runs = plan_recovery(PAGES, ContextOverflowError("cut off", partial_through(3)))
+    assert numbers([completed]) == [[1, 2]]
+    assert all(len(run) <= 2 for run in runs)
+    assert [page for run in runs for page in run] == PAGES[2:]
@@ -0,0 +1,74 @@
+import json
+import time
+
+import pytest
+
+from mistral_ocr_converter import RunMetrics, percentile
+
+
+def pages(first, last):
+    return [{'page_num': n} for n in range(first, last + 1)]
+
+
+def finish(metrics, wall_time, **fields):
+    call = metrics.start_call(pages(1, 2), "Chunk 1")
+    call['_started'] = time.monotonic() - wall_time
+    call.update({'model': "primary", **fields})
+    metrics.finish_call(call)
+    return call
+
+
+def test_nearest_rank_percentile():
+    values = list(range(100, 0, -1))
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 99)) == (50, 95, 99)
+    assert percentile([3.0], 99) == 3.0
+    assert percentile([], 50) is None
+
+
+def test_summary_aggregates_calls_and_subdivisions():
+    metrics = RunMetrics()
+    for seconds in range(1, 21):
+        finish(metrics, seconds, attempts=1, status=200, prompt_tokens=100, completion_tokens=50, cost=0.01)
+    finish(metrics, 30, attempts=3, throttled=2, status=200)
+    finish(metrics, 99, attempts=2, status=500, error="HTTP 500", depth=1)
+    finish(metrics, 0, cached=True)
+    metrics.record_subdivision(reused_pages=2)
+    metrics.record_subdivision()
+
+    summary = metrics.summary()
+    assert (summary['calls'], summary['cached_calls'], summary['api_calls'], summary['failed_calls']) == (23, 1, 22, 1)
+    assert (summary['http_requests'], summary['retries'], summary['throttled']) == (25, 3, 2)
+    assert (summary['subdivisions'], summary['reused_pages'], summary['max_depth']) == (2, 2, 1)
+    assert (summary['prompt_tokens'], summary['completion_tokens'], summary['cost']) == (2000, 1000, 0.2)
+    # Failed calls are left out of the latency percentiles
+    latencies = [summary['latency_p50'], summary['latency_p95'], summary['latency_p99']]
+    assert latencies == pytest.approx([11, 20, 30], abs=0.5)
+    assert summary['slowest_calls'][0]['status'] == 500
+
+
+def test_call_log_and_report_written(tmp_path):
+    metrics = RunMetrics()
+    metrics.open_log(tmp_path / "guide.calls.jsonl")
+    finish(metrics, 1, attempts=2, status=200)
+    finish(metrics, 0, cached=True)
+    metrics.close()
+
+    records = [json.loads(line) for line in (tmp_path / "guide.calls.jsonl").read_text().splitlines()]
+    assert [r['cached'] for r in records] == [False, True]
+    assert records[0]['first_page'] == 1 and records[0]['last_page'] == 2
+    assert '_started' not in records[0]
+
+    report = metrics.write_report(tmp_path / "guide.report.json", source="guide.pdf")
+    assert json.loads((tmp_path / "guide.report.json").read_text()) == report
+    assert (report['source'], report['calls'], report['retries']) == ("guide.pdf", 2, 1)
+    assert report['calls_by_model'] == {'primary': 1}
+
+
+def test_combined_runs_merge_calls_and_counters():
+    first, second = RunMetrics(), RunMetrics()
+    finish(first, 1, attempts=1)
+    finish(second, 2, attempts=2)
+    second.record_subdivision(reused_pages=1)
+
+    summary = RunMetrics.combine([first, second]).summary()
+    assert (summary['calls'], summary['retries'], summary['subdivisions'], summary['reused_pages']) == (2, 1, 1, 1)
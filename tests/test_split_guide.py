@@ -0,0 +1,87 @@
+from split_guide import MANIFEST_NAME, parse_guide, split_guide
+
+GUIDE = """# Deltek Open Plan® Developer's Guide
+
+## OPActivity Object
+
+**Description**
+An activity in an OPProject.
+
+**Properties**
+- Duration
+
+### Remarks
+Details.
+
+# Integration Developer's Guide
+
+## OPProject Object
+
+**Description**
+A project.
+
+## Duration Property
+
+**Description**
+The activity duration.
+
+```
+## Not a heading
+```
+
+## Examples
+
+Sample code.
+"""
+
+
+def test_parse_guide_pages_and_subsections():
+    pages = {page.path: page for page in parse_guide(GUIDE)}
+    assert set(pages) == {
+        "objects/opactivity.md", "objects/opproject.md",
+        "properties/duration.md", "topics/examples.md"
+    }
+    assert "## Remarks" in pages["objects/opactivity.md"].lines
+    assert "## Not a heading" in pages["properties/duration.md"].lines
+
+
+def test_links_between_pages(tmp_path):
+    guide = tmp_path / "guide.md"
+    guide.write_text(GUIDE, encoding="utf-8")
+    split_guide(guide, tmp_path / "out")
+    activity = (tmp_path / "out/objects/opactivity.md").read_text(encoding="utf-8")
+    assert "[OPProject](opproject.md)" in activity
+    assert "- [Duration](../properties/duration.md)" in activity
+
+
+def test_rerun_writes_nothing(tmp_path):
+    guide = tmp_path / "guide.md"
+    guide.write_text(GUIDE, encoding="utf-8")
+    out = tmp_path / "out"
+    first = split_guide(guide, out)
+    assert first['written'] == first['total']
+
+    mtimes = {p: p.stat().st_mtime_ns for p in out.rglob("*.md")}
+    second = split_guide(guide, out)
+    assert second['written'] == 0
+    assert second['unchanged'] == first['total']
+    assert {p: p.stat().st_mtime_ns for p in out.rglob("*.md")} == mtimes
+
+
+def test_hand_written_pages_kept_and_stale_pages_removed(tmp_path):
+    guide = tmp_path / "guide.md"
+    guide.write_text(GUIDE, encoding="utf-8")
+    out = tmp_path / "out"
+    (out / "objects").mkdir(parents=True)
+    (out / "objects/opproject.md").write_text("hand written\n", encoding="utf-8")
+
+    stats = split_guide(guide, out)
+    assert stats['kept'] == 1
+    assert (out / "objects/opproject.md").read_text(encoding="utf-8") == "hand written\n"
+    assert "objects/opproject.md" not in (out / MANIFEST_NAME).read_text(encoding="utf-8")
+
+    guide.write_text(GUIDE.replace("## Examples", "## Samples"), encoding="utf-8")
+    stats = split_guide(guide, out)
+    assert stats['removed'] == 1
+    assert not (out / "topics/examples.md").exists()
+    assert (out / "topics/samples.md").exists()
@@ -0,0 +1,42 @@
+from mistral_ocr_converter import validate_output_range
+
+SOURCE = ("Calculated fields evaluate expressions against activity data whenever the project "
+          "recalculates. Expressions reference other fields, constants and functions such as "
+          "IIF, DATEADD and ROUND, and their results display in spreadsheet columns, barchart "
+          "labels and filters throughout planning views.")
+PAGES = [{'page_num': 1, 'text': SOURCE}]
+TABLE = "| Function | Returns |\n| --- | --- |\n| IIF | Value |\n| ROUND | Number |"
+
+
+def test_sound_output_has_no_problems():
+    assert validate_output_range(f"## Calculated Fields\n\n{SOURCE}\n\n{TABLE}", PAGES, 16000) == []
+
+
+def test_placeholder_and_low_coverage():
+    problems = validate_output_range("<!-- Failed to process page 1 -->", PAGES, 16000)
+    assert problems[0] == "placeholder: Failed to process page 1"
+    assert problems[1].startswith("low coverage of source words on pages 1")
+
+
+def test_unclosed_fence_and_malformed_tables():
+    problems = validate_output_range(f"{SOURCE}\n\n```vb\nx = 1", PAGES, 16000)
+    assert problems == ["unclosed code block"]
+
+    ragged = TABLE + " extra |"
+    assert validate_output_range(f"{SOURCE}\n\n{ragged}", PAGES, 16000) == [
+        "table rows with a different number of cells than the 2-column header"
+    ]
+    headless = "| IIF | Value |\n| ROUND | Number |"
+    assert validate_output_range(f"{SOURCE}\n\n{headless}", PAGES, 16000) == [
+        "table without a header separator"
+    ]
+
+
+def test_tables_inside_code_blocks_ignored():
+    code = "```\n| not | a table\n| at | all | really |\n```"
+    assert validate_output_range(f"{SOURCE}\n\n{code}", PAGES, 16000) == []
+
+
+def test_output_near_token_cap():
+    problems = validate_output_range(SOURCE, PAGES, 60)
+    assert problems == ["output is near the 60-token output cap"]